@@ -6,6 +6,16 @@ import os
 from aiohttp import web
 from database import Database
 from config import Config
+from utils.role_queue import RoleMutationQueue
+from utils.economy import EconomyLedger
+from utils.activity import ActivityCollector
+from utils.log_dispatcher import LogDispatcher
+from utils.log_webhooks import WebhookLogSink
+from utils.message_snapshots import MessageSnapshotStore
+from utils.guild_stats import GuildStatsAggregator
+from utils.live_feed import LiveFeed
+from utils.cog_loader import CogLoader, LazyCommandTree
+from cogs import MANIFEST
 # from render_health_setup import setup_render_health_monitoring
     
 # Configure logging
@@ -31,73 +41,70 @@ class AdvancedBot(commands.Bot):
             intents=intents,
             help_command=None,
             case_insensitive=True,
-            strip_after_prefix=True
+            strip_after_prefix=True,
+            tree_cls=LazyCommandTree
         )
         
         self.db = Database()
         self.config = Config()
+        self.role_queue = RoleMutationQueue(self)
+        self.economy = EconomyLedger(self.db.db_path)
+        self.pixels = EconomyLedger(self.db.db_path, currency='pixels', starting_balance=1000)
+        self.member_activity = ActivityCollector()
+        self.guild_stats = GuildStatsAggregator()
+        self.live_feed = LiveFeed(self)
+        self.log_dispatcher = LogDispatcher(sink=WebhookLogSink(self) if Config.LOG_WEBHOOKS else None)
+        self.snapshots = MessageSnapshotStore(
+            max_per_guild=Config.SNAPSHOT_MAX_PER_GUILD,
+            max_per_channel=Config.SNAPSHOT_MAX_PER_CHANNEL,
+            memory_budget=Config.SNAPSHOT_MEMORY_MB * 1024 * 1024,
+            spill_path=Config.SNAPSHOT_SPILL_PATH or None
+        )
+        self.cog_loader = CogLoader(self, MANIFEST, state_path=Config.COG_LOADER_STATE)
         
     async def setup_hook(self):
         """Setup hook called when bot is starting up"""
         # Initialize database
         await self.db.init_db()
+        await self.db.import_legacy_warnings()
+        await self.economy.start()
+        await self.pixels.start()
+        await self.snapshots.start()
         
-        # Load all cogs
-        cogs = [
-            'cogs.moderation',
-            'cogs.automod',
-            'cogs.reaction_roles',
-   #         'cogs.custom_commands',
-            'cogs.logging',
-            'cogs.welcome',
-            'cogs.starboard',
-         #   'cogs.leveling',
-            'cogs.fun'
-            'cogs.advanced_moderation',
-            'cogs.funcogs.discord_fun_commands',
-            'cogs.discord_commands',
-            'cogs.word_blacklist_commands',
-            'cogs.userinfo',
-            'cogs.privateuserinfo',
-            'cogs.serverdisplay',
-            'cogs.avatardisplay',
-            'cogs.dice',
-            'cogs.connect4',
-            'cogs.rpsgame',
-            'cogs.coinflip',
-            'cogs.echo_command',
-            'cogs.slowmode_command',
-            'cogs.lockdown_command',
-            'cogs.hangman_command',
-            'cogs.guessnumber_command',
-            'cogs.slots_command',
-            'cogs.ship_command',
-            'cogs.trigger_system',
-            'cogs.eightball_command',
-            'cogs.godzillafact_command',
-            'cogs.discord_rules_command',
-            'cogs.discord_pacificrimfact_command',
-            'cogs.auto_reaction_feature',
-            'cogs.welcome_feature',
-            'cogs.partnership_announcer',
-          #  'cogs.keepalive',
-            'cogs.alt_detection'
-        ]
-        
-        for cog in cogs:
-            try:
-                await self.load_extension(cog)
-                logging.info(f'Loaded {cog}')
-            except Exception as e:
-                logging.error(f'Failed to load {cog}: {e}')
+        # Load cogs from the manifest; lazy ones load on first use
+        await self.cog_loader.load()
         
-        # Sync slash commands
+        # Sync slash commands, only when a cog or the manifest changed since the last sync
+        if not self.cog_loader.needs_sync():
+            logging.info('Command tree unchanged, skipping sync')
+            return
         try:
+            await self.cog_loader.load_deferred()
             synced = await self.tree.sync()
+            self.cog_loader.mark_synced()
             logging.info(f'Synced {len(synced)} command(s)')
         except Exception as e:
             logging.error(f'Failed to sync commands: {e}')
     
+    async def get_context(self, origin, /, *, cls=commands.Context):
+        """Resolve prefix commands of cogs that have not been loaded yet"""
+        ctx = await super().get_context(origin, cls=cls)
+        if ctx.command is None and ctx.prefix is not None and ctx.invoked_with:
+            if await self.cog_loader.load_for_command('prefix', ctx.invoked_with.lower()):
+                ctx = await super().get_context(origin, cls=cls)
+        return ctx
+    
+    async def close(self):
+        """Disconnect and unload the cogs, then stop the background workers they use"""
+        # Cogs go first, so nothing still running in them hits a closed ledger or queue
+        await super().close()
+        await self.role_queue.close()
+        await self.log_dispatcher.close()
+        await self.economy.close()
+        await self.pixels.close()
+        await self.live_feed.close()
+        await self.snapshots.close()
+    
     async def on_ready(self):
         """Called when bot is ready"""
         logging.info(f'{self.user} has connected to Discord!')
@@ -153,17 +160,9 @@ async def main():
     """Main function to run the bot"""
     bot = AdvancedBot()
     
-    # Start web dashboard in background
-    from web_dashboard import create_app
-    import threading
-    
-    def run_dashboard():
-        app = create_app(bot)
-        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
-    
-    dashboard_thread = threading.Thread(target=run_dashboard)
-    dashboard_thread.daemon = True
-    dashboard_thread.start()
+    # Serve the web dashboard on the bot's event loop
+    from web_dashboard import start_dashboard
+    dashboard = await start_dashboard(bot, Config.DASHBOARD_HOST, Config.DASHBOARD_PORT)
     
     # Start bot
     token = os.getenv('DISCORD_TOKEN')
@@ -179,17 +178,7 @@ async def main():
         logging.error(f'Bot error: {e}')
     finally:
         await bot.close()
+        await dashboard.cleanup()
 
 if __name__ == '__main__':
     asyncio.run(main())
-
-from discord.ext import commands
-import discord
-
-bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
-
-@bot.event
-async def on_message(message):
-    await bot.process_commands(message)
-
-bot.run("YOUR_TOKEN")
@@ -1 +1,48 @@
 # Makes 'cogs' a Python package
+
+from utils.cog_loader import EAGER, LAZY
+
+# Extensions loaded by the bot, in load order, as (module, mode) pairs. Eager cogs load at startup;
+# lazy ones are games and one-off commands that load on the first use of one of their commands.
+# Cogs with event listeners always load eagerly.
+MANIFEST = [
+    ('cogs.moderation', EAGER),
+    ('cogs.automod', EAGER),
+    ('cogs.reaction_roles', EAGER),
+    # ('cogs.custom_commands', EAGER),
+    ('cogs.bot_logger', EAGER),
+    ('cogs.welcome', EAGER),
+    ('cogs.starboard', EAGER),
+    # ('cogs.leveling', EAGER),
+    # ('cogs.fun', EAGER),  # Its 8ball, coinflip, dice and connect4 commands clash with the dedicated cogs below
+    ('cogs.funcogs.advanced_moderation', EAGER),
+    ('cogs.funcogs.discord_fun_commands', EAGER),
+    ('cogs.discord_commands', EAGER),
+    # ('cogs.word_blacklist_commands', EAGER),  # Needs asyncpg and its own PostgreSQL database
+    ('cogs.userinfo', EAGER),
+    ('cogs.privateuserinfo', EAGER),
+    ('cogs.serverdisplay', EAGER),
+    ('cogs.avatardisplay', LAZY),
+    ('cogs.dice', LAZY),
+    ('cogs.connect4', LAZY),
+    ('cogs.rpsgame', LAZY),
+    ('cogs.coinflip', LAZY),
+    ('cogs.echo_command', LAZY),
+    ('cogs.slowmode_command', EAGER),
+    ('cogs.lockdown_command', EAGER),
+    ('cogs.hangman_command', LAZY),
+    ('cogs.guessnumber_command', LAZY),
+    ('cogs.slots_command', EAGER),
+    ('cogs.ship_command', LAZY),
+    ('cogs.trigger_system', EAGER),
+    ('cogs.eightball_command', LAZY),
+    ('cogs.godzillafact_command', LAZY),
+    ('cogs.discord_rules_command', LAZY),
+    ('cogs.discord_pacificrimfact_command', LAZY),
+    ('cogs.auto_reaction_feature', EAGER),
+    ('cogs.welcome_feature', EAGER),
+    ('cogs.partnership_announcer', EAGER),
+    # ('cogs.keepalive', EAGER),
+    ('cogs.alt_detection', EAGER),
+    ('cogs.guild_stats', EAGER)
+]
@@ -1,35 +1,159 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import sqlite3
-from database import database
-from utils.analysis import BehavioralAnalyzer
-from utils.patterns import PatternDetector
-from config import EXCLUDED_CHANNELS
+from utils.alt_detection_db import AltDetectionDB
+from utils.alt_risk import JoinRiskScorer
+from utils.alt_scan_jobs import AltScanJob, AltScanRunner
+from utils.alt_workers import AnalysisPool
+from utils.log_dispatcher import PRIORITY_HIGH
+from utils.member_table import MemberTable
+from config import Config, EXCLUDED_CHANNELS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Analyses run by the scan, in the order they are merged
+ANALYSIS_PHASES = ('creation', 'usernames', 'joins', 'behavior', 'correlations')
+
+MEMBER_QUERY_SIZE = 100  # Member IDs per gateway query, Discord's maximum
+
 class AltDetectionCog(commands.Cog):
     """Advanced alt account detection cog using behavioral analysis and pattern recognition."""
     
     def __init__(self, bot):
         self.bot = bot
         self.db = AltDetectionDB()
-        self.analyzer = BehavioralAnalyzer()
-        self.pattern_detector = PatternDetector()
+        self.analysis_pool = AnalysisPool(
+            workers=Config.ALT_ANALYSIS_WORKERS,
+            timeout=Config.ALT_ANALYSIS_TIMEOUT
+        )
+        self.activity = bot.member_activity
+        self.join_scorer = JoinRiskScorer()
         self.excluded_channels = EXCLUDED_CHANNELS
+        self.scan_runner = AltScanRunner(
+            self.db,
+            phases=[
+                ('members', "Fetching member data", self._scan_members),
+                ('analysis', "Analyzing patterns and behaviors", self._scan_analysis),
+                ('scoring', "Scoring potential alt groups", self._scan_scoring),
+                ('report', "Generating detailed report", self._scan_report)
+            ],
+            progress=self._update_scan_progress,
+            max_concurrent=Config.ALT_SCAN_MAX_CONCURRENT
+        )
         
     async def cog_load(self):
         """Initialize the cog and database."""
         await self.db.initialize()
+        self.prune_activity.start()
+        self.resume_task = asyncio.create_task(self._resume_scans())
         logger.info("Alt Detection Cog loaded successfully")
     
+    async def cog_unload(self):
+        """Stop the activity pruning loop, pause running scans and close the database."""
+        self.prune_activity.cancel()
+        self.resume_task.cancel()
+        await self.scan_runner.close()
+        self.analysis_pool.close()
+        await self.db.close()
+    
+    # ============ ACTIVITY COLLECTION ============
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """Record member activity from live messages."""
+        if not message.guild or message.author.bot:
+            return
+        
+        self.activity.record_message(
+            message.guild.id, message.author.id, message.channel.id,
+            message.created_at, len(message.content)
+        )
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        """Record reactions received on a member's messages."""
+        if payload.guild_id and payload.message_author_id and payload.message_author_id != payload.user_id:
+            self.activity.record_reaction(payload.guild_id, payload.message_author_id)
+    
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        """Forget the activity and join risk indexes of members who left."""
+        self.activity.forget_member(payload.guild_id, payload.user.id)
+        self.join_scorer.forget_member(payload.guild_id, payload.user.id, payload.user.created_at.timestamp())
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """Forget the activity and join risk indexes of guilds the bot left."""
+        self.activity.forget_guild(guild.id)
+        self.join_scorer.forget_guild(guild.id)
+    
+    @tasks.loop(hours=6)
+    async def prune_activity(self):
+        """Drop activity counters that fell out of the window, and expired cached results."""
+        self.activity.prune()
+        await self.db.cleanup_expired_data()
+    
+    # ============ JOIN RISK SCORING ============
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        """Score each joining member against the guild's indexes and log risky joins."""
+        if member.bot:
+            return
+        
+        guild = member.guild
+        # The first join in a guild indexes its existing members; the generator is only consumed then
+        await self.join_scorer.ensure_index(guild.id, (
+            (m.id, m.name, m.created_at.timestamp())
+            for m in guild.members if not m.bot and m.id != member.id
+        ))
+        
+        joined_at = (member.joined_at or discord.utils.utcnow()).timestamp()
+        risk = self.join_scorer.score(guild.id, member.id, member.name, member.created_at.timestamp(), joined_at)
+        if risk['score'] < Config.ALT_JOIN_RISK_THRESHOLD:
+            return
+        
+        try:
+            await self._log_join_risk(member, risk)
+        except Exception as e:
+            logger.error(f"Error logging join risk for {member.id} in guild {guild.id}: {e}")
+    
+    async def _log_join_risk(self, member: discord.Member, risk: Dict):
+        """Post a join risk alert to the guild's log channel."""
+        settings = await self.bot.db.get_guild_settings(member.guild.id)
+        if not settings or not settings.get('log_channel_id'):
+            return
+        
+        log_channel = member.guild.get_channel(settings['log_channel_id'])
+        if not log_channel:
+            return
+        
+        embed = discord.Embed(
+            title="⚠️ Possible Alt Account Joined",
+            color=0xFEE75C if risk['score'] < 80 else 0xED4245,
+            timestamp=discord.utils.utcnow()
+        )
+        embed.add_field(name="User", value=f"{member.mention} ({member.id})", inline=False)
+        embed.add_field(name="Risk Score", value=f"{risk['score']}/100", inline=True)
+        embed.add_field(name="Account Created", value=discord.utils.format_dt(member.created_at, 'R'), inline=True)
+        embed.add_field(name="Evidence", value="\n".join(f"• {text}" for _, text in risk['evidence']), inline=False)
+        
+        if risk['related']:
+            related = ", ".join(f"<@{member_id}>" for member_id in risk['related'][:10])
+            embed.add_field(name="Related Members", value=related, inline=False)
+        
+        embed.set_footer(text="Run /serveraltcheck for a full analysis")
+        self.bot.log_dispatcher.enqueue(member.guild.id, log_channel, embed, PRIORITY_HIGH)
+    
+    # ============ COMMANDS ============
+    
     @app_commands.command(name="serveraltcheck", description="Detect potential alt accounts in the server")
     @app_commands.describe(
         confidence_threshold="Minimum confidence score for reporting (0-100, default: 70)",
@@ -78,352 +202,220 @@ class AltDetectionCog(commands.Cog):
             )
             return
         
-        await interaction.response.defer(ephemeral=True)
+        job, created = await self.scan_runner.submit(
+            interaction.guild.id,
+            interaction.channel.id,
+            interaction.user.id,
+            {'confidence_threshold': confidence_threshold, 'detailed': detailed}
+        )
         
-        try:
-            guild = interaction.guild
-            if not guild:
-                await interaction.followup.send(
-                    "❌ This command can only be used in a server.",
-                    ephemeral=True
-                )
-                return
-                
-            logger.info(f"Starting alt detection scan for guild: {guild.name} (ID: {guild.id})")
-            
-            # Fetch all members with extended information
-            await interaction.followup.send("🔍 **Phase 1:** Fetching member data...", ephemeral=True)
-            members = await self._fetch_member_data(guild)
-            
-            if len(members) < 2:
-                await interaction.followup.send(
-                    "❌ Not enough members to perform analysis.",
-                    ephemeral=True
-                )
-                return
-            
-            # Store member data for analysis
-            await interaction.followup.send("💾 **Phase 2:** Storing member data for analysis...", ephemeral=True)
-            await self.db.store_member_batch(guild.id, members)
-            
-            # Perform comprehensive analysis
-            await interaction.followup.send("🧠 **Phase 3:** Analyzing patterns and behaviors...", ephemeral=True)
-            analysis_results = await self._perform_comprehensive_analysis(guild.id, members)
-            
-            # Filter results by confidence threshold
-            filtered_results = [
-                result for result in analysis_results 
-                if result['confidence_score'] >= confidence_threshold
-            ]
-            
-            # Generate and send report
-            await interaction.followup.send("📊 **Phase 4:** Generating detailed report...", ephemeral=True)
-            
-            if not filtered_results:
-                embed = discord.Embed(
-                    title="🔍 Alt Account Detection Report",
-                    description=f"No potential alt accounts found with confidence ≥ {confidence_threshold}%",
-                    color=discord.Color.green(),
-                    timestamp=datetime.utcnow()
-                )
-                embed.add_field(
-                    name="📈 Analysis Summary",
-                    value=f"• **Members Analyzed:** {len(members)}\n"
-                          f"• **Confidence Threshold:** {confidence_threshold}%\n"
-                          f"• **Potential Alts Found:** 0",
-                    inline=False
-                )
-                await interaction.followup.send(embed=embed, ephemeral=True)
-                return
-            
-            # Generate detailed report
-            report_embeds = await self._generate_report(
-                guild, filtered_results, confidence_threshold, detailed
-            )
-            
-            # Send report embeds
-            for embed in report_embeds:
-                await interaction.followup.send(embed=embed, ephemeral=True)
-            
-            # Log the analysis
-            logger.info(
-                f"Alt detection completed for {guild.name}: "
-                f"{len(filtered_results)} potential alt groups found"
-            )
-            
-        except discord.HTTPException as e:
-            logger.error(f"Discord API error during alt detection: {e}")
-            await interaction.followup.send(
-                "❌ Discord API error occurred. Please try again later.",
+        if not created:
+            await interaction.response.send_message(
+                f"⏳ A scan is already running for this server "
+                f"(phase {min(job.phase + 1, len(self.scan_runner.phases))}/{len(self.scan_runner.phases)}). "
+                f"Use `/altscancancel` to stop it.",
                 ephemeral=True
             )
-        except Exception as e:
-            logger.error(f"Unexpected error during alt detection: {e}")
-            await interaction.followup.send(
-                "❌ An unexpected error occurred during analysis. Please contact the bot administrator.",
+            return
+        
+        logger.info(f"Queued alt detection scan for guild: {interaction.guild.name} (ID: {interaction.guild.id})")
+        await interaction.response.send_message(
+            "🔍 Alt scan queued. Progress and the report will be posted in this channel.",
+            ephemeral=True
+        )
+    
+    @app_commands.command(name="altscancancel", description="Cancel the running alt account scan")
+    async def alt_scan_cancel(self, interaction: discord.Interaction):
+        """Cancel the active alt scan of this server."""
+        if not interaction.guild:
+            await interaction.response.send_message(
+                "❌ This command can only be used in a server.",
                 ephemeral=True
             )
-    
-    async def _fetch_member_data(self, guild: discord.Guild) -> List[Dict]:
-        """Fetch comprehensive member data for analysis."""
-        members = []
+            return
         
-        # Use chunking for large servers to avoid rate limits
-        async for member in guild.fetch_members(limit=None):
-            try:
-                member_data = {
-                    'id': member.id,
-                    'username': member.name,
-                    'display_name': member.display_name,
-                    'discriminator': member.discriminator,
-                    'created_at': member.created_at,
-                    'joined_at': member.joined_at,
-                    'avatar_url': str(member.avatar.url) if member.avatar else None,
-                    'is_bot': member.bot,
-                    'roles': [role.id for role in member.roles if role.id != guild.default_role.id],
-                    'premium_since': member.premium_since,
-                    'status': str(member.status) if hasattr(member, 'status') else 'unknown'
-                }
-                
-                # Get recent message activity (last 30 days)
-                recent_activity = await self._get_member_activity(guild, member)
-                member_data.update(recent_activity)
-                
-                members.append(member_data)
-                
-                # Small delay to respect rate limits
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.warning(f"Error fetching data for member {member.id}: {e}")
-                continue
+        member = interaction.guild.get_member(interaction.user.id)
+        if not member or not member.guild_permissions.manage_guild:
+            await interaction.response.send_message(
+                "❌ You need 'Manage Server' permissions to use this command.",
+                ephemeral=True
+            )
+            return
         
-        return members
+        if self.scan_runner.cancel(interaction.guild.id):
+            await interaction.response.send_message("🛑 Cancelling the alt scan...", ephemeral=True)
+        else:
+            await interaction.response.send_message("ℹ️ No alt scan is running for this server.", ephemeral=True)
     
-    async def _get_member_activity(self, guild: discord.Guild, member: discord.Member) -> Dict:
-        """Get member activity data for behavioral analysis."""
-        activity_data = {
-            'message_count_7d': 0,
-            'message_count_30d': 0,
-            'channels_used': set(),
-            'message_times': [],
-            'avg_message_length': 0,
-            'reaction_count': 0
-        }
-        
-        cutoff_7d = datetime.utcnow() - timedelta(days=7)
-        cutoff_30d = datetime.utcnow() - timedelta(days=30)
-        
-        message_lengths = []
-        
+    # ============ SCAN JOBS ============
+    
+    async def _resume_scans(self):
+        """Resume scans interrupted by a restart once the member cache is available."""
+        await self.bot.wait_until_ready()
         try:
-            # Sample activity from text channels (limit to avoid rate limits)
-            for channel in guild.text_channels[:10]:  # Limit channel scanning
-                if not channel.permissions_for(guild.me).read_message_history:
-                    continue
-                
-                try:
-                    async for message in channel.history(limit=100, after=cutoff_30d):
-                        if message.author.id == member.id:
-                            activity_data['message_count_30d'] += 1
-                            activity_data['channels_used'].add(channel.id)
-                            activity_data['message_times'].append(message.created_at)
-                            message_lengths.append(len(message.content))
-                            activity_data['reaction_count'] += len(message.reactions)
-                            
-                            if message.created_at >= cutoff_7d:
-                                activity_data['message_count_7d'] += 1
-                    
-                    # Small delay between channels
-                    await asyncio.sleep(0.2)
-                    
-                except discord.Forbidden:
-                    continue
-                except Exception as e:
-                    logger.warning(f"Error reading channel {channel.id}: {e}")
-                    continue
-        
+            await self.scan_runner.resume()
         except Exception as e:
-            logger.warning(f"Error getting activity for member {member.id}: {e}")
+            logger.error(f"Error resuming alt scans: {e}")
+    
+    async def _update_scan_progress(self, job: AltScanJob, text: str):
+        """Post or edit the progress message of a scan."""
+        channel = self.bot.get_channel(job.channel_id)
+        if channel is None:
+            return
         
-        # Calculate averages
-        activity_data['channels_used'] = len(activity_data['channels_used'])
-        activity_data['avg_message_length'] = (
-            sum(message_lengths) / len(message_lengths) if message_lengths else 0
-        )
+        guild = self.bot.get_guild(job.guild_id)
+        content = f"🔍 **Alt scan for {guild.name if guild else job.guild_id}:** {text}"
         
-        return activity_data
+        if job.message_id:
+            await channel.get_partial_message(job.message_id).edit(content=content)
+        else:
+            message = await channel.send(content)
+            job.message_id = message.id
     
-    async def _perform_comprehensive_analysis(self, guild_id: int, members: List[Dict]) -> List[Dict]:
-        """Perform comprehensive alt account analysis using multiple methods."""
-        results = []
-        
-        # 1. Account Creation Date Pattern Analysis
-        creation_clusters = await self.pattern_detector.analyze_creation_patterns(members)
+    async def _scan_guild(self, job: AltScanJob) -> discord.Guild:
+        """Get the guild of a scan, failing the job if the bot left it."""
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None:
+            raise RuntimeError("the bot is no longer in this server")
+        return guild
+    
+    async def _scan_rows(self, job: AltScanJob) -> Tuple[List[Dict], MemberTable]:
+        """Get the member rows of a scan, re-reading the member cache after a restart."""
+        if 'table' not in job.state:
+            table = await self._fetch_member_data(await self._scan_guild(job))
+            job.state['table'] = table
+            job.state['members'] = table.rows()
+        return job.state['members'], job.state['table']
+    
+    async def _scan_members(self, job: AltScanJob) -> Dict:
+        """Phase: read and store member data, and check for a cached result of the same member set."""
+        members, table = await self._scan_rows(job)
+        if len(members) < 2:
+            raise RuntimeError("not enough members to perform analysis")
+        
+        changed = await self.db.store_member_batch(job.guild_id, members)
+        fingerprint = table.fingerprint()
+        cached = await self.db.get_cached_analysis(job.guild_id, fingerprint) is not None
+        return {
+            'member_count': len(members),
+            'changed_members': changed,
+            'fingerprint': fingerprint,
+            'cached': cached
+        }
+    
+    async def _scan_analysis(self, job: AltScanJob) -> Dict[str, List[Dict]]:
+        """Phase: run the analyses in parallel worker processes, saving each as it finishes."""
+        if job.checkpoint['members']['cached']:
+            return {}
         
-        # 2. Username Similarity Analysis
-        username_similarities = await self.pattern_detector.analyze_username_similarities(members)
+        _, table = await self._scan_rows(job)
+        finished = job.checkpoint.setdefault('analysis', {})
         
-        # 3. Join Pattern Analysis
-        join_patterns = await self.pattern_detector.analyze_join_patterns(members)
+        async def run(key: str):
+            finished[key] = await self.analysis_pool.analyze(key, table)
+            await self.scan_runner.save(job)
         
-        # 4. Behavioral Pattern Analysis
-        behavioral_patterns = await self.analyzer.analyze_behavioral_patterns(members)
+        await asyncio.gather(*(run(key) for key in ANALYSIS_PHASES if key not in finished))
+        return finished
+    
+    async def _scan_scoring(self, job: AltScanJob) -> List[Dict]:
+        """Phase: merge every analysis into scored groups above the threshold, or reuse the cached ones."""
+        fingerprint = job.checkpoint['members']['fingerprint']
+        results = None
+        if job.checkpoint['members']['cached']:
+            results = await self.db.get_cached_analysis(job.guild_id, fingerprint)
+            if results is not None:
+                logger.info(f"Reusing cached alt analysis for guild {job.guild_id} ({fingerprint})")
+        
+        if results is None:
+            _, table = await self._scan_rows(job)
+            # The cache entry can expire between phases; run the skipped analyses now
+            analyses = job.checkpoint['analysis'] or await self.analysis_pool.analyze_all(table, list(ANALYSIS_PHASES))
+            all_analyses = [analyses[key] for key in ANALYSIS_PHASES]
+            results = await self.analysis_pool.score(all_analyses, table)
+            await self.db.cache_analysis(job.guild_id, fingerprint, results, hours=Config.ALT_ANALYSIS_CACHE_HOURS)
+        
+        threshold = job.options.get('confidence_threshold', 70)
+        return [result for result in results if result['confidence_score'] >= threshold]
+    
+    async def _scan_report(self, job: AltScanJob) -> int:
+        """Phase: post the report embeds to the scan's channel."""
+        guild = await self._scan_guild(job)
+        channel = self.bot.get_channel(job.channel_id)
+        if channel is None:
+            raise RuntimeError("the report channel no longer exists")
+        
+        threshold = job.options.get('confidence_threshold', 70)
+        filtered_results = job.checkpoint['scoring']
+        
+        if not filtered_results:
+            embed = discord.Embed(
+                title="🔍 Alt Account Detection Report",
+                description=f"No potential alt accounts found with confidence ≥ {threshold}%",
+                color=discord.Color.green(),
+                timestamp=datetime.utcnow()
+            )
+            embed.add_field(
+                name="📈 Analysis Summary",
+                value=f"• **Members Analyzed:** {job.checkpoint['members']['member_count']}\n"
+                      f"• **Confidence Threshold:** {threshold}%\n"
+                      f"• **Potential Alts Found:** 0",
+                inline=False
+            )
+            report_embeds = [embed]
+        else:
+            report_embeds = await self._generate_report(
+                guild, filtered_results, threshold, job.options.get('detailed', False)
+            )
         
-        # 5. Account Age and Activity Correlation
-        activity_correlations = await self.analyzer.analyze_activity_correlations(members)
+        for embed in report_embeds:
+            await channel.send(embed=embed)
         
-        # Combine all analysis results
-        all_analyses = [
-            creation_clusters,
-            username_similarities,
-            join_patterns,
-            behavioral_patterns,
-            activity_correlations
-        ]
+        logger.info(
+            f"Alt detection completed for {guild.name}: "
+            f"{len(filtered_results)} potential alt groups found"
+        )
+        return len(report_embeds)
+    
+    async def _fetch_member_data(self, guild: discord.Guild) -> MemberTable:
+        """Read guild members from the gateway cache into columns for analysis."""
+        # Request every member over the gateway once; later scans reuse the cache
+        if not guild.chunked:
+            try:
+                await guild.chunk(cache=True)
+            except discord.ClientException as e:
+                logger.warning(f"Could not chunk guild {guild.id}, querying missing members by ID: {e}")
+        
+        members = {member.id: member for member in guild.members}
+        
+        # Request only the members the cache lacks: those without a join date, and members
+        # seen in activity or earlier scans when the cache is short of the member count
+        missing = {member_id for member_id, member in members.items() if member.joined_at is None}
+        if guild.member_count is not None and len(members) < guild.member_count:
+            known_ids = set(self.activity.member_ids(guild.id))
+            known_ids.update(await self.db.get_guild_member_ids(guild.id))
+            missing |= known_ids - members.keys()
+        
+        missing = sorted(missing)
+        for start in range(0, len(missing), MEMBER_QUERY_SIZE):
+            try:
+                found = await guild.query_members(
+                    user_ids=missing[start:start + MEMBER_QUERY_SIZE],
+                    limit=MEMBER_QUERY_SIZE,
+                    cache=True
+                )
+            except (asyncio.TimeoutError, discord.ClientException) as e:
+                logger.warning(f"Could not query {len(missing) - start} missing members of guild {guild.id}: {e}")
+                break
+            for member in found:
+                members[member.id] = member
         
-        # Merge and score potential alt groups
-        potential_groups = await self._merge_analysis_results(all_analyses, members)
+        table = MemberTable.from_members(guild, members.values())
         
-        for group in potential_groups:
-            confidence_score = await self._calculate_confidence_score(group, members)
-            
-            if confidence_score > 0:  # Only include groups with some evidence
-                results.append({
-                    'members': group['members'],
-                    'confidence_score': confidence_score,
-                    'evidence': group['evidence'],
-                    'analysis_details': group['details']
-                })
-        
-        # Sort by confidence score (highest first)
-        results.sort(key=lambda x: x['confidence_score'], reverse=True)
-        
-        return results
-    
-    async def _merge_analysis_results(self, analyses: List[List], members: List[Dict]) -> List[Dict]:
-        """Merge results from different analysis methods to identify potential alt groups."""
-        member_connections = {}
-        
-        # Initialize connections for each member
-        for member in members:
-            member_connections[member['id']] = {
-                'connected_to': set(),
-                'evidence': [],
-                'details': {}
-            }
-        
-        # Process each analysis method
-        for analysis_type, analysis_results in enumerate(analyses):
-            for result in analysis_results:
-                member_ids = result.get('member_ids', [])
-                evidence = result.get('evidence', '')
-                details = result.get('details', {})
-                
-                # Connect all members in this result to each other
-                for i, member_id in enumerate(member_ids):
-                    for j, other_id in enumerate(member_ids):
-                        if i != j and member_id in member_connections:
-                            member_connections[member_id]['connected_to'].add(other_id)
-                            if evidence:
-                                member_connections[member_id]['evidence'].append(evidence)
-                            if details:
-                                member_connections[member_id]['details'][f'analysis_{analysis_type}'] = details
-        
-        # Group connected members
-        groups = []
-        processed = set()
-        
-        for member_id, connections in member_connections.items():
-            if member_id in processed or not connections['connected_to']:
-                continue
-            
-            # Build group using BFS
-            group_members = {member_id}
-            queue = [member_id]
-            
-            while queue:
-                current = queue.pop(0)
-                if current in member_connections:
-                    for connected_id in member_connections[current]['connected_to']:
-                        if connected_id not in group_members:
-                            group_members.add(connected_id)
-                            queue.append(connected_id)
-            
-            # Collect evidence for the group
-            group_evidence = set()
-            group_details = {}
-            
-            for gm_id in group_members:
-                if gm_id in member_connections:
-                    group_evidence.update(member_connections[gm_id]['evidence'])
-                    group_details.update(member_connections[gm_id]['details'])
-            
-            groups.append({
-                'members': list(group_members),
-                'evidence': list(group_evidence),
-                'details': group_details
-            })
-            
-            processed.update(group_members)
+        # Activity features are precomputed from live events; no history scans needed
+        table.set_activity(self.activity.guild_features(guild.id))
         
-        return groups
-    
-    async def _calculate_confidence_score(self, group: Dict, members: List[Dict]) -> int:
-        """Calculate confidence score for a potential alt group based on evidence strength."""
-        base_score = 0
-        evidence_count = len(group['evidence'])
-        member_count = len(group['members'])
-        
-        if member_count < 2:
-            return 0
-        
-        # Base score from evidence count
-        base_score += min(evidence_count * 15, 60)  # Max 60 from evidence count
-        
-        # Bonus for multiple members
-        if member_count > 2:
-            base_score += min((member_count - 2) * 10, 30)  # Max 30 bonus
-        
-        # Analyze evidence quality
-        evidence_quality_bonus = 0
-        evidence_text = ' '.join(group['evidence']).lower()
-        
-        # High-confidence indicators
-        if 'creation time' in evidence_text:
-            evidence_quality_bonus += 20
-        if 'username similarity' in evidence_text:
-            evidence_quality_bonus += 15
-        if 'join pattern' in evidence_text:
-            evidence_quality_bonus += 10
-        if 'behavioral pattern' in evidence_text:
-            evidence_quality_bonus += 15
-        if 'activity correlation' in evidence_text:
-            evidence_quality_bonus += 10
-        
-        # Get member data for additional analysis
-        group_member_data = [m for m in members if m['id'] in group['members']]
-        
-        # Account age similarity bonus
-        if len(group_member_data) > 1:
-            creation_times = [m['created_at'] for m in group_member_data]
-            time_diffs = []
-            for i in range(len(creation_times)):
-                for j in range(i + 1, len(creation_times)):
-                    diff = abs((creation_times[i] - creation_times[j]).total_seconds())
-                    time_diffs.append(diff)
-            
-            if time_diffs:
-                avg_diff = sum(time_diffs) / len(time_diffs)
-                if avg_diff < 86400:  # Within 24 hours
-                    evidence_quality_bonus += 25
-                elif avg_diff < 604800:  # Within 1 week
-                    evidence_quality_bonus += 15
-                elif avg_diff < 2592000:  # Within 1 month
-                    evidence_quality_bonus += 10
-        
-        final_score = min(base_score + evidence_quality_bonus, 100)
-        return max(final_score, 0)
+        return table
     
     async def _generate_report(
         self, 
@@ -5,6 +5,7 @@ import asyncio
 from collections import defaultdict, deque
 from datetime import datetime, timedelta
 import logging
+from utils.log_dispatcher import PRIORITY_HIGH
 
 class AutoMod(commands.Cog):
     """Automatic moderation system"""
@@ -175,6 +176,13 @@ class AutoMod(commands.Cog):
                 message.content[:500],  # Truncate long messages
                 ", ".join(action_taken)
             )
+            self.bot.live_feed.publish(guild_id, 'automod', {
+                'user_id': str(user_id),
+                'user': str(message.author),
+                'channel_id': str(message.channel.id),
+                'violations': violations,
+                'actions': action_taken
+            })
             
             # Send notification to log channel
             settings = await self.bot.db.get_guild_settings(guild_id)
@@ -195,7 +203,7 @@ class AutoMod(commands.Cog):
                     content = message.content[:1000] + "..." if len(message.content) > 1000 else message.content
                     embed.add_field(name="Message Content", value=f"```{content}```", inline=False)
                     
-                    await log_channel.send(embed=embed)
+                    self.bot.log_dispatcher.enqueue(guild_id, log_channel, embed, PRIORITY_HIGH)
         
         except discord.Forbidden:
             logging.warning(f"Missing permissions for automod action in guild {guild_id}")
@@ -1,8 +1,14 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import io
 import json
+from collections import Counter
 from datetime import datetime
+from utils.log_dispatcher import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from utils.message_snapshots import MessageSnapshot
+
+MAX_TRANSCRIPT_CHARS = 1_000_000  # Bulk delete transcripts are cut off here
 
 class Logging(commands.Cog):
     """Event logging system"""
@@ -10,8 +16,9 @@ class Logging(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
-    async def send_log(self, guild_id: int, embed: discord.Embed):
-        """Send log to the configured log channel"""
+    async def send_log(self, guild_id: int, embed: discord.Embed, priority: int = PRIORITY_NORMAL,
+                       file: discord.File = None):
+        """Queue a log for the configured log channel; bursts are batched and noise is summarized"""
         settings = await self.bot.db.get_guild_settings(guild_id)
         if not settings or not settings.get('log_channel_id'):
             return
@@ -24,12 +31,12 @@ class Logging(commands.Cog):
         if not log_channel:
             return
         
-        try:
-            await log_channel.send(embed=embed)
-        except discord.Forbidden:
-            pass  # No permission to send messages
-        except Exception as e:
-            print(f"Error sending log: {e}")
+        self.bot.log_dispatcher.enqueue(guild_id, log_channel, embed, priority, file)
+    
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        """Snapshot messages so edits and deletes can be logged after they leave the message cache"""
+        self.bot.snapshots.add(message)
     
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
@@ -40,16 +47,43 @@ class Logging(commands.Cog):
         if before.content == after.content:
             return  # No content change
         
+        await self.bot.snapshots.update(after.id, after.content)
+        await self._log_message_edit(MessageSnapshot.from_message(before), after.content)
+    
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Log edits of messages no longer in the message cache from their snapshots"""
+        if payload.cached_message is not None or not payload.guild_id:
+            return  # Cached edits are logged by on_message_edit
+        
+        content = payload.data.get('content')
+        if content is None:
+            return  # Embed-only update
+        
+        snapshot = await self.bot.snapshots.resolve(payload.message_id)
+        if snapshot is None or snapshot.content == content:
+            return
+        
+        before_content = snapshot.content
+        await self.bot.snapshots.update(payload.message_id, content)
+        await self._log_message_edit(snapshot, content, before_content)
+    
+    async def _log_message_edit(self, snapshot: MessageSnapshot, after_content: str,
+                                before_content: str = None):
+        """Record and log an edit of a snapshotted message"""
+        if before_content is None:
+            before_content = snapshot.content
+        
         # Add to database
         await self.bot.db.add_event_log(
-            before.guild.id,
+            snapshot.guild_id,
             'message_edit',
-            before.author.id,
-            before.channel.id,
+            snapshot.author_id,
+            snapshot.channel_id,
             {
-                'message_id': before.id,
-                'before_content': before.content,
-                'after_content': after.content
+                'message_id': snapshot.id,
+                'before_content': before_content,
+                'after_content': after_content
             }
         )
         
@@ -57,20 +91,21 @@ class Logging(commands.Cog):
             title="Message Edited",
             color=0xFEE75C
         )
-        embed.add_field(name="User", value=f"{before.author} ({before.author.id})", inline=False)
-        embed.add_field(name="Channel", value=before.channel.mention, inline=False)
+        embed.add_field(name="User", value=f"{snapshot.author_name} ({snapshot.author_id})", inline=False)
+        embed.add_field(name="Channel", value=f"<#{snapshot.channel_id}>", inline=False)
         
         # Truncate long messages
-        before_content = before.content[:1000] + ("..." if len(before.content) > 1000 else "")
-        after_content = after.content[:1000] + ("..." if len(after.content) > 1000 else "")
+        before_content = before_content[:1000] + ("..." if len(before_content) > 1000 else "")
+        after_content = after_content[:1000] + ("..." if len(after_content) > 1000 else "")
         
+        jump_url = f"https://discord.com/channels/{snapshot.guild_id}/{snapshot.channel_id}/{snapshot.id}"
         embed.add_field(name="Before", value=f"```{before_content}```", inline=False)
         embed.add_field(name="After", value=f"```{after_content}```", inline=False)
-        embed.add_field(name="Message Link", value=f"[Jump to message]({after.jump_url})", inline=False)
+        embed.add_field(name="Message Link", value=f"[Jump to message]({jump_url})", inline=False)
         
         embed.timestamp = datetime.utcnow()
         
-        await self.send_log(before.guild.id, embed)
+        await self.send_log(snapshot.guild_id, embed, PRIORITY_LOW)
     
     @commands.Cog.listener()
     async def on_message_delete(self, message):
@@ -78,16 +113,29 @@ class Logging(commands.Cog):
         if message.author.bot:
             return
         
+        await self._log_message_delete(MessageSnapshot.from_message(message))
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Log deletions of messages no longer in the message cache from their snapshots"""
+        snapshot = await self.bot.snapshots.pop(payload.message_id)
+        if payload.cached_message is not None or snapshot is None:
+            return  # Cached deletes are logged by on_message_delete
+        
+        await self._log_message_delete(snapshot)
+    
+    async def _log_message_delete(self, snapshot: MessageSnapshot):
+        """Record and log the deletion of a snapshotted message"""
         # Add to database
         await self.bot.db.add_event_log(
-            message.guild.id,
+            snapshot.guild_id,
             'message_delete',
-            message.author.id,
-            message.channel.id,
+            snapshot.author_id,
+            snapshot.channel_id,
             {
-                'message_id': message.id,
-                'content': message.content,
-                'attachments': [att.url for att in message.attachments]
+                'message_id': snapshot.id,
+                'content': snapshot.content,
+                'attachments': list(snapshot.attachments)
             }
         )
         
@@ -95,21 +143,91 @@ class Logging(commands.Cog):
             title="Message Deleted",
             color=0xED4245
         )
-        embed.add_field(name="User", value=f"{message.author} ({message.author.id})", inline=False)
-        embed.add_field(name="Channel", value=message.channel.mention, inline=False)
+        embed.add_field(name="User", value=f"{snapshot.author_name} ({snapshot.author_id})", inline=False)
+        embed.add_field(name="Channel", value=f"<#{snapshot.channel_id}>", inline=False)
         
         # Truncate long messages
-        content = message.content[:1500] + ("..." if len(message.content) > 1500 else "")
+        content = snapshot.content[:1500] + ("..." if len(snapshot.content) > 1500 else "")
         if content:
             embed.add_field(name="Content", value=f"```{content}```", inline=False)
         
-        if message.attachments:
-            attachment_list = "\n".join([att.filename for att in message.attachments])
+        if snapshot.attachments:
+            attachment_list = "\n".join(snapshot.attachment_names)
             embed.add_field(name="Attachments", value=attachment_list, inline=False)
         
         embed.timestamp = datetime.utcnow()
         
-        await self.send_log(message.guild.id, embed)
+        await self.send_log(snapshot.guild_id, embed, PRIORITY_LOW)
+    
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Log a purge as one summary with the deleted messages attached as a text file"""
+        if not payload.guild_id:
+            return
+        
+        # Messages that left the message cache are resolved from their snapshots
+        cached = {message.id: MessageSnapshot.from_message(message) for message in payload.cached_messages}
+        popped = await self.bot.snapshots.pop_many(payload.message_ids)
+        known = {message_id: cached.get(message_id) or snapshot for message_id, snapshot in popped.items()}
+        bots = {message.id for message in payload.cached_messages if message.author.bot}
+        
+        # One event row per deleted message, written in a single transaction
+        events = []
+        for message_id, snapshot in known.items():
+            if snapshot is None:
+                events.append((payload.guild_id, 'message_delete', None, payload.channel_id,
+                               {'message_id': message_id, 'bulk': True}))
+            elif message_id not in bots:
+                events.append((payload.guild_id, 'message_delete', snapshot.author_id, payload.channel_id, {
+                    'message_id': message_id,
+                    'content': snapshot.content,
+                    'attachments': list(snapshot.attachments),
+                    'bulk': True
+                }))
+        await self.bot.db.add_event_logs(events)
+        
+        # Bot messages are left out of the summary and transcript as well as the event rows
+        snapshots = sorted((snapshot for message_id, snapshot in known.items() if snapshot and message_id not in bots),
+                           key=lambda s: s.created_at)
+        unknown = sum(1 for snapshot in known.values() if snapshot is None)
+        
+        embed = discord.Embed(
+            title="Bulk Message Delete",
+            color=0xED4245
+        )
+        embed.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=False)
+        embed.add_field(name="Messages Deleted", value=str(len(payload.message_ids)), inline=True)
+        embed.add_field(name="Content Available", value=str(len(snapshots)), inline=True)
+        
+        authors = Counter(snapshot.author_name for snapshot in snapshots)
+        if authors:
+            top_authors = "\n".join(f"{author}: {count}" for author, count in authors.most_common(5))
+            embed.add_field(name="Top Authors", value=top_authors, inline=False)
+        
+        embed.timestamp = datetime.utcnow()
+        
+        transcript = self._bulk_delete_transcript(payload, snapshots, unknown)
+        file = discord.File(io.BytesIO(transcript.encode()), filename=f"deleted-messages-{payload.channel_id}.txt")
+        
+        await self.send_log(payload.guild_id, embed, PRIORITY_HIGH, file=file)
+    
+    def _bulk_delete_transcript(self, payload: discord.RawBulkMessageDeleteEvent, snapshots, unknown: int) -> str:
+        """Render deleted messages as plain text, oldest first"""
+        lines = [f"{len(payload.message_ids)} messages deleted from channel {payload.channel_id}", ""]
+        
+        for snapshot in snapshots:
+            created_at = datetime.utcfromtimestamp(snapshot.created_at)
+            lines.append(f"[{created_at:%Y-%m-%d %H:%M:%S} UTC] {snapshot.author_name} ({snapshot.author_id})")
+            if snapshot.content:
+                lines.extend(f"    {line}" for line in snapshot.content.splitlines())
+            for url in snapshot.attachments:
+                lines.append(f"    [attachment] {url}")
+        
+        if unknown:
+            lines.extend(["", f"{unknown} messages were not cached; their content is unavailable."])
+        
+        # Stay well under the upload limit
+        return "\n".join(lines)[:MAX_TRANSCRIPT_CHARS]
     
     @commands.Cog.listener()
     async def on_member_join(self, member):
@@ -137,7 +255,7 @@ class Logging(commands.Cog):
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.timestamp = datetime.utcnow()
         
-        await self.send_log(member.guild.id, embed)
+        await self.send_log(member.guild.id, embed, PRIORITY_LOW)
     
     @commands.Cog.listener()
     async def on_member_remove(self, member):
@@ -172,7 +290,7 @@ class Logging(commands.Cog):
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.timestamp = datetime.utcnow()
         
-        await self.send_log(member.guild.id, embed)
+        await self.send_log(member.guild.id, embed, PRIORITY_LOW)
     
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
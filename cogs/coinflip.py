@@ -33,14 +33,15 @@ class CoinFlipCommand(commands.Cog):
     @app_commands.command(name="coinflip", description="Flip a coin with animations and special effects!")
     @app_commands.describe(
         call="Your prediction (heads or tails)",
-        bet="What you're betting on the outcome (optional fun description)"
+        bet="What you're betting on the outcome (optional fun description)",
+        wager="K-coins to wager on your call (optional)"
     )
     @app_commands.choices(call=[
         app_commands.Choice(name="Heads", value="heads"),
         app_commands.Choice(name="Tails", value="tails")
     ])
     @commands.cooldown(1, 2, commands.BucketType.user)
-    async def coinflip(self, interaction: discord.Interaction, call: str = None, bet: str = None):
+    async def coinflip(self, interaction: discord.Interaction, call: str = None, bet: str = None, wager: int = None):
         """
         Flip a coin with special effects and animations
         
@@ -48,12 +49,36 @@ class CoinFlipCommand(commands.Cog):
             interaction: Discord interaction object
             call: User's prediction (heads or tails)
             bet: Optional description of what they're betting
+            wager: Optional K-coins staked on the call
         """
+        reservation = None
         try:
+            # Hold the wager until the coin lands
+            if wager is not None:
+                if not call or wager <= 0:
+                    await interaction.response.send_message(
+                        "❌ To wager K-coins, make a call and wager a positive amount.",
+                        ephemeral=True
+                    )
+                    return
+                
+                reservation = await self.bot.economy.reserve(interaction.user.id, wager, kind='coinflip')
+                if reservation is None:
+                    available = await self.bot.economy.get_available(interaction.user.id)
+                    await interaction.response.send_message(
+                        f"❌ You don't have enough K-coins! You have {available:,} K-coins.",
+                        ephemeral=True
+                    )
+                    return
+            
+            description = "The coin soars through the air..."
+            if reservation:
+                description += f"\n💰 **{wager:,} K-coins** on the line!"
+            
             # Create initial "flipping" embed
             flip_embed = discord.Embed(
                 title="🪙 Coin Flip in Progress!",
-                description="The coin soars through the air...",
+                description=description,
                 color=discord.Color.gold(),
                 timestamp=datetime.utcnow()
             )
@@ -118,6 +143,11 @@ class CoinFlipCommand(commands.Cog):
             if call:
                 user_won = (call == result)
             
+            # Settle the wager in memory; the ledger persists it in the next batch
+            new_balance = None
+            if reservation:
+                new_balance = self.bot.economy.settle(reservation, wager * 2 if user_won else 0, reference=result)
+            
             # Set embed color based on result
             if user_won is True:
                 color = discord.Color.green()
@@ -173,6 +203,15 @@ class CoinFlipCommand(commands.Cog):
                     inline=False
                 )
             
+            # Show wager outcome
+            if new_balance is not None:
+                wager_outcome = f"+{wager:,} K-coins" if user_won else f"-{wager:,} K-coins"
+                result_embed.add_field(
+                    name="💰 Wager",
+                    value=f"**{wager_outcome}**\nNew Balance: **{new_balance:,}** K-coins",
+                    inline=False
+                )
+            
             # Add special event
             if special_event:
                 result_embed.add_field(
@@ -248,6 +287,8 @@ class CoinFlipCommand(commands.Cog):
             
         except discord.HTTPException as e:
             self.logger.error(f"HTTP Exception in coinflip command: {e}")
+            if reservation:
+                self.bot.economy.release(reservation)
             try:
                 if not interaction.response.is_done():
                     await interaction.response.send_message(
@@ -264,6 +305,8 @@ class CoinFlipCommand(commands.Cog):
         except Exception as e:
             import traceback
             self.logger.error(f"Unexpected error in coinflip command: {e}")
+            if reservation:
+                self.bot.economy.release(reservation)
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             try:
                 if not interaction.response.is_done():
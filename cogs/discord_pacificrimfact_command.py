@@ -194,7 +194,7 @@ async def pacific_rim_fact(ctx):
     await ctx.send(embed=embed)
 
 # Setup function for cog loading
-def setup(bot):
+async def setup(bot):
     bot.add_command(pacific_rim_fact)
 
 """
@@ -59,7 +59,7 @@ async def rules(ctx):
     await ctx.send(embed=embed)
 
 # Setup function for cog loading
-def setup(bot):
+async def setup(bot):
     bot.add_command(rules)
 
 """
@@ -5,8 +5,6 @@ Integrates with existing AdvancedBot structure
 
 import discord
 from discord.ext import commands
-import json
-import os
 from datetime import datetime
 import logging
 from typing import Optional
@@ -18,13 +16,6 @@ class AdvancedModeration(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.warnings_file = 'data/warnings.json'
-        # Ensure data directory exists
-        os.makedirs('data', exist_ok=True)
-        # Initialize warnings file if it doesn't exist
-        if not os.path.exists(self.warnings_file):
-            with open(self.warnings_file, 'w') as f:
-                json.dump({}, f)
     
     def has_moderation_permissions(self, member, guild):
         """Check if a member has moderation permissions"""
@@ -57,20 +48,6 @@ class AdvancedModeration(commands.Cog):
         
         return False
     
-    def load_warnings(self):
-        """Load warnings from JSON file"""
-        try:
-            with open(self.warnings_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-    
-    def save_warnings(self, warnings):
-        """Save warnings to JSON file"""
-        os.makedirs('data', exist_ok=True)
-        with open(self.warnings_file, 'w') as f:
-            json.dump(warnings, f, indent=2)
-    
     async def get_or_create_muted_role(self, guild):
         """Get or create the muted role"""
         # Look for existing muted role
@@ -164,6 +141,7 @@ class AdvancedModeration(commands.Cog):
             
             # Ban the user
             await member.ban(reason=f"{reason} | Banned by {ctx.author}")
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "ban", member.id, ctx.author.id, reason)
             
             # Send confirmation
             embed = discord.Embed(
@@ -218,6 +196,7 @@ class AdvancedModeration(commands.Cog):
             
             # Unban the user
             await ctx.guild.unban(user, reason=f"{reason} | Unbanned by {ctx.author}")
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "unban", user.id, ctx.author.id, reason)
             
             # Send confirmation
             embed = discord.Embed(
@@ -296,6 +275,7 @@ class AdvancedModeration(commands.Cog):
             
             # Kick the user
             await member.kick(reason=f"{reason} | Kicked by {ctx.author}")
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "kick", member.id, ctx.author.id, reason)
             
             # Send confirmation
             embed = discord.Embed(
@@ -449,7 +429,8 @@ class AdvancedModeration(commands.Cog):
                 return
             
             # Add muted role
-            await member.add_roles(muted_role, reason=f"{reason} | Muted by {ctx.author}")
+            await self.bot.role_queue.add_roles(member, muted_role, reason=f"{reason} | Muted by {ctx.author}")
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "mute", member.id, ctx.author.id, reason)
             
             # Try to send DM to user
             try:
@@ -518,7 +499,8 @@ class AdvancedModeration(commands.Cog):
                 return
             
             # Remove muted role
-            await member.remove_roles(muted_role, reason=f"{reason} | Unmuted by {ctx.author}")
+            await self.bot.role_queue.remove_roles(member, muted_role, reason=f"{reason} | Unmuted by {ctx.author}")
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "unmute", member.id, ctx.author.id, reason)
             
             # Try to send DM to user
             try:
@@ -584,36 +566,12 @@ class AdvancedModeration(commands.Cog):
             return
         
         try:
-            # Load existing warnings
-            warnings = self.load_warnings()
-            
-            # Initialize guild and user data if not exists
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
-            
-            if guild_id not in warnings:
-                warnings[guild_id] = {}
-            
-            if user_id not in warnings[guild_id]:
-                warnings[guild_id][user_id] = []
-            
-            # Create warning entry
-            warning_data = {
-                'id': len(warnings[guild_id][user_id]) + 1,
-                'reason': reason,
-                'moderator': str(ctx.author.id),
-                'moderator_name': str(ctx.author),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
             # Add warning
-            warnings[guild_id][user_id].append(warning_data)
-            
-            # Save warnings
-            self.save_warnings(warnings)
+            warning_id = await self.bot.db.add_warning(ctx.guild.id, member.id, ctx.author.id, reason)
+            self.bot.live_feed.publish_moderation(ctx.guild.id, "warn", member.id, ctx.author.id, reason)
             
             # Get total warnings count
-            total_warnings = len(warnings[guild_id][user_id])
+            total_warnings = await self.bot.db.count_user_warnings(ctx.guild.id, member.id)
             
             # Try to send DM to user
             try:
@@ -635,7 +593,7 @@ class AdvancedModeration(commands.Cog):
                 description=f"**{member}** has been warned",
                 color=0x00ff00
             )
-            embed.add_field(name="Warning ID", value=warning_data['id'], inline=True)
+            embed.add_field(name="Warning ID", value=warning_id, inline=True)
             embed.add_field(name="Total Warnings", value=total_warnings, inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
@@ -669,14 +627,8 @@ class AdvancedModeration(commands.Cog):
             return
         
         try:
-            # Load warnings
-            warnings = self.load_warnings()
-            
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
-            
-            # Get user warnings
-            user_warnings = warnings.get(guild_id, {}).get(user_id, [])
+            # Get user warnings (newest first)
+            user_warnings = await self.bot.db.get_user_warnings(ctx.guild.id, member.id)
             
             if not user_warnings:
                 await ctx.send(f"✅ **{member}** has no warnings.")
@@ -690,9 +642,9 @@ class AdvancedModeration(commands.Cog):
             )
             
             # Add warning fields (limit to last 10)
-            for warning in user_warnings[-10:]:
-                moderator_name = warning.get('moderator_name', 'Unknown')
-                timestamp = warning.get('timestamp', 'Unknown')
+            for warning in user_warnings[:10]:
+                moderator_name = f"<@{warning['moderator_id']}>"
+                timestamp = warning.get('created_at') or 'Unknown'
                 
                 # Parse timestamp for better display
                 try:
@@ -8,54 +8,22 @@ import time
 from datetime import datetime, timedelta
 import os
 
-# Economy System
-class EconomySystem:
-    def __init__(self):
-        self.user_balances = {}  # user_id: balance
-        self.daily_claimed = {}  # user_id: last_claim_date
-        
-    def get_balance(self, user_id):
-        return self.user_balances.get(user_id, 100)  # Starting balance: 100 K-coins
-    
-    def add_money(self, user_id, amount):
-        if user_id not in self.user_balances:
-            self.user_balances[user_id] = 100
-        self.user_balances[user_id] += amount
-        return self.user_balances[user_id]
-    
-    def remove_money(self, user_id, amount):
-        if user_id not in self.user_balances:
-            self.user_balances[user_id] = 100
-        self.user_balances[user_id] = max(0, self.user_balances[user_id] - amount)
-        return self.user_balances[user_id]
-    
-    def transfer_money(self, from_user, to_user, amount):
-        if self.get_balance(from_user) >= amount:
-            self.remove_money(from_user, amount)
-            self.add_money(to_user, amount)
-            return True
-        return False
-    
-    def can_claim_daily(self, user_id):
-        today = datetime.now().date()
-        last_claim = self.daily_claimed.get(user_id)
-        return last_claim != today
-    
-    def claim_daily(self, user_id):
-        if self.can_claim_daily(user_id):
-            amount = random.randint(50, 200)
-            self.add_money(user_id, amount)
-            self.daily_claimed[user_id] = datetime.now().date()
-            return amount
-        return 0
-
 # Global instances
-economy = EconomySystem()
 active_games = {}
 
+def expired_bet_embed(result: str) -> discord.Embed:
+    """Reply for a bet whose reservation expired before it was settled; no money moved"""
+    return discord.Embed(
+        title="⏰ Bet Expired",
+        description=f"The result was **{result}**, but your bet expired before it was settled, "
+                    f"so your K-coins were returned.",
+        color=0x95a5a6
+    )
+
 class FunCommandsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.economy = bot.economy
     
     # ============ ECONOMY COMMANDS ============
     
@@ -63,7 +31,7 @@ class FunCommandsCog(commands.Cog):
     async def check_balance(self, ctx, member: discord.Member = None):
         """Check your or someone else's K-coin balance"""
         target = member or ctx.author
-        balance = economy.get_balance(target.id)
+        balance = await self.economy.get_balance(target.id)
         
         embed = discord.Embed(
             title=f"💰 {target.display_name}'s Wallet",
@@ -76,7 +44,7 @@ class FunCommandsCog(commands.Cog):
     async def daily_coins(self, ctx):
         """Claim your daily K-coins"""
         user_id = ctx.author.id
-        amount = economy.claim_daily(user_id)
+        amount = await self.economy.claim_daily(user_id)
         
         if amount > 0:
             embed = discord.Embed(
@@ -86,7 +54,7 @@ class FunCommandsCog(commands.Cog):
             )
             embed.add_field(
                 name="New Balance", 
-                value=f"{economy.get_balance(user_id):,} K-coins", 
+                value=f"{await self.economy.get_balance(user_id):,} K-coins", 
                 inline=False
             )
         else:
@@ -106,7 +74,7 @@ class FunCommandsCog(commands.Cog):
             await ctx.send("Amount must be positive!")
             return
         
-        if economy.transfer_money(ctx.author.id, member.id, amount):
+        if await self.economy.transfer_money(ctx.author.id, member.id, amount):
             embed = discord.Embed(
                 title="💸 Money Transferred",
                 description=f"{ctx.author.mention} gave **{amount:,} K-coins** to {member.mention}",
@@ -114,36 +82,35 @@ class FunCommandsCog(commands.Cog):
             )
             embed.add_field(
                 name=f"{ctx.author.display_name}'s Balance",
-                value=f"{economy.get_balance(ctx.author.id):,} K-coins",
+                value=f"{await self.economy.get_balance(ctx.author.id):,} K-coins",
                 inline=True
             )
             embed.add_field(
                 name=f"{member.display_name}'s Balance",
-                value=f"{economy.get_balance(member.id):,} K-coins",
+                value=f"{await self.economy.get_balance(member.id):,} K-coins",
                 inline=True
             )
         else:
             embed = discord.Embed(
                 title="❌ Insufficient Funds",
-                description=f"You don't have enough K-coins! You have {economy.get_balance(ctx.author.id):,} K-coins.",
+                description=f"You don't have enough K-coins! You have {await self.economy.get_balance(ctx.author.id):,} K-coins.",
                 color=0xe74c3c
             )
     @commands.command(name='richest', aliases=['leaderboard', 'top'])
     async def money_leaderboard(self, ctx):
         """Show the richest users"""
-        if not economy.user_balances:
+        top_users = await self.economy.get_leaderboard(10)
+        if not top_users:
             await ctx.send("No one has any money yet!")
             return
         
-        sorted_users = sorted(economy.user_balances.items(), key=lambda x: x[1], reverse=True)
-        
         embed = discord.Embed(
             title="💎 Richest Users",
             description="Top 10 wealthiest members",
             color=0xf1c40f
         )
         
-        for i, (user_id, balance) in enumerate(sorted_users[:10]):
+        for i, (user_id, balance) in enumerate(top_users):
             try:
                 user = self.bot.get_user(user_id)
                 if user:
@@ -163,7 +130,7 @@ class FunCommandsCog(commands.Cog):
             await ctx.send("Amount must be positive!")
             return
         
-        new_balance = economy.add_money(member.id, amount)
+        new_balance = await self.economy.add_money(member.id, amount)
         
         embed = discord.Embed(
             title="🎁 Money Granted",
@@ -196,10 +163,13 @@ class FunCommandsCog(commands.Cog):
                 description=f"The coin landed on **{result}**!",
                 color=0x3498db
             )
+            await ctx.send(embed=embed)
             return
             
-        user_balance = economy.get_balance(ctx.author.id)
-        if bet > user_balance:
+        # Hold the bet while the player picks a side
+        reservation = await self.economy.reserve(ctx.author.id, bet, kind='flip', timeout=60.0)
+        if reservation is None:
+            user_balance = await self.economy.get_available(ctx.author.id)
             await ctx.send(f"You don't have enough K-coins! You have {user_balance:,} K-coins.")
             return
         
@@ -221,34 +191,39 @@ class FunCommandsCog(commands.Cog):
             choice = 'Heads' if str(reaction.emoji) == '👤' else 'Tails'
             
             won = choice == result
-            if won:
-                winnings = bet * 2
-                economy.add_money(ctx.author.id, winnings)
+            winnings = bet * 2
+            new_balance = self.economy.settle(reservation, bet + winnings if won else 0, reference=result)
+            if new_balance is None:
+                embed = expired_bet_embed(result)
+            elif won:
                 embed = discord.Embed(
                     title="🎉 You Won!",
                     description=f"The coin landed on **{result}**!\nYou won **{winnings:,} K-coins**!",
                     color=0x2ecc71
                 )
             else:
-                economy.remove_money(ctx.author.id, bet)
                 embed = discord.Embed(
                     title="😢 You Lost!",
                     description=f"The coin landed on **{result}**!\nYou lost **{bet:,} K-coins**.",
                     color=0xe74c3c
                 )
             
-            embed.add_field(
-                name="New Balance",
-                value=f"{economy.get_balance(ctx.author.id):,} K-coins",
-                inline=False
-            )
+            if new_balance is not None:
+                embed.add_field(
+                    name="New Balance",
+                    value=f"{new_balance:,} K-coins",
+                    inline=False
+                )
             
         except asyncio.TimeoutError:
+            self.economy.release(reservation)
             embed = discord.Embed(
                 title="⏰ Time's Up",
                 description="You took too long to choose!",
                 color=0x95a5a6
             )
+        
+        await message.edit(embed=embed)
     
     @commands.command(name='slots', aliases=['slot'])
     async def slot_machine(self, ctx, bet: int = 0):
@@ -257,8 +232,9 @@ class FunCommandsCog(commands.Cog):
             await ctx.send("Please specify a bet amount: `!slots 50`")
             return
         
-        user_balance = economy.get_balance(ctx.author.id)
-        if bet > user_balance:
+        reservation = await self.economy.reserve(ctx.author.id, bet, kind='slots')
+        if reservation is None:
+            user_balance = await self.economy.get_available(ctx.author.id)
             await ctx.send(f"You don't have enough K-coins! You have {user_balance:,} K-coins.")
             return
         
@@ -283,16 +259,18 @@ class FunCommandsCog(commands.Cog):
             multiplier = 0
         
         winnings = bet * multiplier
+        new_balance = self.economy.settle(reservation, winnings, reference=''.join(result))
+        if new_balance is None:
+            await ctx.send(embed=expired_bet_embed(''.join(result)))
+            return
         
         if winnings > 0:
-            economy.add_money(ctx.author.id, winnings - bet)  # Subtract original bet
             embed = discord.Embed(
                 title="🎰 SLOT MACHINE",
                 description=f"{''.join(result)}\n\n🎉 **YOU WON {winnings:,} K-COINS!**",
                 color=0x2ecc71
             )
         else:
-            economy.remove_money(ctx.author.id, bet)
             embed = discord.Embed(
                 title="🎰 SLOT MACHINE",
                 description=f"{''.join(result)}\n\n😢 You lost {bet:,} K-coins",
@@ -301,10 +279,11 @@ class FunCommandsCog(commands.Cog):
         
         embed.add_field(
             name="New Balance",
-            value=f"{economy.get_balance(ctx.author.id):,} K-coins",
+            value=f"{new_balance:,} K-coins",
             inline=False
         )
         
+        await ctx.send(embed=embed)
     
     @commands.command(name='dice', aliases=['roll'])
     async def dice_game(self, ctx, sides: int = 6):
@@ -323,7 +302,7 @@ class FunCommandsCog(commands.Cog):
         
         if result == sides:
             bonus = 50
-            economy.add_money(ctx.author.id, bonus)
+            await self.economy.add_money(ctx.author.id, bonus)
             embed.add_field(
                 name="🎉 Perfect Roll Bonus!",
                 value=f"You got the maximum roll and earned {bonus} K-coins!",
@@ -331,7 +310,7 @@ class FunCommandsCog(commands.Cog):
             )
             embed.add_field(
                 name="New Balance",
-                value=f"{economy.get_balance(ctx.author.id):,} K-coins",
+                value=f"{await self.economy.get_balance(ctx.author.id):,} K-coins",
                 inline=False
             )
         
@@ -401,7 +380,7 @@ class FunCommandsCog(commands.Cog):
         )
         
         if reward > 0:
-            economy.add_money(ctx.author.id, reward)
+            await self.economy.add_money(ctx.author.id, reward)
             embed.add_field(
                 name="Reward",
                 value=f"+{reward} K-coins",
@@ -409,7 +388,7 @@ class FunCommandsCog(commands.Cog):
             )
             embed.add_field(
                 name="New Balance",
-                value=f"{economy.get_balance(ctx.author.id):,} K-coins",
+                value=f"{await self.economy.get_balance(ctx.author.id):,} K-coins",
                 inline=True
             )
     # ============ MULTIPLAYER GAMES ============
@@ -501,7 +480,7 @@ class FunCommandsCog(commands.Cog):
                     winner_text = ""
                     for i, winner in enumerate(winners[:5]):  # Top 5 winners
                         points = [50, 30, 20, 15, 10][i] if i < 5 else 5
-                        economy.add_money(winner['user'].id, points)
+                        await self.economy.add_money(winner['user'].id, points)
                         place = ["🥇", "🥈", "🥉", "4th", "5th"][i] if i < 5 else f"{i+1}th"
                         winner_text += f"{place} {winner['user'].display_name} (+{points} K-coins)\n"
                     
@@ -582,7 +561,7 @@ class FunCommandsCog(commands.Cog):
         else:
             points = 25   # Participated
         
-        economy.add_money(winner_data['user'].id, points)
+        await self.economy.add_money(winner_data['user'].id, points)
         
         result_embed.add_field(
             name="Winning Guess",
@@ -639,7 +618,7 @@ class FunCommandsCog(commands.Cog):
             
             # Award winner
             points = random.randint(75, 150)
-            economy.add_money(winner.id, points)
+            await self.economy.add_money(winner.id, points)
             
             result_embed = discord.Embed(
                 title="🏆 Race Winner!",
@@ -653,7 +632,7 @@ class FunCommandsCog(commands.Cog):
             )
             result_embed.add_field(
                 name="New Balance",
-                value=f"{economy.get_balance(winner.id):,} K-coins",
+                value=f"{await self.economy.get_balance(winner.id):,} K-coins",
                 inline=True
             )
             
@@ -735,7 +714,7 @@ class FunCommandsCog(commands.Cog):
             winner_text = ""
             for i, winner in enumerate(winners[:3]):  # Top 3
                 points = [100, 60, 40][i] if i < 3 else 20
-                economy.add_money(winner['user'].id, points)
+                await self.economy.add_money(winner['user'].id, points)
                 place = ["🥇", "🥈", "🥉"][i] if i < 3 else f"{i+1}th"
                 winner_text += f"{place} {winner['user'].display_name} ({winner['time']:.1f}s) +{points} K-coins\n"
             
@@ -789,7 +768,7 @@ class FunCommandsCog(commands.Cog):
             try:
                 bid_message = await self.bot.wait_for('message', timeout=1.0, check=check)
                 bid_amount = int(bid_message.content)
-                user_balance = economy.get_balance(bid_message.author.id)
+                user_balance = await self.economy.get_balance(bid_message.author.id)
                 
                 if bid_amount <= user_balance:
                     current_high = max(bids.values()) if bids else 49
@@ -813,8 +792,8 @@ class FunCommandsCog(commands.Cog):
         winner = self.bot.get_user(winner_id)
         
         # Process payment
-        economy.remove_money(winner_id, winning_bid)
-        economy.add_money(winner_id, prize["value"])
+        await self.economy.remove_money(winner_id, winning_bid, kind='auction_bid')
+        await self.economy.add_money(winner_id, prize["value"], kind='auction_prize')
         
         result_embed = discord.Embed(
             title="🏆 Auction Results",
@@ -837,12 +816,12 @@ class FunCommandsCog(commands.Cog):
         
         result_embed.add_field(
             name="New Balance",
-            value=f"{economy.get_balance(winner_id):,} K-coins",
+            value=f"{await self.economy.get_balance(winner_id):,} K-coins",
             inline=True
         )
         
         await ctx.send(embed=result_embed)
 
 # Function to add to your bot
-def setup(bot):
-    bot.add_cog(FunCommandsCog(bot))
+async def setup(bot):
+    await bot.add_cog(FunCommandsCog(bot))
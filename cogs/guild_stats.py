@@ -0,0 +1,66 @@
+import discord
+from discord.ext import commands
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GuildStatsCog(commands.Cog):
+    """Keeps the bot's guild stats aggregator in step with gateway events."""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.guild_stats = bot.guild_stats
+    
+    async def cog_load(self):
+        """Count guilds that are already available, e.g. after a reload."""
+        for guild in self.bot.guilds:
+            self.guild_stats.rebuild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        """Count a guild in full once its members are cached."""
+        self.guild_stats.rebuild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.guild_stats.rebuild(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.guild_stats.forget_guild(guild.id)
+    
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        if (before.premium_subscription_count, before.premium_tier) != (after.premium_subscription_count, after.premium_tier):
+            self.guild_stats.guild_updated(after)
+    
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.guild_stats.member_joined(member)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.guild_stats.member_left(member)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.guild_stats.channel_created(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.guild_stats.channel_deleted(channel)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        self.guild_stats.channel_updated(before, after)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.guild_stats.role_created(role)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.guild_stats.role_deleted(role)
+
+async def setup(bot):
+    await bot.add_cog(GuildStatsCog(bot))
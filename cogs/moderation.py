@@ -13,6 +13,12 @@ class Moderation(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     
+    async def _record_action(self, guild_id: int, user_id: int, moderator_id: int,
+                             action: str, reason: str, duration: Optional[int] = None):
+        """Log a moderation action to the database and push it to live dashboards"""
+        await self.bot.db.add_moderation_log(guild_id, user_id, moderator_id, action, reason, duration)
+        self.bot.live_feed.publish_moderation(guild_id, action, user_id, moderator_id, reason, duration)
+    
     @app_commands.command(name="kick", description="Kick a member from the server")
     @app_commands.describe(
         member="The member to kick",
@@ -57,7 +63,7 @@ class Moderation(commands.Cog):
             await member.kick(reason=f"{reason} | Moderator: {interaction.user}")
             
             # Log to database
-            await self.bot.db.add_moderation_log(
+            await self._record_action(
                 interaction.guild.id,
                 member.id,
                 interaction.user.id,
@@ -130,7 +136,7 @@ class Moderation(commands.Cog):
             await member.ban(reason=f"{reason} | Moderator: {interaction.user}", delete_message_days=delete_days)
             
             # Log to database
-            await self.bot.db.add_moderation_log(
+            await self._record_action(
                 interaction.guild.id,
                 member.id,
                 interaction.user.id,
@@ -181,7 +187,7 @@ class Moderation(commands.Cog):
             await interaction.guild.unban(user, reason=f"{reason} | Moderator: {interaction.user}")
             
             # Log to database
-            await self.bot.db.add_moderation_log(
+            await self._record_action(
                 interaction.guild.id,
                 user.id,
                 interaction.user.id,
@@ -250,7 +256,7 @@ class Moderation(commands.Cog):
             await member.timeout(until, reason=f"{reason} | Moderator: {interaction.user}")
             
             # Log to database
-            await self.bot.db.add_moderation_log(
+            await self._record_action(
                 interaction.guild.id,
                 member.id,
                 interaction.user.id,
@@ -298,7 +304,7 @@ class Moderation(commands.Cog):
             await member.timeout(None, reason=f"{reason} | Moderator: {interaction.user}")
             
             # Log to database
-            await self.bot.db.add_moderation_log(
+            await self._record_action(
                 interaction.guild.id,
                 member.id,
                 interaction.user.id,
@@ -338,10 +344,10 @@ class Moderation(commands.Cog):
         
         # Add warning to database
         await self.bot.db.add_warning(interaction.guild.id, member.id, interaction.user.id, reason)
-        
+        self.bot.live_feed.publish_moderation(interaction.guild.id, "warn", member.id, interaction.user.id, reason)
+
         # Get total warnings for user
-        warnings = await self.bot.db.get_user_warnings(interaction.guild.id, member.id)
-        warning_count = len(warnings)
+        warning_count = await self.bot.db.count_user_warnings(interaction.guild.id, member.id)
         
         # Send DM to user
         try:
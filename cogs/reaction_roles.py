@@ -33,7 +33,7 @@ class ReactionRoles(commands.Cog):
             return
         
         try:
-            await member.add_roles(role, reason="Reaction role")
+            await self.bot.role_queue.add_roles(member, role, reason="Reaction role")
         except discord.Forbidden:
             pass  # Missing permissions
         except Exception as e:
@@ -63,7 +63,7 @@ class ReactionRoles(commands.Cog):
             return
         
         try:
-            await member.remove_roles(role, reason="Reaction role removed")
+            await self.bot.role_queue.remove_roles(member, role, reason="Reaction role removed")
         except discord.Forbidden:
             pass  # Missing permissions
         except Exception as e:
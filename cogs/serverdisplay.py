@@ -30,6 +30,7 @@ class ServerDisplayCommand(commands.Cog):
                 return
             
             guild = interaction.guild
+            stats = self.bot.guild_stats.snapshot(guild)
             
             # Create embed with server information
             embed = discord.Embed(
@@ -76,13 +77,14 @@ class ServerDisplayCommand(commands.Cog):
             # Member count
             embed.add_field(
                 name="👥 Members",
-                value=f"{guild.member_count:,}" if guild.member_count else "Unknown",
+                value=f"{stats['member_count']:,}\n({stats['bot_count']:,} bots)" if stats['member_count'] else "Unknown",
                 inline=True
             )
             
             # Channel counts
-            text_channels = len([c for c in guild.channels if isinstance(c, discord.TextChannel)])
-            voice_channels = len([c for c in guild.channels if isinstance(c, discord.VoiceChannel)])
+            channels = stats['channels']
+            text_channels = channels.get('text', 0) + channels.get('news', 0)
+            voice_channels = channels.get('voice', 0)
             embed.add_field(
                 name="📝 Channels",
                 value=f"Text: {text_channels}\nVoice: {voice_channels}",
@@ -92,15 +94,15 @@ class ServerDisplayCommand(commands.Cog):
             # Role count
             embed.add_field(
                 name="🎭 Roles",
-                value=f"{len(guild.roles):,}",
+                value=f"{stats['role_count']:,}",
                 inline=True
             )
             
             # Boost information
-            if guild.premium_tier > 0:
+            if stats['boost_tier'] > 0:
                 embed.add_field(
                     name="⭐ Boost Level",
-                    value=f"Level {guild.premium_tier}\n{guild.premium_subscription_count} boosts",
+                    value=f"Level {stats['boost_tier']}\n{stats['boost_count']} boosts",
                     inline=True
                 )
             
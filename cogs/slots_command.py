@@ -265,9 +265,8 @@ class TradeView(discord.ui.View):
     async def execute_trade(self, interaction: discord.Interaction):
         """Execute the confirmed trade."""
         try:
-            # Final balance check
-            sender_balance = self.cog.get_user_balance(self.sender.id)
-            if sender_balance < self.amount:
+            # Transfer only succeeds if the sender can still cover it
+            if not await self.cog.wallet.transfer_money(self.sender.id, self.receiver.id, self.amount):
                 embed = discord.Embed(
                     title="❌ Trade Failed",
                     description=f"**{self.sender.display_name}** no longer has enough pixels to complete the trade!",
@@ -277,12 +276,8 @@ class TradeView(discord.ui.View):
                 await interaction.response.edit_message(embed=embed, view=None)
                 return
             
-            # Execute the trade
-            self.cog.update_user_balance(self.sender.id, -self.amount)
-            self.cog.update_user_balance(self.receiver.id, self.amount)
-            
-            sender_new_balance = self.cog.get_user_balance(self.sender.id)
-            receiver_new_balance = self.cog.get_user_balance(self.receiver.id)
+            sender_new_balance = await self.cog.wallet.get_balance(self.sender.id)
+            receiver_new_balance = await self.cog.wallet.get_balance(self.receiver.id)
             
             embed = discord.Embed(
                 title="✅ Trade Completed!",
@@ -344,24 +339,9 @@ class SlotsCommand(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.game = SlotsGame()
-        self.user_balances = {}  # Simple in-memory balance system
+        self.wallet = bot.pixels  # Shared pixel wallet
         self.spinning_users = set()  # Track users currently spinning
         self.active_trades = {}  # Track active trades
-        
-        # Default starting balance
-        self.starting_balance = 1000
-    
-    def get_user_balance(self, user_id: int) -> int:
-        """Get user's pixel balance."""
-        if user_id not in self.user_balances:
-            self.user_balances[user_id] = self.starting_balance
-        return self.user_balances[user_id]
-    
-    def update_user_balance(self, user_id: int, amount: int):
-        """Update user's pixel balance."""
-        if user_id not in self.user_balances:
-            self.user_balances[user_id] = self.starting_balance
-        self.user_balances[user_id] += amount
     
     def is_admin(self, member: discord.abc.User) -> bool:
         """Check if user has admin permissions."""
@@ -375,6 +355,7 @@ class SlotsCommand(commands.Cog):
     )
     async def slots(self, interaction: discord.Interaction, bet: int = 50):
         """Play the slots game with pixel betting."""
+        reservation = None
         try:
             # Check if user is already spinning
             if interaction.user.id in self.spinning_users:
@@ -403,9 +384,10 @@ class SlotsCommand(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
             
-            # Check if user has enough balance
-            current_balance = self.get_user_balance(interaction.user.id)
-            if current_balance < bet:
+            # Hold the bet so it can't be spent elsewhere while spinning
+            current_balance = await self.wallet.get_available(interaction.user.id)
+            reservation = await self.wallet.reserve(interaction.user.id, bet, kind='slots')
+            if reservation is None:
                 embed = discord.Embed(
                     title="💸 Insufficient Pixels",
                     description=f"You don't have enough pixels to bet **{bet:,}**!",
@@ -478,13 +460,10 @@ class SlotsCommand(commands.Cog):
             result = self.game.spin_slots()
             payout_info = self.game.calculate_payout(result, bet)
             
-            # Update balance
-            if payout_info["payout"] > 0:
-                self.update_user_balance(interaction.user.id, payout_info["payout"] - bet)
-                new_balance = self.get_user_balance(interaction.user.id)
-            else:
-                self.update_user_balance(interaction.user.id, -bet)
-                new_balance = self.get_user_balance(interaction.user.id)
+            # Settle the bet in memory; the ledger persists it in the next batch
+            new_balance = self.wallet.settle(reservation, payout_info["payout"], reference="".join(result))
+            if new_balance is None:
+                raise RuntimeError("Slots reservation expired before settling")
             
             # Create result embed
             result_embed = self.game.get_result_embed(
@@ -502,6 +481,8 @@ class SlotsCommand(commands.Cog):
         except Exception as e:
             logging.error(f"Error in slots command: {e}")
             self.spinning_users.discard(interaction.user.id)
+            if reservation:
+                self.wallet.release(reservation)
             
             embed = discord.Embed(
                 title="❌ Error",
@@ -549,11 +530,10 @@ class SlotsCommand(commands.Cog):
                 return
             
             # Get current balance
-            old_balance = self.get_user_balance(user.id)
+            old_balance = await self.wallet.get_balance(user.id)
             
             # Add pixels
-            self.update_user_balance(user.id, amount)
-            new_balance = self.get_user_balance(user.id)
+            new_balance = await self.wallet.add_money(user.id, amount, kind='grant', reference=str(interaction.user.id))
             
             # Create success embed
             embed = discord.Embed(
@@ -648,7 +628,7 @@ class SlotsCommand(commands.Cog):
                 return
             
             # Check if sender has enough balance
-            sender_balance = self.get_user_balance(interaction.user.id)
+            sender_balance = await self.wallet.get_available(interaction.user.id)
             if sender_balance < amount:
                 embed = discord.Embed(
                     title="💸 Insufficient Pixels",
@@ -677,7 +657,7 @@ class SlotsCommand(commands.Cog):
                 return
             
             # Get receiver balance for display
-            receiver_balance = self.get_user_balance(user.id)
+            receiver_balance = await self.wallet.get_balance(user.id)
             
             # Create trade embed
             embed = discord.Embed(
@@ -751,7 +731,7 @@ class SlotsCommand(commands.Cog):
         """Check pixel balance for yourself or another user."""
         try:
             target_user = user if user else interaction.user
-            balance = self.get_user_balance(target_user.id)
+            balance = await self.wallet.get_balance(target_user.id)
             
             if target_user.id == interaction.user.id:
                 title = "💳 Your Balance"
@@ -815,14 +795,26 @@ if __name__ == "__main__":
             print(f'Failed to sync commands: {e}')
     
     async def main():
-        async with bot:
-            await bot.add_cog(SlotsCommand(bot))
-            # You need to replace 'YOUR_BOT_TOKEN' with your actual bot token
-            token = os.getenv('DISCORD_BOT_TOKEN')
-            if not token:
-                print("Error: Please set your DISCORD_BOT_TOKEN environment variable")
-                return
-            await bot.start(token)
+        from database import Database
+        from utils.economy import EconomyLedger
+        
+        db = Database()
+        await db.init_db()
+        bot.pixels = EconomyLedger(db.db_path, currency='pixels', starting_balance=1000)
+        await bot.pixels.start()
+        
+        try:
+            async with bot:
+                await bot.add_cog(SlotsCommand(bot))
+                # You need to replace 'YOUR_BOT_TOKEN' with your actual bot token
+                token = os.getenv('DISCORD_BOT_TOKEN')
+                if not token:
+                    print("Error: Please set your DISCORD_BOT_TOKEN environment variable")
+                    return
+                await bot.start(token)
+        finally:
+            await bot.pixels.close()
+            await db.conn.close()
     
     import asyncio
     asyncio.run(main())
@@ -4,7 +4,6 @@ Unwarn command for Discord moderation bot.
 
 import discord
 from discord.ext import commands
-import json
 from utils.permissions import has_moderation_permissions
 from utils.logging_config import setup_logging
 
@@ -15,20 +14,6 @@ class UnwarnCommand(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.warnings_file = 'data/warnings.json'
-    
-    def load_warnings(self):
-        """Load warnings from JSON file."""
-        try:
-            with open(self.warnings_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-    
-    def save_warnings(self, warnings):
-        """Save warnings to JSON file."""
-        with open(self.warnings_file, 'w') as f:
-            json.dump(warnings, f, indent=2)
     
     @commands.command(name='unwarn')
     @commands.guild_only()
@@ -45,47 +30,18 @@ class UnwarnCommand(commands.Cog):
             return
         
         try:
-            # Load warnings
-            warnings = self.load_warnings()
-            
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
-            
-            # Check if guild and user have warnings
-            if guild_id not in warnings or user_id not in warnings[guild_id]:
+            # Check if user has warnings
+            if not await self.bot.db.count_user_warnings(ctx.guild.id, member.id):
                 await ctx.send(f"❌ **{member}** has no warnings to remove.")
                 return
             
-            user_warnings = warnings[guild_id][user_id]
-            
-            # Find warning with the given ID
-            warning_to_remove = None
-            warning_index = None
-            
-            for index, warning in enumerate(user_warnings):
-                if warning['id'] == warning_id:
-                    warning_to_remove = warning
-                    warning_index = index
-                    break
+            # Remove the warning with the given ID
+            warning_to_remove = await self.bot.db.remove_warning(ctx.guild.id, member.id, warning_id)
             
             if warning_to_remove is None:
                 await ctx.send(f"❌ Warning ID {warning_id} not found for **{member}**.")
                 return
             
-            # Remove the warning
-            user_warnings.pop(warning_index)
-            
-            # If no warnings left, remove user entry
-            if not user_warnings:
-                del warnings[guild_id][user_id]
-                
-                # If no users left in guild, remove guild entry
-                if not warnings[guild_id]:
-                    del warnings[guild_id]
-            
-            # Save updated warnings
-            self.save_warnings(warnings)
-            
             # Try to send DM to user
             try:
                 embed = discord.Embed(
@@ -107,12 +63,12 @@ class UnwarnCommand(commands.Cog):
                 color=0x00ff00
             )
             embed.add_field(name="Original Warning", value=warning_to_remove['reason'], inline=False)
-            embed.add_field(name="Original Moderator", value=warning_to_remove.get('moderator_name', 'Unknown'), inline=False)
+            embed.add_field(name="Original Moderator", value=f"<@{warning_to_remove['moderator_id']}>", inline=False)
             embed.add_field(name="Removal Reason", value=reason, inline=False)
             embed.add_field(name="Removed by", value=ctx.author.mention, inline=False)
             
             # Show remaining warnings count
-            remaining_warnings = len(warnings.get(guild_id, {}).get(user_id, []))
+            remaining_warnings = await self.bot.db.count_user_warnings(ctx.guild.id, member.id)
             embed.add_field(name="Remaining Warnings", value=remaining_warnings, inline=False)
             
             await ctx.send(embed=embed)
@@ -141,30 +97,13 @@ class UnwarnCommand(commands.Cog):
             return
         
         try:
-            # Load warnings
-            warnings = self.load_warnings()
-            
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
+            # Remove all warnings for the user
+            warning_count = await self.bot.db.clear_user_warnings(ctx.guild.id, member.id)
             
-            # Check if guild and user have warnings
-            if guild_id not in warnings or user_id not in warnings[guild_id]:
+            if not warning_count:
                 await ctx.send(f"❌ **{member}** has no warnings to clear.")
                 return
             
-            user_warnings = warnings[guild_id][user_id]
-            warning_count = len(user_warnings)
-            
-            # Remove all warnings for the user
-            del warnings[guild_id][user_id]
-            
-            # If no users left in guild, remove guild entry
-            if not warnings[guild_id]:
-                del warnings[guild_id]
-            
-            # Save updated warnings
-            self.save_warnings(warnings)
-            
             # Try to send DM to user
             try:
                 embed = discord.Embed(
@@ -4,8 +4,6 @@ Warn command for Discord moderation bot.
 
 import discord
 from discord.ext import commands
-import json
-import os
 from datetime import datetime
 from utils.permissions import has_moderation_permissions
 from utils.logging_config import setup_logging
@@ -17,21 +15,6 @@ class WarnCommand(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.warnings_file = 'data/warnings.json'
-    
-    def load_warnings(self):
-        """Load warnings from JSON file."""
-        try:
-            with open(self.warnings_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-    
-    def save_warnings(self, warnings):
-        """Save warnings to JSON file."""
-        os.makedirs('data', exist_ok=True)
-        with open(self.warnings_file, 'w') as f:
-            json.dump(warnings, f, indent=2)
     
     @commands.command(name='warn')
     @commands.guild_only()
@@ -63,36 +46,11 @@ class WarnCommand(commands.Cog):
             return
         
         try:
-            # Load existing warnings
-            warnings = self.load_warnings()
-            
-            # Initialize guild and user data if not exists
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
-            
-            if guild_id not in warnings:
-                warnings[guild_id] = {}
-            
-            if user_id not in warnings[guild_id]:
-                warnings[guild_id][user_id] = []
-            
-            # Create warning entry
-            warning_data = {
-                'id': len(warnings[guild_id][user_id]) + 1,
-                'reason': reason,
-                'moderator': str(ctx.author.id),
-                'moderator_name': str(ctx.author),
-                'timestamp': datetime.utcnow().isoformat()
-            }
-            
             # Add warning
-            warnings[guild_id][user_id].append(warning_data)
-            
-            # Save warnings
-            self.save_warnings(warnings)
+            warning_id = await self.bot.db.add_warning(ctx.guild.id, member.id, ctx.author.id, reason)
             
             # Get total warnings count
-            total_warnings = len(warnings[guild_id][user_id])
+            total_warnings = await self.bot.db.count_user_warnings(ctx.guild.id, member.id)
             
             # Try to send DM to user
             try:
@@ -114,7 +72,7 @@ class WarnCommand(commands.Cog):
                 description=f"**{member}** has been warned",
                 color=0x00ff00
             )
-            embed.add_field(name="Warning ID", value=warning_data['id'], inline=True)
+            embed.add_field(name="Warning ID", value=warning_id, inline=True)
             embed.add_field(name="Total Warnings", value=total_warnings, inline=True)
             embed.add_field(name="Reason", value=reason, inline=False)
             embed.add_field(name="Moderator", value=ctx.author.mention, inline=False)
@@ -146,14 +104,8 @@ class WarnCommand(commands.Cog):
             return
         
         try:
-            # Load warnings
-            warnings = self.load_warnings()
-            
-            guild_id = str(ctx.guild.id)
-            user_id = str(member.id)
-            
-            # Get user warnings
-            user_warnings = warnings.get(guild_id, {}).get(user_id, [])
+            # Get user warnings (newest first)
+            user_warnings = await self.bot.db.get_user_warnings(ctx.guild.id, member.id)
             
             if not user_warnings:
                 await ctx.send(f"✅ **{member}** has no warnings.")
@@ -167,9 +119,9 @@ class WarnCommand(commands.Cog):
             )
             
             # Add warning fields (limit to last 10)
-            for warning in user_warnings[-10:]:
-                moderator_name = warning.get('moderator_name', 'Unknown')
-                timestamp = warning.get('timestamp', 'Unknown')
+            for warning in user_warnings[:10]:
+                moderator_name = f"<@{warning['moderator_id']}>"
+                timestamp = warning.get('created_at') or 'Unknown'
                 
                 # Parse timestamp for better display
                 try:
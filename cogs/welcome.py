@@ -27,7 +27,7 @@ class Welcome(commands.Cog):
             role = member.guild.get_role(auto_role_id)
             if role and role < member.guild.me.top_role:
                 try:
-                    await member.add_roles(role, reason="Auto-role on join")
+                    await self.bot.role_queue.add_roles(member, role, reason="Auto-role on join")
                 except discord.Forbidden:
                     pass  # No permission
         
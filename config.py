@@ -15,6 +15,12 @@ class Config:
     DISCORD_CLIENT_ID = os.getenv('DISCORD_CLIENT_ID')
     DISCORD_CLIENT_SECRET = os.getenv('DISCORD_CLIENT_SECRET')
     DISCORD_REDIRECT_URI = os.getenv('DISCORD_REDIRECT_URI', 'http://localhost:5000/callback')
+    DASHBOARD_HOST = os.getenv('DASHBOARD_HOST', '0.0.0.0')
+    DASHBOARD_PORT = int(os.getenv('DASHBOARD_PORT', 5000))
+    DASHBOARD_SESSION_HOURS = int(os.getenv('DASHBOARD_SESSION_HOURS', 24))  # Idle hours before a dashboard login expires
+    DASHBOARD_GUILDS_REFRESH = int(os.getenv('DASHBOARD_GUILDS_REFRESH', 300))  # Seconds a user's guild list is cached
+    DASHBOARD_GUILDS_MAX_STALE = int(os.getenv('DASHBOARD_GUILDS_MAX_STALE', 900))  # Seconds a cached guild list outlives failed refreshes
+    COG_LOADER_STATE = os.getenv('COG_LOADER_STATE', '.cog_loader.json')  # Cached cog scans and the last synced command tree
     
     # AutoMod settings
     SPAM_THRESHOLD = 5  # Messages per 10 seconds
@@ -22,8 +28,20 @@ class Config:
     MAX_MENTIONS = 5    # Max mentions per message
     MAX_LINKS = 3       # Max links per message
     
+    # Alt detection settings
+    ALT_SCAN_MAX_CONCURRENT = int(os.getenv('ALT_SCAN_MAX_CONCURRENT', 2))  # Scans running at once, all guilds
+    ALT_ANALYSIS_WORKERS = int(os.getenv('ALT_ANALYSIS_WORKERS', 0)) or None  # Worker processes (default: up to 5, one per analysis)
+    ALT_ANALYSIS_TIMEOUT = float(os.getenv('ALT_ANALYSIS_TIMEOUT', 600))  # Seconds before a stuck analysis is killed
+    ALT_ANALYSIS_CACHE_HOURS = int(os.getenv('ALT_ANALYSIS_CACHE_HOURS', 6))  # Hours a scan result is reused for an unchanged guild
+    ALT_JOIN_RISK_THRESHOLD = int(os.getenv('ALT_JOIN_RISK_THRESHOLD', 60))  # Join risk score logged to the mod log (0-100)
+    
     # Logging settings
     LOG_CHANNEL_NAME = 'mod-logs'
+    LOG_WEBHOOKS = os.getenv('LOG_WEBHOOKS', 'false').lower() == 'true'  # Deliver logs through a webhook per log channel
+    SNAPSHOT_MAX_PER_GUILD = int(os.getenv('SNAPSHOT_MAX_PER_GUILD', 5000))  # Messages kept in memory per guild for edit/delete logs
+    SNAPSHOT_MAX_PER_CHANNEL = int(os.getenv('SNAPSHOT_MAX_PER_CHANNEL', 1000))  # Messages kept in memory per channel
+    SNAPSHOT_MEMORY_MB = int(os.getenv('SNAPSHOT_MEMORY_MB', 64))  # Memory budget for all snapshots
+    SNAPSHOT_SPILL_PATH = os.getenv('SNAPSHOT_SPILL_PATH', 'message_snapshots.db')  # Evicted snapshots go here (empty disables)
     
     # Starboard settings
     STARBOARD_THRESHOLD = 3  # Minimum stars required
@@ -46,3 +64,6 @@ class Config:
     # Rate limiting
     RATE_LIMIT_COMMANDS = 5  # Commands per minute
     RATE_LIMIT_WINDOW = 60   # Window in seconds
+
+# Channel IDs where /serveraltcheck may not be run (comma-separated in ALT_EXCLUDED_CHANNELS)
+EXCLUDED_CHANNELS = {int(channel_id) for channel_id in os.getenv('ALT_EXCLUDED_CHANNELS', '').split(',') if channel_id.strip()}
@@ -55,6 +55,9 @@ class Dashboard {
             // Load guild stats
             await this.loadGuildStats();
             
+            // Stream moderation events and live stats
+            this.connectLiveFeed();
+            
             // Populate dropdown options
             await this.loadChannelOptions();
             await this.loadRoleOptions();
@@ -203,6 +206,47 @@ class Dashboard {
         if (channelCount) channelCount.textContent = stats.channel_count || 'N/A';
     }
 
+    connectLiveFeed() {
+        if (!window.EventSource || !this.currentGuildId) return;
+        if (this.liveFeed) this.liveFeed.close();
+
+        // EventSource reconnects by itself when the stream drops
+        this.liveFeed = new EventSource(`/api/guild/${this.currentGuildId}/live`);
+        this.liveFeed.addEventListener('stats', (e) => this.updateLiveStats(JSON.parse(e.data)));
+        this.liveFeed.addEventListener('moderation', (e) => this.addLiveEvent('moderation', JSON.parse(e.data)));
+        this.liveFeed.addEventListener('automod', (e) => this.addLiveEvent('automod', JSON.parse(e.data)));
+    }
+
+    updateLiveStats(stats) {
+        const memberCount = document.getElementById('member-count');
+        const joinRate = document.getElementById('join-rate');
+        const latency = document.getElementById('gateway-latency');
+
+        if (memberCount) memberCount.textContent = stats.member_count;
+        if (joinRate) joinRate.textContent = stats.joins_per_minute;
+        if (latency) latency.textContent = stats.latency_ms === null ? 'N/A' : `${stats.latency_ms} ms`;
+    }
+
+    addLiveEvent(type, event) {
+        const list = document.getElementById('live-events');
+        if (!list) return;
+
+        const time = new Date(event.timestamp * 1000).toLocaleTimeString();
+        const item = document.createElement('li');
+        item.className = 'list-group-item small';
+        if (type === 'automod') {
+            item.textContent = `${time} AutoMod: ${event.user} - ${event.violations.join(', ')} (${event.actions.join(', ')})`;
+        } else {
+            item.textContent = `${time} ${event.action}: user ${event.user_id} by ${event.moderator_id} - ${event.reason}`;
+        }
+
+        // Newest first, keep the last 50
+        list.prepend(item);
+        while (list.children.length > 50) {
+            list.removeChild(list.lastChild);
+        }
+    }
+
     async saveGeneralSettings(form) {
         const formData = new FormData(form);
         const settings = Object.fromEntries(formData);
@@ -264,23 +308,25 @@ class Dashboard {
     async saveSettings(settings, successMessage) {
         try {
             const response = await fetch(`/api/guild/${this.currentGuildId}/settings`, {
-                method: 'POST',
+                method: 'PATCH',
                 headers: {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify(settings)
             });
 
+            const result = await response.json().catch(() => ({}));
+
             if (!response.ok) {
-                throw new Error('Failed to save settings');
+                // Validation errors name each rejected field
+                const fields = result.fields ? Object.entries(result.fields).map(([key, error]) => `${key} ${error}`) : [];
+                throw new Error(fields.length ? fields.join(', ') : (result.error || 'Failed to save settings'));
             }
-
-            const result = await response.json();
             
             if (result.success) {
                 this.showAlert(successMessage, 'success');
-                // Update local settings
-                Object.assign(this.settings, settings);
+                // Saved values as the server stored them
+                this.settings = result.settings;
             } else {
                 throw new Error(result.error || 'Unknown error');
             }
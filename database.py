@@ -1,19 +1,47 @@
 import aiosqlite
+import asyncio
 import json
 import logging
-from typing import Optional, List, Dict, Any
+import os
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 
+from utils.event_codec import encode_event, decode_event
+from utils.guild_settings import (
+    SETTINGS_COLUMNS, settings_etag, settings_from_row, validate_settings_patch
+)
+
+BUSY_TIMEOUT = 30.0  # Seconds a connection waits for another connection's write lock
+
+def _legacy_warning_row(guild_id: str, user_id: str, warning: Dict[str, Any]) -> Tuple[int, int, int, Optional[str], str]:
+    """Convert one entry of the old warnings.json to a warnings row; raises on malformed entries"""
+    created_at = warning.get('timestamp') or datetime.utcnow().isoformat()
+    # Reject timestamps SQLite couldn't compare, rather than storing them
+    created_at = datetime.fromisoformat(created_at.replace('Z', '')).strftime('%Y-%m-%d %H:%M:%S')
+    reason = warning.get('reason')
+    return (
+        int(guild_id),
+        int(user_id),
+        int(warning.get('moderator') or 0),
+        str(reason) if reason is not None else None,
+        created_at
+    )
+
 class Database:
     """Database handler for the bot"""
     
     def __init__(self, db_path: str = 'bot_database.db'):
         self.db_path = db_path
         self.conn = None
+        self.settings_cache: Dict[int, Tuple[Dict[str, Any], str]] = {}  # guild_id: (settings, etag)
     
     async def init_db(self):
         """Initialize the database with required tables"""
-        self.conn = await aiosqlite.connect(self.db_path)
+        self.conn = await aiosqlite.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        
+        # The economy ledgers write to this file over their own connections; WAL lets readers
+        # and one writer proceed together, and the timeout makes writers queue instead of failing
+        await self.conn.execute('PRAGMA journal_mode = WAL')
         
         # Enable foreign keys
         await self.conn.execute('PRAGMA foreign_keys = ON')
@@ -208,7 +236,34 @@ class Database:
             )
         ''')
 
+        # Economy - Cached balances per currency
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS economy_balances (
+                currency TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                balance INTEGER NOT NULL DEFAULT 0,
+                last_daily TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (currency, user_id)
+            )
+        ''')
+
+        # Economy - Append-only transaction ledger
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS economy_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                currency TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                balance_after INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                reference TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
         # Create indexes
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_warnings_guild_user ON warnings(guild_id, user_id)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_members_guild_id ON alt_members(guild_id)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_members_created_at ON alt_members(created_at)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_analysis_guild_id ON alt_analysis_results(guild_id)')
@@ -216,9 +271,67 @@ class Database:
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_pattern_guild_type ON alt_pattern_cache(guild_id, pattern_type)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_timing_member_id ON alt_message_timing(member_id)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_timing_guild_id ON alt_message_timing(guild_id)')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_economy_balances_rank ON economy_balances(currency, balance DESC)')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_economy_transactions_user ON economy_transactions(currency, user_id)')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_event_logs_guild ON event_logs(guild_id, id)')
 
         await self.conn.commit()
     
+    # Guild settings methods
+    async def _load_guild_settings(self, guild_id: int) -> Tuple[Dict[str, Any], str]:
+        """Read a guild's settings row into the cache"""
+        async with self.conn.execute(
+            f"SELECT {', '.join(SETTINGS_COLUMNS)} FROM guild_settings WHERE guild_id = ?", (guild_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        
+        settings = settings_from_row(row)
+        entry = self.settings_cache[guild_id] = (settings, settings_etag(settings))
+        return entry
+    
+    async def get_guild_settings(self, guild_id: int) -> Dict[str, Any]:
+        """Get a guild's settings, with defaults for guilds that never saved any"""
+        entry = self.settings_cache.get(guild_id) or await self._load_guild_settings(guild_id)
+        return dict(entry[0])
+    
+    async def get_guild_settings_etag(self, guild_id: int) -> str:
+        """Get the ETag of a guild's current settings"""
+        entry = self.settings_cache.get(guild_id) or await self._load_guild_settings(guild_id)
+        return entry[1]
+    
+    async def update_guild_settings(self, guild_id: int, patch: Dict[str, Any]) -> str:
+        """Validate and apply a partial settings update in one statement; returns the new ETag.
+        
+        Raises SettingsError without writing anything if any field is invalid.
+        """
+        settings = validate_settings_patch(patch)
+        if not settings:
+            return await self.get_guild_settings_etag(guild_id)
+        
+        columns = list(settings)
+        try:
+            await self.conn.execute(f'''
+                INSERT INTO guild_settings (guild_id, {', '.join(columns)})
+                VALUES (?, {', '.join('?' for _ in columns)})
+                ON CONFLICT(guild_id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in columns)}
+            ''', (guild_id, *settings.values()))
+            await self.conn.commit()
+        except Exception:
+            await self.conn.rollback()
+            raise
+        
+        _, etag = await self._load_guild_settings(guild_id)
+        return etag
+    
+    async def update_guild_setting(self, guild_id: int, key: str, value: Any) -> str:
+        """Update a single guild setting"""
+        return await self.update_guild_settings(guild_id, {key: value})
+    
+    async def init_guild(self, guild_id: int):
+        """Create the settings row of a new guild"""
+        await self.conn.execute('INSERT OR IGNORE INTO guild_settings (guild_id) VALUES (?)', (guild_id,))
+        await self.conn.commit()
+    
     # Moderation methods
     async def add_moderation_log(self, guild_id: int, user_id: int, moderator_id: int, 
                                 action: str, reason: str, duration: Optional[int] = None):
@@ -229,25 +342,106 @@ class Database:
         ''', (guild_id, user_id, moderator_id, action, reason, duration))
         await self.conn.commit()
     
-    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str):
-        """Add a warning to a user"""
-        await self.conn.execute('''
+    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> int:
+        """Add a warning to a user and return its ID"""
+        cursor = await self.conn.execute('''
             INSERT INTO warnings (guild_id, user_id, moderator_id, reason)
             VALUES (?, ?, ?, ?)
         ''', (guild_id, user_id, moderator_id, reason))
         await self.conn.commit()
+        return cursor.lastrowid
     
     async def get_user_warnings(self, guild_id: int, user_id: int) -> List[Dict[str, Any]]:
         """Get all warnings for a user"""
         cursor = await self.conn.execute('''
             SELECT * FROM warnings WHERE guild_id = ? AND user_id = ?
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
         ''', (guild_id, user_id))
         rows = await cursor.fetchall()
         
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in rows]
     
+    async def count_user_warnings(self, guild_id: int, user_id: int) -> int:
+        """Count warnings for a user"""
+        cursor = await self.conn.execute('''
+            SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?
+        ''', (guild_id, user_id))
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+    
+    async def remove_warning(self, guild_id: int, user_id: int, warning_id: int) -> Optional[Dict[str, Any]]:
+        """Remove a single warning and return it, or None if it doesn't exist"""
+        cursor = await self.conn.execute('''
+            SELECT * FROM warnings WHERE id = ? AND guild_id = ? AND user_id = ?
+        ''', (warning_id, guild_id, user_id))
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        
+        columns = [desc[0] for desc in cursor.description]
+        await self.conn.execute('DELETE FROM warnings WHERE id = ?', (warning_id,))
+        await self.conn.commit()
+        return dict(zip(columns, row))
+    
+    async def clear_user_warnings(self, guild_id: int, user_id: int) -> int:
+        """Remove all warnings for a user and return how many were removed"""
+        cursor = await self.conn.execute('''
+            DELETE FROM warnings WHERE guild_id = ? AND user_id = ?
+        ''', (guild_id, user_id))
+        await self.conn.commit()
+        return cursor.rowcount
+    
+    async def import_legacy_warnings(self, path: str = 'data/warnings.json') -> int:
+        """One-shot import of the old JSON warnings file into the warnings table"""
+        if not os.path.exists(path):
+            return 0
+        
+        def read_file():
+            with open(path, 'r') as f:
+                return json.load(f)
+        
+        try:
+            legacy = await asyncio.to_thread(read_file)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f'Failed to read legacy warnings file {path}: {e}')
+            return 0
+        
+        if not isinstance(legacy, dict):
+            logging.error(f'Legacy warnings file {path} is not a JSON object; skipping import')
+            return 0
+        
+        rows = []
+        skipped = 0
+        for guild_id, users in legacy.items():
+            if not isinstance(users, dict):
+                skipped += 1
+                logging.warning(f'Skipping malformed legacy warnings of guild {guild_id}: expected an object of users')
+                continue
+            for user_id, user_warnings in users.items():
+                if not isinstance(user_warnings, list):
+                    skipped += 1
+                    logging.warning(f'Skipping malformed legacy warnings in guild {guild_id}, user {user_id}: expected a list')
+                    continue
+                for warning in user_warnings:
+                    try:
+                        rows.append(_legacy_warning_row(guild_id, user_id, warning))
+                    except (TypeError, ValueError, AttributeError) as e:
+                        # One bad entry shouldn't keep the bot from starting or lose the others
+                        skipped += 1
+                        logging.warning(f'Skipping malformed legacy warning in guild {guild_id}, user {user_id}: {e}')
+        
+        await self.conn.executemany('''
+            INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        await self.conn.commit()
+        
+        # Keep the old file around but make sure it's never imported twice
+        await asyncio.to_thread(os.replace, path, path + '.imported')
+        logging.info(f'Imported {len(rows)} legacy warnings from {path}, skipped {skipped} malformed')
+        return len(rows)
+    
     # Reaction roles methods
     async def add_reaction_role(self, guild_id: int, message_id: int, channel_id: int, 
                                role_id: int, emoji: str):
@@ -348,13 +542,49 @@ class Database:
     async def add_event_log(self, guild_id: int, event_type: str, user_id: Optional[int] = None,
                            channel_id: Optional[int] = None, data: Optional[Dict] = None):
         """Add an event log"""
-        data_json = json.dumps(data) if data else None
         await self.conn.execute('''
             INSERT INTO event_logs (guild_id, event_type, user_id, channel_id, data)
             VALUES (?, ?, ?, ?, ?)
-        ''', (guild_id, event_type, user_id, channel_id, data_json))
+        ''', (guild_id, event_type, user_id, channel_id, encode_event(event_type, data)))
         await self.conn.commit()
     
+    async def add_event_logs(self, events: List[Tuple[int, str, Optional[int], Optional[int], Optional[Dict]]]):
+        """Add many event logs of (guild_id, event_type, user_id, channel_id, data) in one transaction"""
+        if not events:
+            return
+        
+        await self.conn.executemany('''
+            INSERT INTO event_logs (guild_id, event_type, user_id, channel_id, data)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (guild_id, event_type, user_id, channel_id, encode_event(event_type, data))
+            for guild_id, event_type, user_id, channel_id, data in events
+        ])
+        await self.conn.commit()
+    
+    async def get_event_logs(self, guild_id: int, event_type: Optional[str] = None,
+                             user_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the latest event logs of a guild with their data decoded"""
+        query = 'SELECT * FROM event_logs WHERE guild_id = ?'
+        params: List[Any] = [guild_id]
+        if event_type is not None:
+            query += ' AND event_type = ?'
+            params.append(event_type)
+        if user_id is not None:
+            query += ' AND user_id = ?'
+            params.append(user_id)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor = await self.conn.execute(query, params)
+        rows = await cursor.fetchall()
+        
+        columns = [desc[0] for desc in cursor.description]
+        logs = [dict(zip(columns, row)) for row in rows]
+        for log in logs:
+            log['data'] = decode_event(log['data'])
+        return logs
+    
     async def close(self):
         """Close database connection"""
         if self.conn:
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+
+import discord
+import pytest
+from discord.ext import commands
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from database import Database
+from utils.activity import ActivityCollector
+from utils.economy import EconomyLedger
+from utils.guild_stats import GuildStatsAggregator
+from utils.live_feed import LiveFeed
+from utils.log_dispatcher import LogDispatcher
+from utils.message_snapshots import MessageSnapshotStore
+from utils.role_queue import RoleMutationQueue
+
+async def make_bot(directory: str) -> commands.Bot:
+    """A bot with the services AdvancedBot sets up, backed by files in directory; never connects."""
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+
+    bot = commands.Bot(command_prefix='!', intents=intents, help_command=None, case_insensitive=True)
+    bot.db = Database(os.path.join(directory, 'bot_database.db'))
+    await bot.db.init_db()
+    bot.config = Config()
+    bot.role_queue = RoleMutationQueue(bot)
+    bot.economy = EconomyLedger(bot.db.db_path)
+    bot.pixels = EconomyLedger(bot.db.db_path, currency='pixels', starting_balance=1000)
+    bot.member_activity = ActivityCollector()
+    bot.guild_stats = GuildStatsAggregator()
+    bot.live_feed = LiveFeed(bot)
+    bot.log_dispatcher = LogDispatcher(sink=None)
+    bot.snapshots = MessageSnapshotStore(spill_path=os.path.join(directory, 'message_snapshots.db'))
+    await bot.economy.start()
+    await bot.pixels.start()
+    await bot.snapshots.start()
+    return bot
+
+async def close_bot(bot: commands.Bot):
+    for name in list(bot.extensions):
+        await bot.unload_extension(name)
+    await bot.role_queue.close()
+    await bot.log_dispatcher.close()
+    await bot.economy.close()
+    await bot.pixels.close()
+    await bot.live_feed.close()
+    await bot.snapshots.close()
+    await bot.db.close()
+
+@pytest.fixture
+def with_bot(tmp_path, monkeypatch):
+    """Run an async test function against a fresh bot; cogs that open their own files do so in tmp_path."""
+    monkeypatch.chdir(tmp_path)
+
+    def run(test):
+        async def main():
+            bot = await make_bot(str(tmp_path))
+            try:
+                await test(bot)
+            finally:
+                await close_bot(bot)
+        asyncio.run(main())
+    return run
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import discord
+
+GUILD_ID = 1
+CHANNEL_ID = 10
+LOG_CHANNEL_ID = 99
+
+def make_message(message_id: int, content: str, bot: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id, guild=SimpleNamespace(id=GUILD_ID), channel=SimpleNamespace(id=CHANNEL_ID),
+        author=SimpleNamespace(id=6 if bot else 5, bot=bot), content=content, attachments=[],
+        created_at=datetime.now(timezone.utc)
+    )
+
+async def setup_logging(bot):
+    """Load the logger with a log channel configured; returns the cog and the list enqueued logs go to."""
+    await bot.load_extension('cogs.bot_logger')
+    await bot.db.update_guild_settings(GUILD_ID, {'log_channel_id': str(LOG_CHANNEL_ID)})
+    log_channel = SimpleNamespace(id=LOG_CHANNEL_ID)
+    bot.get_guild = lambda guild_id: SimpleNamespace(
+        id=guild_id, get_channel=lambda channel_id: log_channel if channel_id == LOG_CHANNEL_ID else None
+    )
+
+    queued = []
+    bot.log_dispatcher.enqueue = lambda guild_id, channel, embed, priority, file=None: queued.append((channel, embed, file))
+    return bot.get_cog('Logging'), queued
+
+def test_raw_edit_and_bulk_delete_go_through_the_dispatcher(with_bot):
+    async def test(bot):
+        cog, queued = await setup_logging(bot)
+        for message_id in range(3):
+            bot.snapshots.add(make_message(message_id, f"message {message_id}"))
+
+        await cog.on_raw_message_edit(discord.RawMessageUpdateEvent({'content': "edited"}, make_message(0, "edited")))
+        payload = discord.RawBulkMessageDeleteEvent({
+            'ids': ['0', '1', '2', '7', '8'], 'channel_id': str(CHANNEL_ID), 'guild_id': str(GUILD_ID)
+        })
+        payload.cached_messages = [make_message(8, "bot reply", bot=True)]
+        await cog.on_raw_bulk_message_delete(payload)
+
+        assert [embed.title for _, embed, _ in queued] == ["Message Edited", "Bulk Message Delete"]
+        assert all(channel.id == LOG_CHANNEL_ID for channel, _, _ in queued)
+
+        fields = {field.name: field.value for field in queued[1][1].fields}
+        assert fields["Messages Deleted"] == "5" and fields["Content Available"] == "3"
+        assert "bot=True" not in fields["Top Authors"]
+
+        transcript = queued[1][2].fp.read().decode()
+        assert "edited" in transcript and "message 1" in transcript
+        assert "bot reply" not in transcript
+        assert "1 messages were not cached" in transcript
+        assert len(bot.snapshots.messages) == 0
+    with_bot(test)
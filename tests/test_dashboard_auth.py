@@ -0,0 +1,68 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from utils import dashboard_auth
+from utils.dashboard_auth import OAuthError, SessionStore
+
+GUILDS = [{'id': '1', 'permissions': '32'}]
+
+class FakeOAuth:
+    """Answers guild list requests with GUILDS, or raises the queued error."""
+
+    def __init__(self):
+        self.error = None
+        self.calls = 0
+        self.stats = {}
+
+    async def get_guilds(self, access_token):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return list(GUILDS)
+
+def make_store(**kwargs):
+    oauth = FakeOAuth()
+    store = SessionStore(oauth, guild_refresh=300, guild_max_stale=900, **kwargs)
+    session = store.create({'id': '1'}, {'access_token': 'token', 'expires_in': 10 ** 9})
+    return store, oauth, session
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(dashboard_auth.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_transient_failures_serve_the_last_list_for_a_limited_time(clock):
+    async def test():
+        store, oauth, session = make_store()
+        assert await store.guilds(session) == GUILDS
+
+        oauth.error = aiohttp.ClientError("connection reset")
+        clock[0] += 301
+        assert await store.guilds(session) == GUILDS
+        calls = oauth.calls
+        clock[0] += 10
+        assert await store.guilds(session) == GUILDS
+        assert oauth.calls == calls  # No retry before GUILD_RETRY_INTERVAL
+
+        oauth.error = OAuthError(503, "unavailable")
+        clock[0] += 600
+        with pytest.raises(OAuthError):
+            await store.guilds(session)
+        assert store.get(session.id) is session
+    asyncio.run(test())
+
+def test_rejected_grant_ends_the_session(clock):
+    async def test():
+        store, oauth, session = make_store()
+        await store.guilds(session)
+
+        oauth.error = OAuthError(401, "unauthorized")
+        clock[0] += 301
+        with pytest.raises(OAuthError):
+            await store.guilds(session)
+        assert store.get(session.id) is None
+        assert session.guilds is None
+    asyncio.run(test())
@@ -0,0 +1,34 @@
+import asyncio
+import json
+import os
+
+from database import Database
+
+def test_legacy_warnings_import_skips_malformed_entries(tmp_path):
+    path = tmp_path / 'warnings.json'
+    path.write_text(json.dumps({
+        '1': {
+            '10': [
+                {'moderator': '20', 'reason': "spam", 'timestamp': '2023-05-01T12:30:00.123456'},
+                {'moderator': 'someone', 'reason': "bad moderator id"},
+                {'moderator': '20', 'reason': "bad timestamp", 'timestamp': 'yesterday'},
+                "not a warning"
+            ],
+            'not-an-id': [{'moderator': '20', 'reason': "bad user id"}],
+            '11': {'moderator': '20'}
+        },
+        '2': [],
+        '3': {'12': [{'reason': "no moderator"}]}
+    }))
+
+    async def test():
+        db = Database(str(tmp_path / 'bot.db'))
+        await db.init_db()
+        try:
+            assert await db.import_legacy_warnings(str(path)) == 2
+            assert await db.count_user_warnings(1, 10) == 1
+            assert await db.count_user_warnings(3, 12) == 1
+            assert not os.path.exists(path) and os.path.exists(str(path) + '.imported')
+        finally:
+            await db.close()
+    asyncio.run(test())
@@ -0,0 +1,20 @@
+from cogs import MANIFEST
+from utils.cog_loader import LAZY, CogLoader
+
+def test_alt_detection_loads(with_bot):
+    async def test(bot):
+        await bot.load_extension('cogs.alt_detection')
+        assert bot.get_cog('AltDetectionCog') is not None
+        assert {'serveraltcheck', 'altscancancel'} <= {command.name for command in bot.tree.get_commands()}
+    with_bot(test)
+
+def test_manifest_loads_every_cog(with_bot):
+    async def test(bot):
+        loader = CogLoader(bot, MANIFEST)
+        await loader.load()
+        for name, mode in MANIFEST:
+            if mode == LAZY:
+                assert await loader.ensure_loaded(name), loader.entries[name].error
+        failed = {entry.name: entry.error for entry in loader.entries.values() if entry.status != 'loaded'}
+        assert failed == {}
+    with_bot(test)
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+class FakeMessage:
+    def __init__(self, embed):
+        self.id = 1
+        self.embeds = [embed]
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def edit(self, embed):
+        self.embeds.append(embed)
+
+class FakeContext:
+    def __init__(self):
+        self.author = SimpleNamespace(id=42)
+        self.messages = []
+
+    async def send(self, content=None, embed=None):
+        message = FakeMessage(embed)
+        self.messages.append(message)
+        return message
+
+def test_coin_flip_reports_an_expired_bet_without_a_balance(with_bot):
+    async def test(bot):
+        await bot.load_extension('cogs.funcogs.discord_fun_commands')
+        cog = bot.get_cog('FunCommandsCog')
+        ctx = FakeContext()
+
+        async def wait_for(event, timeout, check):
+            # The reservation times out while the player is still choosing
+            for reservation in list(bot.economy.reservations.values()):
+                bot.economy._expire(reservation)
+            return SimpleNamespace(emoji='👤', message=ctx.messages[0]), ctx.author
+        bot.wait_for = wait_for
+
+        balance = await bot.economy.get_balance(ctx.author.id)
+        await cog.coin_flip.callback(cog, ctx, 10)
+
+        result = ctx.messages[0].embeds[-1]
+        assert result.title == "⏰ Bet Expired"
+        assert not result.fields
+        assert await bot.economy.get_balance(ctx.author.id) == balance
+    with_bot(test)
@@ -0,0 +1,55 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from utils.message_snapshots import MessageSnapshotStore
+
+def make_message(message_id: int, content: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id, guild=SimpleNamespace(id=1), channel=SimpleNamespace(id=10),
+        author=SimpleNamespace(id=5, bot=False), content=content, attachments=[],
+        created_at=datetime.now(timezone.utc)
+    )
+
+async def spilled_rows(store: MessageSnapshotStore) -> int:
+    async with store.conn.execute('SELECT COUNT(*) FROM message_snapshots') as cursor:
+        return (await cursor.fetchone())[0]
+
+def run_store(tmp_path, test):
+    async def main():
+        store = MessageSnapshotStore(max_per_channel=4, spill_path=os.path.join(str(tmp_path), 'snapshots.db'))
+        await store.start()
+        try:
+            await test(store)
+        finally:
+            await store.close()
+    asyncio.run(main())
+
+def test_update_rewrites_spilled_snapshots(tmp_path):
+    async def test(store):
+        for message_id in range(6):
+            store.add(make_message(message_id, f"message {message_id}"))
+        await store.flush_spill()
+        assert 0 not in store.messages and await spilled_rows(store) == 2
+
+        snapshot = await store.update(0, "edited")
+        assert snapshot.content == "edited"
+        assert (await store.resolve(0)).content == "edited"
+    run_store(tmp_path, test)
+
+def test_pop_many_deletes_only_spilled_rows(tmp_path):
+    async def test(store):
+        for message_id in range(6):
+            store.add(make_message(message_id, f"message {message_id}"))
+        await store.flush_spill()
+        store.add(make_message(6, "message 6"))  # Evicts message 2 into the pending batch
+
+        popped = await store.pop_many([0, 2, 5, 99])
+        assert {message_id: snapshot and snapshot.content for message_id, snapshot in popped.items()} == {
+            0: "message 0", 2: "message 2", 5: "message 5", 99: None
+        }
+        assert await spilled_rows(store) == 1  # Message 1 is still spilled
+        assert 2 not in store.spill_pending and 5 not in store.messages
+        assert (store.stats['hits'], store.stats['spill_hits'], store.stats['misses']) == (2, 1, 1)
+    run_store(tmp_path, test)
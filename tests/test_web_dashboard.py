@@ -0,0 +1,66 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from utils.guild_stats import GuildStatsAggregator
+from web_dashboard import MANAGE_GUILD, SESSION_COOKIE, SESSIONS, create_app
+
+MANAGED_GUILD_ID = 1
+OTHER_GUILD_ID = 2
+
+async def run_dashboard_async(bot, test):
+    """Run an async test function with a client logged in as a user who manages only MANAGED_GUILD_ID."""
+    app = create_app(bot)
+    session = app[SESSIONS].create({'id': '1', 'username': 'tester'}, {'access_token': 'token'})
+    session.guilds = [
+        {'id': str(MANAGED_GUILD_ID), 'permissions': str(MANAGE_GUILD)},
+        {'id': str(OTHER_GUILD_ID), 'permissions': '0'}
+    ]
+    session.guilds_fetched_at = time.monotonic()
+
+    async with TestClient(TestServer(app), cookies={SESSION_COOKIE: session.id}) as client:
+        await test(client)
+
+def run_dashboard(bot, test):
+    asyncio.run(run_dashboard_async(bot, test))
+
+def stats_bot() -> SimpleNamespace:
+    guilds = {
+        guild_id: SimpleNamespace(id=guild_id, member_count=1, members=[SimpleNamespace(bot=False)], channels=[],
+                                  roles=[], premium_subscription_count=0, premium_tier=0)
+        for guild_id in (MANAGED_GUILD_ID, OTHER_GUILD_ID)
+    }
+    return SimpleNamespace(get_guild=guilds.get, guild_stats=GuildStatsAggregator(), latency=0.0)
+
+def test_stats_require_manage_guild():
+    async def test(client):
+        response = await client.get(f'/api/guild/{MANAGED_GUILD_ID}/stats')
+        assert response.status == 200
+        response = await client.get(f'/api/guild/{OTHER_GUILD_ID}/stats')
+        assert response.status == 403
+    run_dashboard(stats_bot(), test)
+
+def test_logs_api_reads_event_logs(with_bot):
+    async def test(bot):
+        member_id = 1_200_000_000_000_000_000
+        await bot.db.add_event_logs([
+            (MANAGED_GUILD_ID, 'member_join', member_id, None, {'account_age_days': 3}),
+            (MANAGED_GUILD_ID, 'message_delete', member_id, 10, {'message_id': member_id + 1, 'content': "hi"}),
+            (OTHER_GUILD_ID, 'member_join', 7, None, None)
+        ])
+
+        async def requests(client):
+            response = await client.get(f'/api/guild/{MANAGED_GUILD_ID}/logs')
+            logs = (await response.json())['logs']
+            assert [log['event_type'] for log in logs] == ['message_delete', 'member_join']
+            assert logs[0]['user_id'] == str(member_id) and logs[0]['data']['message_id'] == str(member_id + 1)
+
+            response = await client.get(f'/api/guild/{MANAGED_GUILD_ID}/logs?type=member_join&limit=5')
+            assert [log['event_type'] for log in (await response.json())['logs']] == ['member_join']
+
+            response = await client.get(f'/api/guild/{OTHER_GUILD_ID}/logs')
+            assert response.status == 403
+        await run_dashboard_async(bot, requests)
+    with_bot(test)
@@ -0,0 +1,216 @@
+import logging
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+ACTIVITY_WINDOW_DAYS = 30
+RECENT_WINDOW_DAYS = 7
+
+# Layout of the activity counters: 24 hour-of-day message counts, then the
+# message count, total message length and reactions received
+HOUR_BINS = 24
+MESSAGE_FIELD = 24
+LENGTH_FIELD = 25
+REACTION_FIELD = 26
+COUNTER_FIELDS = 27
+
+def day_number(when: datetime) -> int:
+    """Get the UTC day index of a timestamp."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() // SECONDS_PER_DAY)
+
+class MemberActivity:
+    """Rolling per-day activity counters for one member, with running totals over the window."""
+
+    __slots__ = ('days', 'totals', 'channels')
+
+    def __init__(self):
+        self.days: Dict[int, array] = {}  # day number: counters for that day, oldest first
+        self.totals = array('I', [0]) * COUNTER_FIELDS  # Sum of every day still in self.days
+        self.channels: Dict[int, int] = {}  # channel_id: last day a message was sent there
+
+    def counters(self, day: int) -> array:
+        """Get the counters of a day, creating them if needed."""
+        counters = self.days.get(day)
+        if counters is None:
+            counters = self.days[day] = array('I', [0]) * COUNTER_FIELDS
+        return counters
+
+    def expire(self, oldest_day: int) -> bool:
+        """Drop days and channels older than the window; return True if nothing is left."""
+        # Days are created in gateway order, so expired ones sit at the front
+        while self.days:
+            day = next(iter(self.days))
+            if day >= oldest_day:
+                break
+            for field, value in enumerate(self.days.pop(day)):
+                self.totals[field] -= value
+
+        if self.channels and min(self.channels.values()) < oldest_day:
+            self.channels = {channel_id: day for channel_id, day in self.channels.items() if day >= oldest_day}
+        return not self.days
+
+class ActivityCollector:
+    """Passive per-member activity aggregates fed by gateway events."""
+
+    def __init__(self, window_days: int = ACTIVITY_WINDOW_DAYS):
+        self.window_days = window_days
+        self.guilds: Dict[int, Dict[int, MemberActivity]] = {}  # guild_id: {member_id: MemberActivity}
+        self.stats = {
+            'messages_recorded': 0,
+            'reactions_recorded': 0
+        }
+
+    def _member(self, guild_id: int, member_id: int) -> MemberActivity:
+        """Get or create the activity record of a member."""
+        guild_members = self.guilds.setdefault(guild_id, {})
+        activity = guild_members.get(member_id)
+        if activity is None:
+            activity = guild_members[member_id] = MemberActivity()
+        return activity
+
+    def _oldest_day(self, now: Optional[datetime] = None) -> int:
+        """Get the first day still inside the window."""
+        return day_number(now or datetime.now(timezone.utc)) - self.window_days + 1
+
+    def record_message(self, guild_id: int, member_id: int, channel_id: int, created_at: datetime, length: int):
+        """Count a message sent by a member."""
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc)
+        day = day_number(created_at)
+        activity = self._member(guild_id, member_id)
+
+        # Update the day and the running totals together
+        for counters in (activity.counters(day), activity.totals):
+            counters[created_at.hour] += 1
+            counters[MESSAGE_FIELD] += 1
+            counters[LENGTH_FIELD] += length
+
+        if activity.channels.get(channel_id, -1) < day:
+            activity.channels[channel_id] = day
+        self.stats['messages_recorded'] += 1
+
+    def record_reaction(self, guild_id: int, author_id: int, when: Optional[datetime] = None):
+        """Count a reaction added to a message written by a member."""
+        activity = self._member(guild_id, author_id)
+        activity.counters(day_number(when or datetime.now(timezone.utc)))[REACTION_FIELD] += 1
+        activity.totals[REACTION_FIELD] += 1
+        self.stats['reactions_recorded'] += 1
+
+    def member_ids(self, guild_id: int) -> List[int]:
+        """Members of a guild with recorded activity."""
+        return list(self.guilds.get(guild_id, ()))
+
+    def forget_member(self, guild_id: int, member_id: int):
+        """Drop the activity of a member who left."""
+        self.guilds.get(guild_id, {}).pop(member_id, None)
+
+    def forget_guild(self, guild_id: int):
+        """Drop all activity of a guild."""
+        self.guilds.pop(guild_id, None)
+
+    def prune(self, now: Optional[datetime] = None):
+        """Drop counters that fell out of the window and members with no activity left."""
+        oldest_day = self._oldest_day(now)
+        for guild_id, guild_members in list(self.guilds.items()):
+            for member_id in [member_id for member_id, activity in guild_members.items() if activity.expire(oldest_day)]:
+                del guild_members[member_id]
+            if not guild_members:
+                del self.guilds[guild_id]
+
+    def features(self, guild_id: int, member_id: int, now: Optional[datetime] = None) -> Dict:
+        """Get the activity features of a member over the window, in the shape the analyzers expect."""
+        activity = self.guilds.get(guild_id, {}).get(member_id)
+        if activity is None:
+            return self._features(MemberActivity(), 0)
+        return self._features(activity, self._oldest_day(now))
+
+    def guild_features(self, guild_id: int, now: Optional[datetime] = None) -> Dict[int, Dict]:
+        """Get the activity features of every member with recorded activity in a guild."""
+        oldest_day = self._oldest_day(now)
+        return {
+            member_id: self._features(activity, oldest_day)
+            for member_id, activity in self.guilds.get(guild_id, {}).items()
+        }
+
+    def _features(self, activity: MemberActivity, oldest_day: int) -> Dict:
+        """Read a member's window features from the running totals."""
+        activity.expire(oldest_day)
+        totals = activity.totals
+
+        recent_day = oldest_day + self.window_days - RECENT_WINDOW_DAYS
+        message_count_7d = 0
+        for day in range(recent_day, recent_day + RECENT_WINDOW_DAYS):
+            counters = activity.days.get(day)
+            if counters is not None:
+                message_count_7d += counters[MESSAGE_FIELD]
+
+        message_count_30d = totals[MESSAGE_FIELD]
+        return {
+            'message_count_7d': message_count_7d,
+            'message_count_30d': message_count_30d,
+            'channels_used': len(activity.channels),
+            'hour_histogram': totals[:HOUR_BINS].tolist(),
+            'avg_message_length': totals[LENGTH_FIELD] / message_count_30d if message_count_30d else 0,
+            'reaction_count': totals[REACTION_FIELD]
+        }
+
+    def get_metrics(self) -> Dict:
+        """Get the number of tracked guilds, members and day buckets."""
+        return {
+            'guilds_tracked': len(self.guilds),
+            'members_tracked': sum(len(members) for members in self.guilds.values()),
+            'day_buckets': sum(len(activity.days) for members in self.guilds.values() for activity in members.values()),
+            **self.stats
+        }
+
+# Benchmark: python -m utils.activity
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+    from datetime import timedelta
+
+    random.seed(34)
+    member_count = 5000
+    message_count = 500_000
+    guild_id = 1
+    now = datetime.now(timezone.utc)
+
+    collector = ActivityCollector()
+    # 45 days of traffic in gateway order, so the first reads have old days to expire
+    events = sorted(
+        (
+            (random.randrange(member_count), random.randrange(40), now - timedelta(seconds=random.randrange(45 * SECONDS_PER_DAY)))
+            for _ in range(message_count)
+        ),
+        key=lambda event: event[2]
+    )
+
+    start = time.perf_counter()
+    for member_id, channel_id, created_at in events:
+        collector.record_message(guild_id, member_id, channel_id, created_at, random.randint(1, 200))
+    record_time = time.perf_counter() - start
+
+    # The first read also expires the 15 days that fell out of the window
+    start = time.perf_counter()
+    collector.guild_features(guild_id, now)
+    expire_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = collector.guild_features(guild_id, now)
+    read_time = time.perf_counter() - start
+
+    collector.prune(now)
+    day_buckets = collector.get_metrics()['day_buckets']
+    bucket_bytes = sys.getsizeof(array('I', [0]) * COUNTER_FIELDS)
+
+    print(f"Recorded {message_count:,} messages in {record_time:.2f}s "
+          f"({message_count / record_time:,.0f}/s)")
+    print(f"Read features for {len(features):,} members in {read_time * 1000:.0f}ms "
+          f"({expire_time * 1000:.0f}ms on the first read, expiring old days)")
+    print(f"{day_buckets:,} day buckets after pruning, ~{day_buckets * bucket_bytes / 1e6:.1f} MB of counters")
@@ -1,10 +1,12 @@
 import aiosqlite
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Optional
 import json
 
+from utils.alt_scan_jobs import _json_default
+
 logger = logging.getLogger(__name__)
 
 class AltDetectionDB:
@@ -83,6 +85,18 @@ class AltDetectionDB:
             )
         ''')
         
+        # Alt Detection - Scored results keyed by a fingerprint of the scanned member set
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS alt_analysis_cache (
+                guild_id INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                results TEXT NOT NULL,
+                expires_at TIMESTAMP NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (guild_id, fingerprint)
+            )
+        ''')
+        
         # Alt Detection - Message timing
         await self.conn.execute('''
             CREATE TABLE IF NOT EXISTS alt_message_timing (
@@ -96,6 +110,22 @@ class AltDetectionDB:
             )
         ''')
 
+        # Alt Detection - Background scan jobs, one row per guild
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS alt_scan_jobs (
+                guild_id INTEGER PRIMARY KEY,
+                channel_id INTEGER,
+                requested_by INTEGER,
+                options TEXT,
+                status TEXT NOT NULL,
+                phase INTEGER DEFAULT 0,
+                checkpoint TEXT,
+                message_id INTEGER,
+                error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
         # Create indexes for alt detection tables
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_members_guild_id ON alt_members(guild_id)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_members_created_at ON alt_members(created_at)')
@@ -104,25 +134,22 @@ class AltDetectionDB:
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_pattern_guild_type ON alt_pattern_cache(guild_id, pattern_type)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_timing_member_id ON alt_message_timing(member_id)')
         await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_timing_guild_id ON alt_message_timing(guild_id)')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_scan_jobs_status ON alt_scan_jobs(status)')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_alt_analysis_cache_expires ON alt_analysis_cache(expires_at)')
         
         await self.conn.commit()
         logger.info("Alt detection tables created/verified successfully")
     
-    async def store_member_batch(self, guild_id: int, members: List[Dict]):
-        """Store a batch of member data efficiently."""
+    async def store_member_batch(self, guild_id: int, members: List[Dict]) -> int:
+        """Upsert the members whose data changed since the last scan and drop those who left."""
         if not members or not self.conn:
-            return
+            return 0
         
         try:
-            # Clear existing data for the guild
-            await self.conn.execute("DELETE FROM alt_members WHERE guild_id = ?", (guild_id,))
-            
-            # Prepare member data for insertion
-            member_data = []
+            # Rows in the same column order as the SELECT below, so unchanged members compare equal
+            member_data = {}
             for member in members:
-                roles_json = json.dumps(member.get('roles', []))
-                
-                member_data.append((
+                member_data[member['id']] = (
                     member['id'],
                     guild_id,
                     member['username'],
@@ -131,8 +158,8 @@ class AltDetectionDB:
                     member['created_at'].isoformat() if member.get('created_at') else None,
                     member['joined_at'].isoformat() if member.get('joined_at') else None,
                     member.get('avatar_url'),
-                    member.get('is_bot', False),
-                    roles_json,
+                    int(bool(member.get('is_bot', False))),
+                    json.dumps(member.get('roles', [])),
                     member['premium_since'].isoformat() if member.get('premium_since') else None,
                     member.get('status'),
                     member.get('message_count_7d', 0),
@@ -140,17 +167,50 @@ class AltDetectionDB:
                     member.get('channels_used', 0),
                     member.get('avg_message_length', 0),
                     member.get('reaction_count', 0)
-                ))
+                )
             
-            # Batch insert
-            await self.conn.executemany("""
-                INSERT OR REPLACE INTO alt_members (
-                    id, guild_id, username, display_name, discriminator,
-                    created_at, joined_at, avatar_url, is_bot, roles,
-                    premium_since, status, message_count_7d, message_count_30d,
-                    channels_used, avg_message_length, reaction_count
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, member_data)
+            async with self.conn.execute("""
+                SELECT id, guild_id, username, display_name, discriminator,
+                       created_at, joined_at, avatar_url, is_bot, roles,
+                       premium_since, status, message_count_7d, message_count_30d,
+                       channels_used, avg_message_length, reaction_count
+                FROM alt_members WHERE guild_id = ?
+            """, (guild_id,)) as cursor:
+                stored = {row[0]: tuple(row) for row in await cursor.fetchall()}
+            
+            changed = [row for member_id, row in member_data.items() if stored.get(member_id) != row]
+            departed = [(member_id,) for member_id in stored if member_id not in member_data]
+            
+            if changed:
+                await self.conn.executemany("""
+                    INSERT INTO alt_members (
+                        id, guild_id, username, display_name, discriminator,
+                        created_at, joined_at, avatar_url, is_bot, roles,
+                        premium_since, status, message_count_7d, message_count_30d,
+                        channels_used, avg_message_length, reaction_count
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        guild_id = excluded.guild_id,
+                        username = excluded.username,
+                        display_name = excluded.display_name,
+                        discriminator = excluded.discriminator,
+                        created_at = excluded.created_at,
+                        joined_at = excluded.joined_at,
+                        avatar_url = excluded.avatar_url,
+                        is_bot = excluded.is_bot,
+                        roles = excluded.roles,
+                        premium_since = excluded.premium_since,
+                        status = excluded.status,
+                        message_count_7d = excluded.message_count_7d,
+                        message_count_30d = excluded.message_count_30d,
+                        channels_used = excluded.channels_used,
+                        avg_message_length = excluded.avg_message_length,
+                        reaction_count = excluded.reaction_count,
+                        last_updated = CURRENT_TIMESTAMP
+                """, changed)
+            
+            if departed:
+                await self.conn.executemany("DELETE FROM alt_members WHERE id = ?", departed)
             
             # Store message timing data
             timing_data = []
@@ -173,7 +233,11 @@ class AltDetectionDB:
                 """, timing_data)
             
             await self.conn.commit()
-            logger.info(f"Stored data for {len(members)} members in guild {guild_id}")
+            logger.info(
+                f"Stored data for {len(members)} members in guild {guild_id} "
+                f"({len(changed)} changed, {len(departed)} removed)"
+            )
+            return len(changed)
             
         except Exception as e:
             await self.conn.rollback()
@@ -190,6 +254,7 @@ class AltDetectionDB:
                 SELECT * FROM alt_members WHERE guild_id = ?
                 ORDER BY created_at ASC
             """, (guild_id,)) as cursor:
+                cursor.row_factory = aiosqlite.Row
                 rows = await cursor.fetchall()
                 members = []
                 
@@ -214,15 +279,26 @@ class AltDetectionDB:
             logger.error(f"Error retrieving guild members: {e}")
             return []
     
+    async def get_guild_member_ids(self, guild_id: int) -> List[int]:
+        """Retrieve the IDs of the members stored for a guild."""
+        if not self.conn:
+            return []
+        
+        try:
+            async with self.conn.execute("SELECT id FROM alt_members WHERE guild_id = ?", (guild_id,)) as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error retrieving guild member IDs: {e}")
+            return []
+    
     async def store_analysis_result(self, guild_id: int, result: Dict):
         """Store an analysis result."""
-        if not self.connection:
+        if not self.conn:
             return
-        cursor = self.connection.cursor()
         
         try:
-            cursor.execute("""
-                INSERT INTO analysis_results (
+            await self.conn.execute("""
+                INSERT INTO alt_analysis_results (
                     guild_id, member_ids, confidence_score, evidence, analysis_type
                 ) VALUES (?, ?, ?, ?, ?)
             """, (
@@ -233,7 +309,7 @@ class AltDetectionDB:
                 result.get('analysis_type', 'comprehensive')
             ))
             
-            self.connection.commit()
+            await self.conn.commit()
             
         except Exception as e:
             logger.error(f"Error storing analysis result: {e}")
@@ -241,22 +317,19 @@ class AltDetectionDB:
     
     async def get_recent_analysis(self, guild_id: int, hours: int = 24) -> List[Dict]:
         """Get recent analysis results for a guild."""
-        if not self.connection:
+        if not self.conn:
             return []
-        cursor = self.connection.cursor()
         
         try:
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-            
-            cursor.execute("""
-                SELECT * FROM analysis_results 
-                WHERE guild_id = ? AND created_at > ?
+            async with self.conn.execute("""
+                SELECT * FROM alt_analysis_results
+                WHERE guild_id = ? AND created_at > datetime('now', ?)
                 ORDER BY confidence_score DESC, created_at DESC
-            """, (guild_id, cutoff_time.isoformat()))
+            """, (guild_id, f'-{hours} hours')) as cursor:
+                cursor.row_factory = aiosqlite.Row
+                rows = await cursor.fetchall()
             
-            rows = cursor.fetchall()
             results = []
-            
             for row in rows:
                 result_data = dict(row)
                 result_data['member_ids'] = json.loads(result_data['member_ids'])
@@ -271,46 +344,45 @@ class AltDetectionDB:
             return []
     
     async def cache_pattern(self, guild_id: int, pattern_type: str, pattern_data: Dict, hours: int = 24):
-        """Cache a detected pattern."""
-        if not self.connection:
+        """Cache a detected pattern, replacing the previous one of the same type."""
+        if not self.conn:
             return
-        cursor = self.connection.cursor()
         
         try:
-            expires_at = datetime.utcnow() + timedelta(hours=hours)
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO pattern_cache (
+            await self.conn.execute("""
+                DELETE FROM alt_pattern_cache WHERE guild_id = ? AND pattern_type = ?
+            """, (guild_id, pattern_type))
+            await self.conn.execute("""
+                INSERT INTO alt_pattern_cache (
                     guild_id, pattern_type, pattern_data, expires_at
-                ) VALUES (?, ?, ?, ?)
+                ) VALUES (?, ?, ?, datetime('now', ?))
             """, (
                 guild_id,
                 pattern_type,
                 json.dumps(pattern_data),
-                expires_at.isoformat()
+                f'+{hours} hours'
             ))
             
-            self.connection.commit()
+            await self.conn.commit()
             
         except Exception as e:
             logger.error(f"Error caching pattern: {e}")
     
     async def get_cached_pattern(self, guild_id: int, pattern_type: str) -> Optional[Dict]:
         """Retrieve a cached pattern if not expired."""
-        if not self.connection:
+        if not self.conn:
             return None
-        cursor = self.connection.cursor()
         
         try:
-            cursor.execute("""
-                SELECT pattern_data FROM pattern_cache 
-                WHERE guild_id = ? AND pattern_type = ? AND expires_at > ?
+            async with self.conn.execute("""
+                SELECT pattern_data FROM alt_pattern_cache
+                WHERE guild_id = ? AND pattern_type = ? AND expires_at > datetime('now')
                 ORDER BY created_at DESC LIMIT 1
-            """, (guild_id, pattern_type, datetime.utcnow().isoformat()))
+            """, (guild_id, pattern_type)) as cursor:
+                row = await cursor.fetchone()
             
-            row = cursor.fetchone()
             if row:
-                return json.loads(row['pattern_data'])
+                return json.loads(row[0])
             
             return None
             
@@ -318,36 +390,105 @@ class AltDetectionDB:
             logger.error(f"Error retrieving cached pattern: {e}")
             return None
     
+    async def cache_analysis(self, guild_id: int, fingerprint: str, results: List[Dict], hours: int = 6):
+        """Cache the scored results of a scan under the fingerprint of its member set."""
+        if not self.conn:
+            return
+        
+        try:
+            await self.conn.execute("""
+                INSERT INTO alt_analysis_cache (guild_id, fingerprint, results, expires_at)
+                VALUES (?, ?, ?, datetime('now', ?))
+                ON CONFLICT(guild_id, fingerprint) DO UPDATE SET
+                    results = excluded.results,
+                    expires_at = excluded.expires_at,
+                    created_at = CURRENT_TIMESTAMP
+            """, (guild_id, fingerprint, json.dumps(results, default=_json_default), f'+{hours} hours'))
+            
+            await self.conn.commit()
+            
+        except Exception as e:
+            logger.error(f"Error caching analysis: {e}")
+    
+    async def get_cached_analysis(self, guild_id: int, fingerprint: str) -> Optional[List[Dict]]:
+        """Get the cached scored results for an unchanged member set, if not expired."""
+        if not self.conn:
+            return None
+        
+        try:
+            async with self.conn.execute("""
+                SELECT results FROM alt_analysis_cache
+                WHERE guild_id = ? AND fingerprint = ? AND expires_at > datetime('now')
+            """, (guild_id, fingerprint)) as cursor:
+                row = await cursor.fetchone()
+            
+            return json.loads(row[0]) if row else None
+            
+        except Exception as e:
+            logger.error(f"Error retrieving cached analysis: {e}")
+            return None
+    
     async def cleanup_expired_data(self):
         """Clean up expired cache data and old analysis results."""
-        if not self.connection:
+        if not self.conn:
             return
-        cursor = self.connection.cursor()
         
         try:
-            # Remove expired pattern cache
-            cursor.execute("""
-                DELETE FROM pattern_cache WHERE expires_at < ?
-            """, (datetime.utcnow().isoformat(),))
+            # Remove expired caches
+            await self.conn.execute("DELETE FROM alt_pattern_cache WHERE expires_at < datetime('now')")
+            await self.conn.execute("DELETE FROM alt_analysis_cache WHERE expires_at < datetime('now')")
             
             # Remove analysis results older than 30 days
-            cutoff_date = datetime.utcnow() - timedelta(days=30)
-            cursor.execute("""
-                DELETE FROM analysis_results WHERE created_at < ?
-            """, (cutoff_date.isoformat(),))
+            await self.conn.execute("""
+                DELETE FROM alt_analysis_results WHERE created_at < datetime('now', '-30 days')
+            """)
             
             # Remove message timing data older than 7 days
-            timing_cutoff = datetime.utcnow() - timedelta(days=7)
-            cursor.execute("""
-                DELETE FROM message_timing WHERE created_at < ?
-            """, (timing_cutoff.isoformat(),))
+            await self.conn.execute("""
+                DELETE FROM alt_message_timing WHERE created_at < datetime('now', '-7 days')
+            """)
             
-            self.connection.commit()
+            await self.conn.commit()
             logger.info("Database cleanup completed successfully")
             
         except Exception as e:
             logger.error(f"Error during database cleanup: {e}")
     
+    async def save_scan_job(self, row: tuple):
+        """Insert or update a scan job row (AltScanJob.to_row order)."""
+        if not self.conn:
+            return
+        
+        await self.conn.execute("""
+            INSERT INTO alt_scan_jobs (
+                guild_id, channel_id, requested_by, options, status,
+                phase, checkpoint, message_id, error
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET
+                channel_id = excluded.channel_id,
+                requested_by = excluded.requested_by,
+                options = excluded.options,
+                status = excluded.status,
+                phase = excluded.phase,
+                checkpoint = excluded.checkpoint,
+                message_id = excluded.message_id,
+                error = excluded.error,
+                updated_at = CURRENT_TIMESTAMP
+        """, row)
+        await self.conn.commit()
+    
+    async def get_active_scan_jobs(self) -> List[tuple]:
+        """Get the rows of scan jobs that were queued or running."""
+        if not self.conn:
+            return []
+        
+        async with self.conn.execute("""
+            SELECT guild_id, channel_id, requested_by, options, status,
+                   phase, checkpoint, message_id, error
+            FROM alt_scan_jobs WHERE status IN ('queued', 'running')
+        """) as cursor:
+            return list(await cursor.fetchall())
+    
     async def close(self):
         """Close the database connection if we own it."""
         if self.own_connection and self.conn:
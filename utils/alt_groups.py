@@ -0,0 +1,258 @@
+import logging
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from utils.member_table import MemberTable
+
+logger = logging.getLogger(__name__)
+
+class EvidenceType:
+    """Structured tags for the evidence attached to analysis results."""
+
+    CREATION_RAPID = 'creation_rapid'
+    CREATION_BURST = 'creation_burst'
+    JOIN_RAPID = 'join_rapid'
+    USERNAME = 'username_similarity'
+    DISPLAY_NAME = 'display_name_similarity'
+    NAMING_PATTERN = 'naming_pattern'
+    MESSAGE_TIMING = 'message_timing'
+    ACTIVITY_LEVEL = 'activity_level'
+    COMMUNICATION = 'communication'
+    CHANNEL_USAGE = 'channel_usage'
+    AGE_ACTIVITY = 'age_activity'
+    UNKNOWN = 'unknown'
+
+# Confidence bonus per evidence category, applied once if any of its types is present
+EVIDENCE_CATEGORY_BONUSES = [
+    ((EvidenceType.CREATION_RAPID, EvidenceType.CREATION_BURST), 20),
+    ((EvidenceType.USERNAME, EvidenceType.DISPLAY_NAME, EvidenceType.NAMING_PATTERN), 15),
+    ((EvidenceType.JOIN_RAPID,), 10),
+    ((EvidenceType.MESSAGE_TIMING, EvidenceType.COMMUNICATION, EvidenceType.CHANNEL_USAGE), 15),
+    ((EvidenceType.ACTIVITY_LEVEL, EvidenceType.AGE_ACTIVITY), 10),
+]
+
+def find_roots(count: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Union-find over items 0..count-1 joined by the edges (left[i], right[i]).
+
+    Edges are processed in vectorized rounds: every edge whose endpoints
+    still have different roots hooks the larger root under the smaller one,
+    then pointer jumping compresses every path to its root. Each round drops
+    the edges that are already inside one set.
+
+    Returns:
+        Array mapping each item to its root (the smallest item in its set)
+    """
+    parent = np.arange(count)
+
+    while True:
+        # Path compression: point every item straight at its root
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+        left_root = parent[left]
+        right_root = parent[right]
+        pending = left_root != right_root
+        if not pending.any():
+            return parent
+
+        # Union: hook each larger root under the smallest root it touches
+        left, right = left[pending], right[pending]
+        left_root, right_root = left_root[pending], right_root[pending]
+        np.minimum.at(parent, np.maximum(left_root, right_root), np.minimum(left_root, right_root))
+
+def merge_analysis_results(analyses: Iterable[List[Dict]], member_ids: Iterable[int]) -> List[Dict]:
+    """
+    Merge analysis results into connected groups of members.
+
+    Every result links its members together; members linked directly or
+    through other results end up in the same group. Each result adds
+    len(member_ids) - 1 edges instead of connecting every pair.
+
+    Args:
+        analyses: Lists of analysis results with 'member_ids', 'evidence_type',
+            'evidence' and 'details'
+        member_ids: IDs of the members that were analyzed
+
+    Returns:
+        List of groups with 'members', 'evidence' (distinct strings),
+        'evidence_counts' (per evidence type) and 'details' (per evidence type)
+    """
+    if isinstance(member_ids, np.ndarray):
+        ids = member_ids.astype(np.int64, copy=False)
+    else:
+        ids = np.fromiter(member_ids, dtype=np.int64)
+    if not len(ids):
+        return []
+
+    order = np.argsort(ids)
+    sorted_ids = ids[order]
+
+    # Flatten every result's members so IDs can be mapped to positions in one pass
+    results = [result for analysis_results in analyses for result in analysis_results]
+    member_lists = [result.get('member_ids') or () for result in results]
+    flat_ids = np.fromiter(chain.from_iterable(member_lists), dtype=np.int64)
+    lengths = np.fromiter(map(len, member_lists), dtype=np.int64, count=len(member_lists))
+
+    # Map member IDs to positions, dropping IDs that were not analyzed
+    slots = np.searchsorted(sorted_ids, flat_ids).clip(max=len(ids) - 1)
+    known = sorted_ids[slots] == flat_ids
+    positions = order[slots][known]
+    result_of = np.repeat(np.arange(len(results)), lengths)[known]
+
+    # Link every member to the first known member of its result
+    is_first = np.ones(len(result_of), dtype=bool)
+    is_first[1:] = result_of[1:] != result_of[:-1]
+    first_position = positions[np.maximum.accumulate(np.where(is_first, np.arange(len(result_of)), 0))]
+    linked = ~is_first
+
+    roots = find_roots(len(ids), first_position[linked], positions[linked])
+
+    # Results with fewer than two known members link nobody and are dropped
+    result_roots = np.full(len(results), -1)
+    linking = np.bincount(result_of, minlength=len(results)) > 1
+    result_roots[result_of[is_first]] = roots[first_position[is_first]]
+    result_roots[~linking] = -1
+
+    # Attach each result's evidence to its group root
+    groups: Dict[int, Dict] = {}
+    for result, root in zip(results, result_roots.tolist()):
+        if root < 0:
+            continue
+
+        group = groups.get(root)
+        if group is None:
+            group = groups[root] = {'evidence': {}, 'evidence_counts': {}, 'details': {}}
+
+        evidence_type = result.get('evidence_type', EvidenceType.UNKNOWN)
+        counts = group['evidence_counts']
+        counts[evidence_type] = counts.get(evidence_type, 0) + 1
+        evidence = result.get('evidence')
+        if evidence:
+            group['evidence'][evidence] = None  # Ordered de-duplication
+        details = result.get('details')
+        if details:
+            group['details'][evidence_type] = details
+
+    # Collect the members of every group that has evidence
+    grouped = np.isin(roots, np.fromiter(groups.keys(), dtype=np.int64, count=len(groups)))
+    members_by_root = defaultdict(list)
+    for root, member_id in zip(roots[grouped].tolist(), ids[grouped].tolist()):
+        members_by_root[root].append(member_id)
+
+    return [
+        {
+            'members': members_by_root[root],
+            'evidence': list(group['evidence']),
+            'evidence_counts': group['evidence_counts'],
+            'details': group['details']
+        }
+        for root, group in groups.items()
+    ]
+
+def calculate_confidence_score(group: Dict, table: MemberTable) -> int:
+    """Calculate confidence score for a potential alt group based on evidence strength."""
+    base_score = 0
+    evidence_count = len(group['evidence'])
+    member_count = len(group['members'])
+
+    if member_count < 2:
+        return 0
+
+    # Base score from evidence count
+    base_score += min(evidence_count * 15, 60)  # Max 60 from evidence count
+
+    # Bonus for multiple members
+    if member_count > 2:
+        base_score += min((member_count - 2) * 10, 30)  # Max 30 bonus
+
+    # Analyze evidence quality, once per category present in the group
+    evidence_quality_bonus = 0
+    evidence_counts = group.get('evidence_counts', {})
+    for evidence_types, bonus in EVIDENCE_CATEGORY_BONUSES:
+        if any(evidence_counts.get(evidence_type) for evidence_type in evidence_types):
+            evidence_quality_bonus += bonus
+
+    # Account age similarity bonus
+    creation_times = np.sort(table.created_at[table.positions(group['members'])])
+
+    if len(creation_times) > 1:
+        # Sum of all pairwise differences from sorted times: the i-th time is
+        # added i times and subtracted (n - 1 - i) times
+        count = len(creation_times)
+        weights = 2 * np.arange(count) - (count - 1)
+        avg_diff = float(creation_times @ weights) / (count * (count - 1) / 2)
+        if avg_diff < 86400:  # Within 24 hours
+            evidence_quality_bonus += 25
+        elif avg_diff < 604800:  # Within 1 week
+            evidence_quality_bonus += 15
+        elif avg_diff < 2592000:  # Within 1 month
+            evidence_quality_bonus += 10
+
+    final_score = min(base_score + evidence_quality_bonus, 100)
+    return max(final_score, 0)
+
+def score_groups(analyses: Iterable[List[Dict]], table: MemberTable) -> List[Dict]:
+    """Merge analysis results into potential alt groups and score them, highest first."""
+    results = []
+
+    for group in merge_analysis_results(analyses, table.ids):
+        confidence_score = calculate_confidence_score(group, table)
+
+        if confidence_score > 0:  # Only include groups with some evidence
+            results.append({
+                'members': group['members'],
+                'confidence_score': confidence_score,
+                'evidence': group['evidence'],
+                'evidence_counts': group['evidence_counts'],
+                'analysis_details': group['details']
+            })
+
+    results.sort(key=lambda x: x['confidence_score'], reverse=True)
+    return results
+
+# Benchmark: python -m utils.alt_groups
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(33)
+    member_count = 200_000
+    edge_target = 1_000_000
+    types = [value for name, value in vars(EvidenceType).items() if name.isupper()]
+
+    # Raw union-find over random edges
+    rng = np.random.default_rng(33)
+    left = rng.integers(0, member_count, edge_target)
+    right = rng.integers(0, member_count, edge_target)
+    start = time.perf_counter()
+    roots = find_roots(member_count, left, right)
+    elapsed = time.perf_counter() - start
+    print(f"Union-find: {edge_target:,} edges over {member_count:,} items into "
+          f"{len(np.unique(roots)):,} sets in {elapsed:.2f}s")
+
+    # Full merge: username pairs mixed with creation/join clusters, one million edges in total
+    analyses, edges = [[]], 0
+    while edges < edge_target:
+        size = 2 if random.random() < 0.5 else random.randint(3, 30)
+        member_ids = random.sample(range(member_count), size)
+        analyses[0].append({
+            'member_ids': member_ids,
+            'evidence_type': random.choice(types),
+            'evidence': f"synthetic evidence {len(analyses[0]) % 1000}",
+            'details': {}
+        })
+        edges += size - 1
+
+    start = time.perf_counter()
+    groups = merge_analysis_results(analyses, range(member_count))
+    elapsed = time.perf_counter() - start
+
+    print(f"Merge: {len(analyses[0]):,} results ({edges:,} edges) over {member_count:,} members "
+          f"into {len(groups):,} groups in {elapsed:.2f}s")
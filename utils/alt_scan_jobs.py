@@ -0,0 +1,175 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job statuses; queued and running jobs are resumed after a restart
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+def _json_default(value):
+    """Encode NumPy scalars left in analysis details."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+class AltScanJob:
+    """An alt scan for one guild, with the checkpoint of every finished phase."""
+
+    __slots__ = ('guild_id', 'channel_id', 'requested_by', 'options', 'status', 'phase',
+                 'checkpoint', 'message_id', 'error', 'state', 'task')
+
+    def __init__(self, guild_id: int, channel_id: int, requested_by: int, options: Dict,
+                 status: str = JOB_QUEUED, phase: int = 0, checkpoint: Optional[Dict] = None,
+                 message_id: Optional[int] = None, error: Optional[str] = None):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.requested_by = requested_by
+        self.options = options
+        self.status = status
+        self.phase = phase  # Index of the next phase to run
+        self.checkpoint = checkpoint or {}  # phase key: result of that phase
+        self.message_id = message_id  # Progress message, edited as phases finish
+        self.error = error
+        self.state: Dict = {}  # In-memory data that phases rebuild after a restart
+        self.task: Optional[asyncio.Task] = None
+
+    def to_row(self) -> Tuple:
+        """Serialize the job for AltDetectionDB.save_scan_job."""
+        return (
+            self.guild_id, self.channel_id, self.requested_by,
+            json.dumps(self.options), self.status, self.phase,
+            json.dumps(self.checkpoint, default=_json_default),
+            self.message_id, self.error
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> 'AltScanJob':
+        """Rebuild a job from a row in to_row order."""
+        guild_id, channel_id, requested_by, options, status, phase, checkpoint, message_id, error = row
+        return cls(
+            guild_id, channel_id, requested_by, json.loads(options or '{}'),
+            status, phase, json.loads(checkpoint or '{}'), message_id, error
+        )
+
+# A phase takes the job and returns its JSON-serializable checkpoint
+PhaseStep = Callable[[AltScanJob], Awaitable[object]]
+ProgressCallback = Callable[[AltScanJob, str], Awaitable[None]]
+
+class AltScanRunner:
+    """Background alt-scan jobs: one per guild, checkpointed after every phase, globally capped."""
+
+    def __init__(self, db, phases: List[Tuple[str, str, PhaseStep]], progress: ProgressCallback,
+                 max_concurrent: int = 2):
+        self.db = db
+        self.phases = phases  # (checkpoint key, progress label, step)
+        self.progress = progress
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.jobs: Dict[int, AltScanJob] = {}  # guild_id: active job
+        self.closing = False
+
+    def get_job(self, guild_id: int) -> Optional[AltScanJob]:
+        """Get the active job of a guild."""
+        return self.jobs.get(guild_id)
+
+    async def submit(self, guild_id: int, channel_id: int, requested_by: int, options: Dict) -> Tuple[AltScanJob, bool]:
+        """Queue a scan for a guild, or return the one already active; the flag is True if queued now."""
+        job = self.jobs.get(guild_id)
+        if job is not None:
+            return job, False
+
+        job = AltScanJob(guild_id, channel_id, requested_by, options)
+        self._start(job)
+        await self.save(job)
+        return job, True
+
+    async def resume(self) -> int:
+        """Restart the jobs that were queued or running when the bot stopped."""
+        resumed = 0
+        for row in await self.db.get_active_scan_jobs():
+            job = AltScanJob.from_row(row)
+            if job.guild_id not in self.jobs:
+                self._start(job)
+                resumed += 1
+
+        if resumed:
+            logger.info(f"Resumed {resumed} alt scan job(s)")
+        return resumed
+
+    def cancel(self, guild_id: int) -> bool:
+        """Cancel the active job of a guild."""
+        job = self.jobs.get(guild_id)
+        if job is None or job.task is None:
+            return False
+
+        job.task.cancel()
+        return True
+
+    async def save(self, job: AltScanJob):
+        """Persist a job's status and checkpoint, e.g. partial results within a phase."""
+        await self.db.save_scan_job(job.to_row())
+
+    def _start(self, job: AltScanJob):
+        """Register a job and start its task."""
+        self.jobs[job.guild_id] = job
+        job.task = asyncio.create_task(self._run(job))
+
+    async def _report(self, job: AltScanJob, text: str):
+        """Update the progress message without letting Discord errors fail the job."""
+        try:
+            await self.progress(job, text)
+        except Exception as e:
+            logger.warning(f"Could not update alt scan progress for guild {job.guild_id}: {e}")
+
+    async def _run(self, job: AltScanJob):
+        """Run the remaining phases of a job, saving a checkpoint after each."""
+        try:
+            if self.semaphore.locked():
+                await self._report(job, "⏳ Waiting for other scans to finish...")
+
+            async with self.semaphore:
+                job.status = JOB_RUNNING
+                for index in range(job.phase, len(self.phases)):
+                    key, label, step = self.phases[index]
+                    await self._report(job, f"**Phase {index + 1}/{len(self.phases)}:** {label}...")
+
+                    job.checkpoint[key] = await step(job)
+                    job.phase = index + 1
+                    await self.save(job)
+
+            job.status = JOB_COMPLETED
+            await self.save(job)
+            await self._report(job, "✅ Scan complete.")
+
+        except asyncio.CancelledError:
+            # On shutdown the job stays active so it resumes from its last checkpoint
+            if not self.closing:
+                job.status = JOB_CANCELLED
+                await self.save(job)
+                await self._report(job, "🛑 Scan cancelled.")
+            raise
+
+        except Exception as e:
+            logger.error(f"Alt scan failed for guild {job.guild_id} in phase {job.phase + 1}: {e}")
+            job.status = JOB_FAILED
+            job.error = str(e)
+            await self.save(job)
+            await self._report(job, f"❌ Scan failed during phase {job.phase + 1}: {e}")
+
+        finally:
+            if self.jobs.get(job.guild_id) is job:
+                del self.jobs[job.guild_id]
+
+    async def close(self):
+        """Stop running jobs, leaving them to resume from their checkpoints."""
+        self.closing = True
+        tasks = [job.task for job in self.jobs.values() if job.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import signal
+from typing import Dict, List, Optional
+
+from utils.alt_groups import score_groups
+from utils.analysis import BehavioralAnalyzer
+from utils.member_table import MemberTable
+from utils.patterns import PatternDetector
+
+# Functions run inside AnalysisPool workers. Workers are started with forkserver (or spawn), so the
+# pool preloads this module and nothing else; it must stay free of bot and Discord imports.
+
+# Analysis key: (detector, coroutine method) run inside a worker process
+ANALYSES = {
+    'creation': ('patterns', 'analyze_creation_patterns'),
+    'usernames': ('patterns', 'analyze_username_similarities'),
+    'joins': ('patterns', 'analyze_join_patterns'),
+    'behavior': ('behavior', 'analyze_behavioral_patterns'),
+    'correlations': ('behavior', 'analyze_activity_correlations')
+}
+
+class AnalysisTimeout(Exception):
+    """A call ran past its time limit and was stopped inside the worker."""
+
+def _alarm(signum, frame):
+    raise AnalysisTimeout()
+
+def _run_limited(timeout: Optional[float], function, *args):
+    """Run a function, interrupting it after timeout seconds where SIGALRM is available."""
+    limited = bool(timeout) and hasattr(signal, 'setitimer')
+    if limited:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return function(*args)
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def report_pid(pids):
+    """Pool initializer: tell the parent this worker's PID, so it can kill the worker if it hangs."""
+    pids.put(os.getpid())
+
+def _analyze(key: str, table: MemberTable) -> List[Dict]:
+    detector_name, method = ANALYSES[key]
+    detector = PatternDetector() if detector_name == 'patterns' else BehavioralAnalyzer()
+    # The detectors are CPU-bound coroutines; a private loop just drives them
+    return asyncio.run(getattr(detector, method)(table.rows()))
+
+def run_analysis(key: str, table: MemberTable, timeout: Optional[float] = None) -> List[Dict]:
+    """Run one detector over a member snapshot."""
+    return _run_limited(timeout, _analyze, key, table)
+
+def run_scoring(analyses: List[List[Dict]], table: MemberTable, timeout: Optional[float] = None) -> List[Dict]:
+    """Merge and score analysis results."""
+    return _run_limited(timeout, score_groups, analyses, table)
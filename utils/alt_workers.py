@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from utils.alt_worker_entry import ANALYSES, AnalysisTimeout, report_pid, run_analysis, run_scoring
+from utils.member_table import MemberTable
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_GRACE = 30.0  # Seconds past the timeout before the workers of a pool that ignored it are killed
+
+def _start_method() -> str:
+    """forkserver: workers fork from a clean single-threaded server, not from the bot's threaded process."""
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+class AnalysisPool:
+    """Process pool that runs alt analyses off the event loop, with a per-call timeout."""
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = 600.0):
+        self.workers = workers or min(len(ANALYSES), os.cpu_count() or 1)
+        self.timeout = timeout
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.worker_pids = None  # SimpleQueue the current pool's workers put their PIDs on
+        self.stats = {
+            'analyses_run': 0,
+            'timeouts': 0,
+            'pool_restarts': 0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use."""
+        if self.executor is None:
+            context = multiprocessing.get_context(_start_method())
+            if context.get_start_method() == 'forkserver':
+                # The server imports the analysis code once, and not the bot's entry script
+                context.set_forkserver_preload(['utils.alt_worker_entry'])
+            self.worker_pids = context.SimpleQueue()
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                                initializer=report_pid, initargs=(self.worker_pids,))
+        return self.executor
+
+    async def _submit(self, function, *args):
+        """Run a function in the pool; the worker stops it at the timeout, and the pool is replaced if it can't."""
+        executor = self._get_executor()
+        worker_pids = self.worker_pids
+        future = asyncio.get_running_loop().run_in_executor(executor, function, *args, self.timeout)
+        try:
+            return await asyncio.wait_for(future, self.timeout + SHUTDOWN_GRACE)
+        except AnalysisTimeout:
+            self.stats['timeouts'] += 1
+            logger.error(f"Alt analysis exceeded {self.timeout}s and was stopped")
+            raise asyncio.TimeoutError()
+        except asyncio.TimeoutError:
+            # The worker did not stop itself; kill the pool's workers and start a fresh pool
+            self.stats['timeouts'] += 1
+            self.stats['pool_restarts'] += 1
+            logger.error(f"Alt analysis exceeded {self.timeout}s; replacing the worker pool")
+            self._shutdown(executor)
+            self._kill_workers(worker_pids)
+            raise
+
+    async def analyze(self, key: str, table: MemberTable) -> List[Dict]:
+        """Run one analysis ('creation', 'usernames', 'joins', 'behavior', 'correlations')."""
+        results = await self._submit(run_analysis, key, table)
+        self.stats['analyses_run'] += 1
+        return results
+
+    async def analyze_all(self, table: MemberTable, keys: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """Run several analyses in parallel, one worker each."""
+        keys = list(keys or ANALYSES)
+        results = await asyncio.gather(*(self.analyze(key, table) for key in keys))
+        return dict(zip(keys, results))
+
+    async def score(self, analyses: List[List[Dict]], table: MemberTable) -> List[Dict]:
+        """Merge and score analysis results into potential alt groups."""
+        return await self._submit(run_scoring, analyses, table)
+
+    def _shutdown(self, executor: ProcessPoolExecutor):
+        """Stop an executor without waiting for its running calls; the next call starts a new one."""
+        if self.executor is executor:
+            self.executor = None
+            self.worker_pids = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _kill_workers(self, worker_pids):
+        """Kill every worker a pool started; shutdown() alone would leave a hung one running."""
+        while not worker_pids.empty():
+            pid = worker_pids.get()
+            try:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except (ProcessLookupError, PermissionError):
+                pass  # Already exited
+        worker_pids.close()
+
+    def close(self):
+        """Shut down the pool."""
+        if self.executor is not None:
+            self._shutdown(self.executor)
@@ -5,14 +5,26 @@ from typing import List, Dict, Tuple, Set
 import statistics
 from collections import defaultdict, Counter
 import math
+import numpy as np
+from utils.alt_groups import EvidenceType
+from utils.similarity import DEFAULT_TILE_SIZE, cosine_block, iter_similar_pairs, jaccard_block
 
 logger = logging.getLogger(__name__)
 
+# Weights for the communication similarity metrics
+COMMUNICATION_WEIGHTS = {
+    'avg_message_length': 0.3,
+    'reaction_ratio': 0.25,
+    'activity_intensity': 0.25,
+    'message_frequency': 0.2
+}
+
 class BehavioralAnalyzer:
     """Advanced behavioral analysis for detecting alt account patterns."""
     
-    def __init__(self):
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE):
         self.analysis_cache = {}
+        self.tile_size = tile_size  # Members per similarity tile; bounds peak memory
     
     async def analyze_behavioral_patterns(self, members: List[Dict]) -> List[Dict]:
         """
@@ -57,20 +69,199 @@ class BehavioralAnalyzer:
     async def _analyze_message_timing_patterns(self, members: List[Dict]) -> List[Dict]:
         """Analyze message timing patterns to identify synchronized activity."""
         results = []
+        timing_profiles = self._build_timing_profiles(members)
+        
+        # Find members with similar timing patterns
+        member_ids = list(timing_profiles.keys())
+        if len(member_ids) < 2:
+            return results
+        
+        # Pack the 24-bin histograms and peak-hour sets into matrices
+        distributions = np.array([timing_profiles[member_id]['distribution'] for member_id in member_ids])
+        peaks = np.zeros((len(member_ids), 24), dtype=bool)
+        for row, member_id in enumerate(member_ids):
+            peaks[row, timing_profiles[member_id]['peak_hours']] = True
+        has_peaks = peaks.any(axis=1)
+        
+        cosine = cosine_block(distributions)
+        peak_overlap = jaccard_block(peaks)
+        
+        def score(rows: slice, cols: slice) -> np.ndarray:
+            similarity = cosine(rows, cols)
+            # Bonus for similar peak hours
+            both_have_peaks = has_peaks[rows][:, None] & has_peaks[cols][None, :]
+            similarity = np.where(both_have_peaks, similarity * 0.7 + peak_overlap(rows, cols) * 0.3, similarity)
+            return np.clip(similarity, 0.0, 1.0)
+        
+        async for i, j, similarity in self._similar_pairs(score, len(member_ids), 0.8):  # High similarity threshold
+            profile1 = timing_profiles[member_ids[i]]
+            profile2 = timing_profiles[member_ids[j]]
+            
+            evidence = f"Message timing pattern similarity: {similarity:.2%}"
+            details = {
+                'timing_similarity': similarity,
+                'member1_peak_hours': profile1['peak_hours'],
+                'member2_peak_hours': profile2['peak_hours'],
+                'variance_diff': abs(profile1['activity_variance'] - profile2['activity_variance'])
+            }
+            
+            results.append({
+                'member_ids': [member_ids[i], member_ids[j]],
+                'evidence_type': EvidenceType.MESSAGE_TIMING,
+                'evidence': evidence,
+                'details': details
+            })
+        
+        return results
+    
+    async def _analyze_activity_correlations(self, members: List[Dict]) -> List[Dict]:
+        """Analyze activity level correlations between members."""
+        results = []
+        activity_profiles = self._build_activity_profiles(members)
+        
+        # Find members with suspiciously similar activity levels
+        member_ids = list(activity_profiles.keys())
+        if len(member_ids) < 2:
+            return results
+        
+        values = np.array([
+            self._activity_vector(activity_profiles[member_id]) for member_id in member_ids
+        ], dtype=np.float64)
+        has_activity = values.any(axis=1)
+        
+        def score(rows: slice, cols: slice) -> np.ndarray:
+            values1 = values[rows][:, None, :]
+            values2 = values[cols][None, :, :]
+            
+            # Normalize each feature by the pair's max, then invert the distance
+            scale = np.maximum(np.maximum(values1, values2), 1.0)
+            distance = np.sqrt((((values1 - values2) / scale) ** 2).sum(axis=2))
+            correlation = 1.0 / (1.0 + distance)
+            
+            both_active = has_activity[rows][:, None] & has_activity[cols][None, :]
+            return np.where(both_active, correlation, 0.0)
+        
+        async for i, j, correlation in self._similar_pairs(score, len(member_ids), 0.85):  # High correlation threshold
+            profile1 = activity_profiles[member_ids[i]]
+            profile2 = activity_profiles[member_ids[j]]
+            
+            evidence = f"Activity level correlation: {correlation:.2%}"
+            details = {
+                'activity_correlation': correlation,
+                'member1_score': profile1['activity_score'],
+                'member2_score': profile2['activity_score'],
+                'score_difference': abs(profile1['activity_score'] - profile2['activity_score'])
+            }
+            
+            results.append({
+                'member_ids': [member_ids[i], member_ids[j]],
+                'evidence_type': EvidenceType.ACTIVITY_LEVEL,
+                'evidence': evidence,
+                'details': details
+            })
+        
+        return results
+    
+    async def _analyze_communication_patterns(self, members: List[Dict]) -> List[Dict]:
+        """Analyze communication patterns for similarities."""
+        results = []
+        communication_profiles = self._build_communication_profiles(members)
+        
+        # Compare communication patterns
+        member_ids = list(communication_profiles.keys())
+        if len(member_ids) < 2:
+            return results
+        
+        metrics = list(COMMUNICATION_WEIGHTS.keys())
+        weights = np.array(list(COMMUNICATION_WEIGHTS.values()))
+        values = np.array([
+            [communication_profiles[member_id][metric] for metric in metrics] for member_id in member_ids
+        ], dtype=np.float64)
+        
+        def score(rows: slice, cols: slice) -> np.ndarray:
+            values1 = values[rows][:, None, :]
+            values2 = values[cols][None, :, :]
+            
+            # Relative similarity per metric; two zeros count as identical
+            high = np.maximum(values1, values2)
+            low = np.minimum(values1, values2)
+            metric_similarity = np.divide(low, high, out=np.ones_like(high), where=high != 0)
+            return metric_similarity @ weights
+        
+        async for i, j, similarity in self._similar_pairs(score, len(member_ids), 0.8):  # High similarity threshold
+            profile1 = communication_profiles[member_ids[i]]
+            profile2 = communication_profiles[member_ids[j]]
+            
+            evidence = f"Communication pattern similarity: {similarity:.2%}"
+            details = {
+                'communication_similarity': similarity,
+                'avg_length_diff': abs(profile1['avg_message_length'] - profile2['avg_message_length']),
+                'reaction_ratio_diff': abs(profile1['reaction_ratio'] - profile2['reaction_ratio']),
+                'intensity_diff': abs(profile1['activity_intensity'] - profile2['activity_intensity'])
+            }
+            
+            results.append({
+                'member_ids': [member_ids[i], member_ids[j]],
+                'evidence_type': EvidenceType.COMMUNICATION,
+                'evidence': evidence,
+                'details': details
+            })
         
+        return results
+    
+    async def _analyze_channel_usage_patterns(self, members: List[Dict]) -> List[Dict]:
+        """Analyze channel usage patterns for similarities."""
+        results = []
+        channel_usage = self._build_channel_usage(members)
+        
+        # Find similar channel usage patterns
+        member_ids = list(channel_usage.keys())
+        if len(member_ids) < 2:
+            return results
+        
+        channels = np.array([channel_usage[member_id]['channels_used'] for member_id in member_ids], dtype=np.float64)
+        diversity = np.array([channel_usage[member_id]['diversity_ratio'] for member_id in member_ids])
+        
+        def score(rows: slice, cols: slice) -> np.ndarray:
+            channels_diff = np.abs(channels[rows][:, None] - channels[cols][None, :])
+            diversity_diff = np.abs(diversity[rows][:, None] - diversity[cols][None, :])
+            
+            # Consider similar if channel usage is very close
+            close = (channels_diff <= 1) & (diversity_diff < 0.1)
+            return np.where(close, 1.0 - (channels_diff * 0.2 + diversity_diff * 2), 0.0)
+        
+        async for i, j, similarity_score in self._similar_pairs(score, len(member_ids), 0.8):
+            usage1 = channel_usage[member_ids[i]]
+            usage2 = channel_usage[member_ids[j]]
+            
+            evidence = f"Channel usage pattern similarity: {similarity_score:.2%}"
+            details = {
+                'usage_similarity': similarity_score,
+                'channels_diff': abs(usage1['channels_used'] - usage2['channels_used']),
+                'diversity_diff': abs(usage1['diversity_ratio'] - usage2['diversity_ratio'])
+            }
+            
+            results.append({
+                'member_ids': [member_ids[i], member_ids[j]],
+                'evidence_type': EvidenceType.CHANNEL_USAGE,
+                'evidence': evidence,
+                'details': details
+            })
+        
+        return results
+    
+    def _build_timing_profiles(self, members: List[Dict]) -> Dict[int, Dict]:
+        """Build hour-of-day timing profiles for members with message history."""
         # Group members by their message timing patterns
         timing_profiles = {}
         
         for member in members:
-            message_times = member.get('message_times', [])
-            if not message_times:
-                continue
-            
             # Create timing profile based on hour-of-day distribution
-            hour_distribution = [0] * 24
-            for timestamp in message_times:
-                hour = timestamp.hour
-                hour_distribution[hour] += 1
+            hour_distribution = member.get('hour_histogram')
+            if hour_distribution is None:
+                hour_distribution = [0] * 24
+                for timestamp in member.get('message_times', []):
+                    hour_distribution[timestamp.hour] += 1
             
             # Normalize distribution
             total_messages = sum(hour_distribution)
@@ -83,41 +274,10 @@ class BehavioralAnalyzer:
                     'activity_variance': statistics.variance(normalized_dist) if len(normalized_dist) > 1 else 0
                 }
         
-        # Find members with similar timing patterns
-        member_ids = list(timing_profiles.keys())
-        
-        for i in range(len(member_ids)):
-            for j in range(i + 1, len(member_ids)):
-                member1_id = member_ids[i]
-                member2_id = member_ids[j]
-                
-                profile1 = timing_profiles[member1_id]
-                profile2 = timing_profiles[member2_id]
-                
-                # Calculate timing similarity
-                similarity = await self._calculate_timing_similarity(profile1, profile2)
-                
-                if similarity > 0.8:  # High similarity threshold
-                    evidence = f"Message timing pattern similarity: {similarity:.2%}"
-                    details = {
-                        'timing_similarity': similarity,
-                        'member1_peak_hours': profile1['peak_hours'],
-                        'member2_peak_hours': profile2['peak_hours'],
-                        'variance_diff': abs(profile1['activity_variance'] - profile2['activity_variance'])
-                    }
-                    
-                    results.append({
-                        'member_ids': [member1_id, member2_id],
-                        'evidence': evidence,
-                        'details': details
-                    })
-        
-        return results
+        return timing_profiles
     
-    async def _analyze_activity_correlations(self, members: List[Dict]) -> List[Dict]:
-        """Analyze activity level correlations between members."""
-        results = []
-        
+    def _build_activity_profiles(self, members: List[Dict]) -> Dict[int, Dict]:
+        """Build activity level profiles for members."""
         # Create activity profiles
         activity_profiles = {}
         
@@ -142,41 +302,10 @@ class BehavioralAnalyzer:
             profile['activity_score'] = activity_score
             activity_profiles[member['id']] = profile
         
-        # Find members with suspiciously similar activity levels
-        member_ids = list(activity_profiles.keys())
-        
-        for i in range(len(member_ids)):
-            for j in range(i + 1, len(member_ids)):
-                member1_id = member_ids[i]
-                member2_id = member_ids[j]
-                
-                profile1 = activity_profiles[member1_id]
-                profile2 = activity_profiles[member2_id]
-                
-                # Calculate activity correlation
-                correlation = await self._calculate_activity_correlation(profile1, profile2)
-                
-                if correlation > 0.85:  # High correlation threshold
-                    evidence = f"Activity level correlation: {correlation:.2%}"
-                    details = {
-                        'activity_correlation': correlation,
-                        'member1_score': profile1['activity_score'],
-                        'member2_score': profile2['activity_score'],
-                        'score_difference': abs(profile1['activity_score'] - profile2['activity_score'])
-                    }
-                    
-                    results.append({
-                        'member_ids': [member1_id, member2_id],
-                        'evidence': evidence,
-                        'details': details
-                    })
-        
-        return results
+        return activity_profiles
     
-    async def _analyze_communication_patterns(self, members: List[Dict]) -> List[Dict]:
-        """Analyze communication patterns for similarities."""
-        results = []
-        
+    def _build_communication_profiles(self, members: List[Dict]) -> Dict[int, Dict]:
+        """Build communication profiles for members who have sent messages."""
         # Group members by communication characteristics
         communication_profiles = {}
         
@@ -201,41 +330,10 @@ class BehavioralAnalyzer:
             
             communication_profiles[member['id']] = profile
         
-        # Compare communication patterns
-        member_ids = list(communication_profiles.keys())
-        
-        for i in range(len(member_ids)):
-            for j in range(i + 1, len(member_ids)):
-                member1_id = member_ids[i]
-                member2_id = member_ids[j]
-                
-                profile1 = communication_profiles[member1_id]
-                profile2 = communication_profiles[member2_id]
-                
-                # Calculate communication similarity
-                similarity = await self._calculate_communication_similarity(profile1, profile2)
-                
-                if similarity > 0.8:  # High similarity threshold
-                    evidence = f"Communication pattern similarity: {similarity:.2%}"
-                    details = {
-                        'communication_similarity': similarity,
-                        'avg_length_diff': abs(profile1['avg_message_length'] - profile2['avg_message_length']),
-                        'reaction_ratio_diff': abs(profile1['reaction_ratio'] - profile2['reaction_ratio']),
-                        'intensity_diff': abs(profile1['activity_intensity'] - profile2['activity_intensity'])
-                    }
-                    
-                    results.append({
-                        'member_ids': [member1_id, member2_id],
-                        'evidence': evidence,
-                        'details': details
-                    })
-        
-        return results
+        return communication_profiles
     
-    async def _analyze_channel_usage_patterns(self, members: List[Dict]) -> List[Dict]:
-        """Analyze channel usage patterns for similarities."""
-        results = []
-        
+    def _build_channel_usage(self, members: List[Dict]) -> Dict[int, Dict]:
+        """Build channel usage profiles for members who have sent messages."""
         # This would require more detailed channel usage data
         # For now, we'll use basic channel count analysis
         channel_usage = {}
@@ -256,40 +354,16 @@ class BehavioralAnalyzer:
                 'messages_per_channel': message_count / max(channels_used, 1)
             }
         
-        # Find similar channel usage patterns
-        member_ids = list(channel_usage.keys())
-        
-        for i in range(len(member_ids)):
-            for j in range(i + 1, len(member_ids)):
-                member1_id = member_ids[i]
-                member2_id = member_ids[j]
-                
-                usage1 = channel_usage[member1_id]
-                usage2 = channel_usage[member2_id]
-                
-                # Calculate usage similarity
-                channels_diff = abs(usage1['channels_used'] - usage2['channels_used'])
-                diversity_diff = abs(usage1['diversity_ratio'] - usage2['diversity_ratio'])
-                
-                # Consider similar if channel usage is very close
-                if channels_diff <= 1 and diversity_diff < 0.1:
-                    similarity_score = 1.0 - (channels_diff * 0.2 + diversity_diff * 2)
-                    
-                    if similarity_score > 0.8:
-                        evidence = f"Channel usage pattern similarity: {similarity_score:.2%}"
-                        details = {
-                            'usage_similarity': similarity_score,
-                            'channels_diff': channels_diff,
-                            'diversity_diff': diversity_diff
-                        }
-                        
-                        results.append({
-                            'member_ids': [member1_id, member2_id],
-                            'evidence': evidence,
-                            'details': details
-                        })
-        
-        return results
+        return channel_usage
+    
+    async def _similar_pairs(self, score_block, count: int, threshold: float):
+        """Yield (i, j, score) for member index pairs above the threshold."""
+        for rows, cols, scores in iter_similar_pairs(score_block, count, threshold, self.tile_size):
+            for i, j, score in zip(rows.tolist(), cols.tolist(), scores.tolist()):
+                yield i, j, score
+            
+            # Let the event loop breathe between row bands on large guilds
+            await asyncio.sleep(0)
     
     async def analyze_activity_correlations(self, members: List[Dict]) -> List[Dict]:
         """Analyze correlations between account age and activity levels."""
@@ -370,6 +444,7 @@ class BehavioralAnalyzer:
                             
                             results.append({
                                 'member_ids': [member1_id, member2_id],
+                                'evidence_type': EvidenceType.AGE_ACTIVITY,
                                 'evidence': evidence,
                                 'details': details
                             })
@@ -419,24 +494,21 @@ class BehavioralAnalyzer:
         
         return max(0.0, min(1.0, similarity))
     
+    def _activity_vector(self, profile: Dict) -> List[float]:
+        """Get the numeric features used for activity correlation."""
+        return [
+            profile['message_count_7d'],
+            profile['message_count_30d'],
+            profile['channels_used'],
+            min(profile['avg_message_length'], 1000),  # Cap message length
+            profile['reaction_count']
+        ]
+    
     async def _calculate_activity_correlation(self, profile1: Dict, profile2: Dict) -> float:
         """Calculate correlation between activity profiles."""
         # Extract numeric values for correlation
-        values1 = [
-            profile1['message_count_7d'],
-            profile1['message_count_30d'],
-            profile1['channels_used'],
-            min(profile1['avg_message_length'], 1000),  # Cap message length
-            profile1['reaction_count']
-        ]
-        
-        values2 = [
-            profile2['message_count_7d'],
-            profile2['message_count_30d'],
-            profile2['channels_used'],
-            min(profile2['avg_message_length'], 1000),
-            profile2['reaction_count']
-        ]
+        values1 = self._activity_vector(profile1)
+        values2 = self._activity_vector(profile2)
         
         # Calculate correlation coefficient
         if len(values1) != len(values2) or all(v == 0 for v in values1) or all(v == 0 for v in values2):
@@ -455,17 +527,9 @@ class BehavioralAnalyzer:
     
     async def _calculate_communication_similarity(self, profile1: Dict, profile2: Dict) -> float:
         """Calculate similarity between communication profiles."""
-        # Weight different aspects of communication
-        weights = {
-            'avg_message_length': 0.3,
-            'reaction_ratio': 0.25,
-            'activity_intensity': 0.25,
-            'message_frequency': 0.2
-        }
-        
         similarity_score = 0.0
         
-        for metric, weight in weights.items():
+        for metric, weight in COMMUNICATION_WEIGHTS.items():
             val1 = profile1.get(metric, 0)
             val2 = profile2.get(metric, 0)
             
@@ -482,3 +546,99 @@ class BehavioralAnalyzer:
             similarity_score += metric_similarity * weight
         
         return similarity_score
+
+# Benchmark: python -m utils.analysis
+if __name__ == "__main__":
+    import random
+    import time
+    
+    def make_members(count: int) -> List[Dict]:
+        """Generate synthetic members, with every tenth one a near-copy of the previous."""
+        now = datetime.utcnow()
+        members = []
+        for member_id in range(count):
+            if member_id % 10 == 9:
+                base = members[-1]
+                member = dict(base, id=member_id)
+                member['message_count_30d'] = base['message_count_30d'] + random.randint(0, 2)
+            else:
+                peak = random.randint(0, 23)
+                member = {
+                    'id': member_id,
+                    'message_times': [
+                        now.replace(hour=(peak + int(random.gauss(0, 3))) % 24)
+                        for _ in range(random.randint(5, 60))
+                    ],
+                    'message_count_7d': random.randint(0, 200),
+                    'message_count_30d': random.randint(1, 800),
+                    'channels_used': random.randint(1, 25),
+                    'avg_message_length': random.uniform(5, 300),
+                    'reaction_count': random.randint(0, 300)
+                }
+            members.append(member)
+        return members
+    
+    async def legacy_pairs(analyzer: BehavioralAnalyzer, members: List[Dict]) -> Set[Tuple[str, int, int]]:
+        """Score every pair with the per-pair coroutines, as the nested loops used to."""
+        found = set()
+        
+        async def scan(name: str, profiles: Dict, scorer, threshold: float):
+            member_ids = list(profiles.keys())
+            for i in range(len(member_ids)):
+                for j in range(i + 1, len(member_ids)):
+                    if await scorer(profiles[member_ids[i]], profiles[member_ids[j]]) > threshold:
+                        found.add((name, member_ids[i], member_ids[j]))
+        
+        async def channel_similarity(usage1: Dict, usage2: Dict) -> float:
+            channels_diff = abs(usage1['channels_used'] - usage2['channels_used'])
+            diversity_diff = abs(usage1['diversity_ratio'] - usage2['diversity_ratio'])
+            if channels_diff <= 1 and diversity_diff < 0.1:
+                return 1.0 - (channels_diff * 0.2 + diversity_diff * 2)
+            return 0.0
+        
+        await scan('timing', analyzer._build_timing_profiles(members), analyzer._calculate_timing_similarity, 0.8)
+        await scan('activity', analyzer._build_activity_profiles(members), analyzer._calculate_activity_correlation, 0.85)
+        await scan('communication', analyzer._build_communication_profiles(members), analyzer._calculate_communication_similarity, 0.8)
+        await scan('channels', analyzer._build_channel_usage(members), channel_similarity, 0.8)
+        return found
+    
+    async def vectorized_pairs(analyzer: BehavioralAnalyzer, members: List[Dict]) -> Set[Tuple[str, int, int]]:
+        """Run the tiled engine over the same four analyses."""
+        found = set()
+        for name, method in (
+            ('timing', analyzer._analyze_message_timing_patterns),
+            ('activity', analyzer._analyze_activity_correlations),
+            ('communication', analyzer._analyze_communication_patterns),
+            ('channels', analyzer._analyze_channel_usage_patterns)
+        ):
+            for result in await method(members):
+                found.add((name, *result['member_ids']))
+        return found
+    
+    async def benchmark():
+        random.seed(30)
+        analyzer = BehavioralAnalyzer()
+        
+        print(f"{'members':>8} {'legacy':>10} {'vectorized':>11} {'speedup':>8} {'pairs':>8} {'match':>6}")
+        for count in (250, 500, 1000):
+            members = make_members(count)
+            
+            start = time.perf_counter()
+            expected = await legacy_pairs(analyzer, members)
+            legacy_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            actual = await vectorized_pairs(analyzer, members)
+            vectorized_time = time.perf_counter() - start
+            
+            print(f"{count:>8} {legacy_time:>9.2f}s {vectorized_time:>10.2f}s "
+                  f"{legacy_time / vectorized_time:>7.1f}x {len(actual):>8} {str(actual == expected):>6}")
+        
+        # Large guilds are only practical with the tiled engine
+        for count in (2000, 5000):
+            members = make_members(count)
+            start = time.perf_counter()
+            actual = await vectorized_pairs(analyzer, members)
+            print(f"{count:>8} {'-':>10} {time.perf_counter() - start:>10.2f}s {'-':>8} {len(actual):>8}")
+    
+    asyncio.run(benchmark())
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DISCORD_API = 'https://discord.com/api'
+OAUTH_SCOPES = 'identify guilds'
+GUILD_FIELDS = ('id', 'name', 'icon', 'owner', 'permissions')  # Kept from /users/@me/guilds
+TOKEN_REFRESH_MARGIN = 60  # Seconds before expiry an access token is refreshed
+PRUNE_INTERVAL = 300  # Seconds between sweeps of expired sessions
+GUILD_RETRY_INTERVAL = 30  # Seconds between guild list retries while Discord is unreachable
+
+class OAuthError(Exception):
+    """Discord rejected an OAuth2 or user API request."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+    @property
+    def transient(self) -> bool:
+        """Whether retrying later may succeed; other errors mean the grant was revoked or is invalid."""
+        return self.status == 429 or self.status >= 500
+
+class DiscordOAuthClient:
+    """Discord OAuth2 code exchange and user API calls over one pooled keep-alive session."""
+
+    def __init__(self, client_id: Optional[str], client_secret: Optional[str], redirect_uri: str):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stats = {
+            'requests': 0,
+            'rate_limited': 0
+        }
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session on first use; its connector keeps connections alive."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self.session
+
+    def authorize_url(self) -> str:
+        query = urlencode({
+            'client_id': self.client_id,
+            'redirect_uri': self.redirect_uri,
+            'response_type': 'code',
+            'scope': OAUTH_SCOPES
+        })
+        return f"https://discord.com/oauth2/authorize?{query}"
+
+    async def _request(self, method: str, path: str, **kwargs) -> Any:
+        """Make an API call, waiting out one rate limit before giving up."""
+        for attempt in range(2):
+            self.stats['requests'] += 1
+            async with self._get_session().request(method, f"{DISCORD_API}{path}", **kwargs) as response:
+                if response.status == 429 and attempt == 0:
+                    self.stats['rate_limited'] += 1
+                    retry_after = float(response.headers.get('Retry-After', 1))
+                    await asyncio.sleep(min(retry_after, 10))
+                    continue
+                if response.status >= 400:
+                    raise OAuthError(response.status, await response.text())
+                return await response.json()
+
+    async def _token(self, grant: Dict[str, str]) -> Dict[str, Any]:
+        data = dict(grant, client_id=self.client_id, client_secret=self.client_secret)
+        return await self._request('POST', '/oauth2/token', data=data)
+
+    async def exchange_code(self, code: str) -> Dict[str, Any]:
+        """Trade an authorization code for tokens."""
+        return await self._token({
+            'grant_type': 'authorization_code',
+            'code': code,
+            'redirect_uri': self.redirect_uri
+        })
+
+    async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
+        return await self._token({'grant_type': 'refresh_token', 'refresh_token': refresh_token})
+
+    async def get_user(self, access_token: str) -> Dict[str, Any]:
+        return await self._request('GET', '/users/@me', headers={'Authorization': f"Bearer {access_token}"})
+
+    async def get_guilds(self, access_token: str) -> List[Dict[str, Any]]:
+        guilds = await self._request('GET', '/users/@me/guilds', headers={'Authorization': f"Bearer {access_token}"})
+        return [{field: guild.get(field) for field in GUILD_FIELDS} for guild in guilds]
+
+    async def close(self):
+        """Close the shared session."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+class DashboardSession:
+    """Server-side state of one logged-in dashboard user."""
+
+    __slots__ = ('id', 'user', 'access_token', 'refresh_token', 'token_expires_at',
+                 'guilds', 'guilds_fetched_at', 'guilds_retry_at', 'expires_at', 'refresh_lock')
+
+    def __init__(self, session_id: str, user: Dict[str, Any], token_data: Dict[str, Any], expires_at: float):
+        self.id = session_id
+        self.user = user
+        self.guilds: Optional[List[Dict[str, Any]]] = None
+        self.guilds_fetched_at = 0.0
+        self.guilds_retry_at = 0.0  # Until then a failed refresh keeps serving the last list
+        self.expires_at = expires_at
+        self.refresh_lock = asyncio.Lock()
+        self.set_tokens(token_data)
+
+    def set_tokens(self, token_data: Dict[str, Any]):
+        self.access_token = token_data['access_token']
+        self.refresh_token = token_data.get('refresh_token', getattr(self, 'refresh_token', None))
+        self.token_expires_at = time.monotonic() + float(token_data.get('expires_in', 604800))
+
+class SessionStore:
+    """In-process dashboard sessions with a sliding TTL; cookies only carry the session ID."""
+
+    def __init__(self, oauth: DiscordOAuthClient, ttl: float = 86400, guild_refresh: float = 300,
+                 guild_max_stale: float = 900, max_sessions: int = 10000):
+        self.oauth = oauth
+        self.ttl = ttl
+        self.guild_refresh = guild_refresh
+        self.guild_max_stale = guild_max_stale  # Longest a guild list is served while refreshes fail
+        self.max_sessions = max_sessions
+        self.sessions: 'OrderedDict[str, DashboardSession]' = OrderedDict()  # Least recently used first
+        self.last_prune = time.monotonic()
+        self.stats = {
+            'created': 0,
+            'expired': 0,
+            'guild_fetches': 0,
+            'guild_cache_hits': 0,
+            'token_refreshes': 0,
+            'guild_refresh_failures': 0,
+            'revoked': 0
+        }
+
+    def create(self, user: Dict[str, Any], token_data: Dict[str, Any]) -> DashboardSession:
+        """Start a session for a freshly authorized user."""
+        now = time.monotonic()
+        if now - self.last_prune > PRUNE_INTERVAL:
+            self.prune()
+
+        session = DashboardSession(secrets.token_urlsafe(32), user, token_data, now + self.ttl)
+        self.sessions[session.id] = session
+        self.stats['created'] += 1
+
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: Optional[str]) -> Optional[DashboardSession]:
+        """Look up a live session and extend its lifetime."""
+        if not session_id:
+            return None
+
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+
+        now = time.monotonic()
+        if session.expires_at <= now:
+            del self.sessions[session_id]
+            self.stats['expired'] += 1
+            return None
+
+        session.expires_at = now + self.ttl
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: Optional[str]):
+        self.sessions.pop(session_id, None)
+
+    def prune(self) -> int:
+        """Drop expired sessions; least recently used come first, so stop at the first live one."""
+        now = time.monotonic()
+        self.last_prune = now
+        removed = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.expires_at > now:
+                break
+            self.sessions.popitem(last=False)
+            removed += 1
+        self.stats['expired'] += removed
+        return removed
+
+    async def _access_token(self, session: DashboardSession) -> str:
+        """The session's access token, refreshed shortly before it expires."""
+        if session.refresh_token and session.token_expires_at - time.monotonic() < TOKEN_REFRESH_MARGIN:
+            session.set_tokens(await self.oauth.refresh_token(session.refresh_token))
+            self.stats['token_refreshes'] += 1
+        return session.access_token
+
+    def _guilds_usable(self, session: DashboardSession) -> bool:
+        """Whether the cached guild list can be served without asking Discord."""
+        if session.guilds is None:
+            return False
+        now = time.monotonic()
+        age = now - session.guilds_fetched_at
+        return age < self.guild_refresh or (now < session.guilds_retry_at and age < self.guild_max_stale)
+
+    async def guilds(self, session: DashboardSession, force: bool = False) -> List[Dict[str, Any]]:
+        """The user's guilds, fetched from Discord at most once per refresh interval.
+
+        While Discord is unreachable the last list is served for up to guild_max_stale seconds. When
+        Discord rejects the grant (revoked app, invalid token), the session is ended and the error raised.
+        """
+        if not force and self._guilds_usable(session):
+            self.stats['guild_cache_hits'] += 1
+            return session.guilds
+
+        # Concurrent requests of one user share a single fetch
+        async with session.refresh_lock:
+            if not force and self._guilds_usable(session):
+                self.stats['guild_cache_hits'] += 1
+                return session.guilds
+
+            try:
+                session.guilds = await self.oauth.get_guilds(await self._access_token(session))
+                session.guilds_fetched_at = time.monotonic()
+                self.stats['guild_fetches'] += 1
+            except OAuthError as e:
+                if e.transient:
+                    return self._stale_guilds(session, e)
+                # Permissions may have been taken away; never serve the old list again
+                self.delete(session.id)
+                session.guilds = None
+                self.stats['revoked'] += 1
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                return self._stale_guilds(session, e)
+            return session.guilds
+
+    def _stale_guilds(self, session: DashboardSession, error: Exception) -> List[Dict[str, Any]]:
+        """Serve the last guild list after a transient refresh failure, while it is recent enough."""
+        self.stats['guild_refresh_failures'] += 1
+        if session.guilds is None or time.monotonic() - session.guilds_fetched_at >= self.guild_max_stale:
+            raise error
+        session.guilds_retry_at = time.monotonic() + GUILD_RETRY_INTERVAL
+        logger.warning(f"Guild refresh failed for user {session.user.get('id')}: {error}")
+        return session.guilds
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return dict(self.stats, active=len(self.sessions), **self.oauth.stats)
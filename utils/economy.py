@@ -0,0 +1,452 @@
+import aiosqlite
+import asyncio
+import bisect
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import BUSY_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class Reservation:
+    """Funds held for a pending bet until it is settled or released."""
+
+    __slots__ = ('id', 'user_id', 'amount', 'kind', 'timeout_handle', 'active')
+
+    def __init__(self, reservation_id: int, user_id: int, amount: int, kind: str):
+        self.id = reservation_id
+        self.user_id = user_id
+        self.amount = amount
+        self.kind = kind
+        self.timeout_handle = None
+        self.active = True
+
+class EconomyLedger:
+    """Ledger-backed economy with cached balances and group-committed transactions."""
+
+    def __init__(self, db_path: str = 'bot_database.db', currency: str = 'kcoins',
+                 starting_balance: int = 100, leaderboard_size: int = 10,
+                 commit_interval: float = 0.05):
+        self.db_path = db_path
+        self.currency = currency
+        self.starting_balance = starting_balance
+        self.commit_interval = commit_interval
+        self.conn = None
+
+        # In-memory state (authoritative once loaded)
+        self.balances: Dict[int, int] = {}
+        self.last_daily: Dict[int, Optional[str]] = {}
+        self.locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Funds held by open reservations
+        self.held: Dict[int, int] = defaultdict(int)
+        self.reservations: Dict[int, Reservation] = {}
+        self.next_reservation_id = 1
+
+        # Pending group commit
+        self.pending_transactions: List[Tuple] = []
+        self.dirty_users: Set[int] = set()
+        self.commit_waiters: List[asyncio.Future] = []
+        self.commit_lock = asyncio.Lock()
+        self.flush_event = None
+        self.flush_task = None
+        self.closing = False
+
+        # Incremental leaderboard, sorted by (-balance, user_id)
+        self.leaderboard_capacity = leaderboard_size * 2
+        self.top: List[Tuple[int, int]] = []
+        self.top_balances: Dict[int, int] = {}
+        self.top_stale = False
+
+        self.stats = {
+            'commits': 0,
+            'transactions_committed': 0,
+            'reservations': 0,
+            'settled': 0,
+            'released': 0,
+            'expired': 0
+        }
+
+    async def start(self):
+        """Open the ledger connection, load the leaderboard and start the commit task."""
+        # Shares the bot's database file with Database.conn: queue behind its writes rather than fail
+        self.conn = await aiosqlite.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        await self.conn.execute('PRAGMA journal_mode = WAL')
+        self.flush_event = asyncio.Event()
+        await self._load_leaderboard()
+        self.flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Economy ledger '{self.currency}' started")
+
+    async def close(self):
+        """Release open reservations, flush pending transactions and close the connection."""
+        for reservation in list(self.reservations.values()):
+            self.release(reservation)
+
+        # Let the commit task finish the batch it may be writing; cancelling it could lose that batch
+        if self.flush_task:
+            self.closing = True
+            self.flush_event.set()
+            await self.flush_task
+            self.flush_task = None
+        if self.conn:
+            await self._commit()
+            await self.conn.close()
+            self.conn = None
+
+    # ============ BALANCE CACHE ============
+
+    async def _load_user(self, user_id: int):
+        """Load a user's balance into the cache (call with the user's lock held)."""
+        if user_id in self.balances:
+            return
+
+        cursor = await self.conn.execute('''
+            SELECT balance, last_daily FROM economy_balances
+            WHERE currency = ? AND user_id = ?
+        ''', (self.currency, user_id))
+        row = await cursor.fetchone()
+
+        if row:
+            self.balances[user_id], self.last_daily[user_id] = row
+        else:
+            self.balances[user_id] = self.starting_balance
+            self.last_daily[user_id] = None
+
+    async def get_balance(self, user_id: int) -> int:
+        """Get a user's balance."""
+        if user_id not in self.balances:
+            async with self.locks[user_id]:
+                await self._load_user(user_id)
+        return self.balances[user_id]
+
+    async def get_available(self, user_id: int) -> int:
+        """Get a user's balance minus funds held by open reservations."""
+        return await self.get_balance(user_id) - self.held.get(user_id, 0)
+
+    def _apply(self, user_id: int, amount: int, kind: str, reference: Optional[str] = None) -> int:
+        """Apply a balance change in memory and append it to the pending log."""
+        new_balance = self.balances[user_id] + amount
+        self.balances[user_id] = new_balance
+
+        self.pending_transactions.append((
+            self.currency, user_id, amount, new_balance, kind, reference,
+            datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        ))
+        self.dirty_users.add(user_id)
+        self._update_leaderboard(user_id, new_balance)
+        self.flush_event.set()
+        return new_balance
+
+    # ============ MUTATIONS ============
+
+    async def add_money(self, user_id: int, amount: int, kind: str = 'credit',
+                        reference: Optional[str] = None, wait: bool = True) -> int:
+        """Add money to a user and return the new balance."""
+        async with self.locks[user_id]:
+            await self._load_user(user_id)
+            new_balance = self._apply(user_id, amount, kind, reference)
+
+        if wait:
+            await self.wait_committed()
+        return new_balance
+
+    async def remove_money(self, user_id: int, amount: int, kind: str = 'debit',
+                           reference: Optional[str] = None, wait: bool = True) -> int:
+        """Remove money from a user (never below zero) and return the new balance."""
+        async with self.locks[user_id]:
+            await self._load_user(user_id)
+            amount = min(amount, self.balances[user_id] - self.held.get(user_id, 0))
+            new_balance = self._apply(user_id, -amount, kind, reference)
+
+        if wait:
+            await self.wait_committed()
+        return new_balance
+
+    async def transfer_money(self, from_user: int, to_user: int, amount: int) -> bool:
+        """Atomically move money between two users."""
+        if from_user == to_user or amount <= 0:
+            return False
+
+        # Always lock in the same order to avoid deadlocks
+        first, second = sorted((from_user, to_user))
+        async with self.locks[first], self.locks[second]:
+            await self._load_user(from_user)
+            await self._load_user(to_user)
+
+            if self.balances[from_user] - self.held.get(from_user, 0) < amount:
+                return False
+
+            # Both entries land in the same commit batch
+            self._apply(from_user, -amount, 'transfer_out', str(to_user))
+            self._apply(to_user, amount, 'transfer_in', str(from_user))
+
+        await self.wait_committed()
+        return True
+
+    def can_claim_daily(self, user_id: int) -> bool:
+        """Check if a cached user can claim their daily reward."""
+        return self.last_daily.get(user_id) != datetime.now().date().isoformat()
+
+    async def claim_daily(self, user_id: int, minimum: int = 50, maximum: int = 200) -> int:
+        """Claim the daily reward, returning the amount or 0 if already claimed."""
+        async with self.locks[user_id]:
+            await self._load_user(user_id)
+            if not self.can_claim_daily(user_id):
+                return 0
+
+            amount = random.randint(minimum, maximum)
+            self.last_daily[user_id] = datetime.now().date().isoformat()
+            self._apply(user_id, amount, 'daily')
+
+        await self.wait_committed()
+        return amount
+
+    # ============ RESERVATIONS ============
+
+    async def reserve(self, user_id: int, amount: int, kind: str = 'bet',
+                      timeout: float = 60.0) -> Optional[Reservation]:
+        """Hold funds for a bet, returning None if the user cannot cover it."""
+        if amount <= 0:
+            return None
+
+        async with self.locks[user_id]:
+            await self._load_user(user_id)
+            if self.balances[user_id] - self.held[user_id] < amount:
+                return None
+
+            self.held[user_id] += amount
+            reservation = Reservation(self.next_reservation_id, user_id, amount, kind)
+            self.next_reservation_id += 1
+
+        self.reservations[reservation.id] = reservation
+        reservation.timeout_handle = asyncio.get_running_loop().call_later(
+            timeout, self._expire, reservation
+        )
+        self.stats['reservations'] += 1
+        return reservation
+
+    def _unhold(self, reservation: Reservation) -> bool:
+        """Drop a reservation's hold; returns False if it was already closed."""
+        if not reservation.active:
+            return False
+
+        reservation.active = False
+        if reservation.timeout_handle:
+            reservation.timeout_handle.cancel()
+        self.reservations.pop(reservation.id, None)
+
+        user_id = reservation.user_id
+        self.held[user_id] -= reservation.amount
+        if self.held[user_id] <= 0:
+            del self.held[user_id]
+        return True
+
+    def settle(self, reservation: Reservation, payout: int = 0,
+               reference: Optional[str] = None) -> Optional[int]:
+        """Close a reservation with its payout and return the new balance.
+
+        The stake is debited and the payout credited as one ledger entry. The
+        entry is persisted by the next group commit, so this never waits on the
+        database. Returns None if the reservation already expired or closed.
+        """
+        if not self._unhold(reservation):
+            return None
+
+        self.stats['settled'] += 1
+        # Funds were held, so the balance is loaded and can cover the stake
+        return self._apply(reservation.user_id, payout - reservation.amount, reservation.kind, reference)
+
+    def release(self, reservation: Reservation):
+        """Cancel a reservation without moving any money."""
+        if self._unhold(reservation):
+            self.stats['released'] += 1
+
+    def _expire(self, reservation: Reservation):
+        """Release a reservation that was never settled."""
+        if self._unhold(reservation):
+            self.stats['expired'] += 1
+            logger.warning(f"Reservation {reservation.id} for user {reservation.user_id} expired")
+
+    # ============ GROUP COMMIT ============
+
+    async def wait_committed(self):
+        """Wait until everything applied so far has been committed."""
+        if not self.pending_transactions and not self.dirty_users:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.commit_waiters.append(future)
+        self.flush_event.set()
+        await future
+
+    async def flush(self):
+        """Commit pending transactions immediately."""
+        await self._commit()
+
+    async def _flush_loop(self):
+        """Background task that commits pending transactions in batches."""
+        while not self.closing:
+            await self.flush_event.wait()
+            # Give concurrent operations a moment to join this batch
+            if not self.closing:
+                await asyncio.sleep(self.commit_interval)
+            self.flush_event.clear()
+            try:
+                await self._commit()
+            except Exception as e:
+                logger.error(f"Economy ledger commit failed: {e}")
+
+    async def _commit(self):
+        """Write the pending transaction log and balances in one transaction."""
+        async with self.commit_lock:
+            await self._commit_batch()
+
+    async def _commit_batch(self):
+        """Commit whatever is pending at this moment."""
+        transactions = self.pending_transactions
+        dirty_users = self.dirty_users
+        waiters = self.commit_waiters
+        self.pending_transactions = []
+        self.dirty_users = set()
+        self.commit_waiters = []
+
+        try:
+            if transactions or dirty_users:
+                balance_rows = [
+                    (self.currency, user_id, self.balances[user_id], self.last_daily.get(user_id))
+                    for user_id in dirty_users
+                ]
+
+                await self.conn.executemany('''
+                    INSERT INTO economy_transactions (
+                        currency, user_id, amount, balance_after, kind, reference, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', transactions)
+                await self.conn.executemany('''
+                    INSERT INTO economy_balances (currency, user_id, balance, last_daily)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(currency, user_id) DO UPDATE SET
+                        balance = excluded.balance,
+                        last_daily = excluded.last_daily,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', balance_rows)
+                await self.conn.commit()
+                self.stats['commits'] += 1
+                self.stats['transactions_committed'] += len(transactions)
+        except Exception as e:
+            await self.conn.rollback()
+            # Keep the batch so the next commit retries it
+            self.pending_transactions = transactions + self.pending_transactions
+            self.dirty_users |= dirty_users
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            raise
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    # ============ LEADERBOARD ============
+
+    async def _load_leaderboard(self):
+        """Rebuild the leaderboard from committed balances."""
+        cursor = await self.conn.execute('''
+            SELECT user_id, balance FROM economy_balances
+            WHERE currency = ?
+            ORDER BY balance DESC LIMIT ?
+        ''', (self.currency, self.leaderboard_capacity))
+        rows = await cursor.fetchall()
+
+        self.top = sorted((-self.balances.get(user_id, balance), user_id) for user_id, balance in rows)
+        self.top_balances = {user_id: -neg_balance for neg_balance, user_id in self.top}
+        self.top_stale = False
+
+    def _update_leaderboard(self, user_id: int, balance: int):
+        """Keep the cached top-N in sync with a single balance change."""
+        was_ranked = user_id in self.top_balances
+        if was_ranked:
+            old_entry = (-self.top_balances.pop(user_id), user_id)
+            del self.top[bisect.bisect_left(self.top, old_entry)]
+
+        entry = (-balance, user_id)
+        has_room = len(self.top) < self.leaderboard_capacity and not self.top_stale
+
+        if has_room or (self.top and entry < self.top[-1]):
+            bisect.insort(self.top, entry)
+            self.top_balances[user_id] = balance
+            if len(self.top) > self.leaderboard_capacity:
+                _, dropped_id = self.top.pop()
+                del self.top_balances[dropped_id]
+        elif was_ranked:
+            # Someone outside the cache may now rank higher than this user
+            self.top_stale = True
+
+    async def get_leaderboard(self, limit: int = 10) -> List[Tuple[int, int]]:
+        """Get the top users as (user_id, balance) pairs."""
+        if self.top_stale and len(self.top) < limit:
+            await self._commit()
+            await self._load_leaderboard()
+
+        return [(user_id, -neg_balance) for neg_balance, user_id in self.top[:limit]]
+
+# Load test: python -m utils.economy
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from database import Database
+
+    async def load_test(users: int = 500, bets: int = 10000):
+        db_path = os.path.join(tempfile.mkdtemp(), 'economy_load_test.db')
+        db = Database(db_path)
+        await db.init_db()
+
+        ledger = EconomyLedger(db_path, currency='pixels', starting_balance=1000)
+        await ledger.start()
+
+        async def play(user_id: int):
+            reservation = await ledger.reserve(user_id, random.randint(1, 50))
+            if reservation is None:
+                return False
+            await asyncio.sleep(random.random() * 0.01)  # Spin animation stand-in
+            if random.random() < 0.05:
+                ledger.release(reservation)
+            else:
+                ledger.settle(reservation, reservation.amount * random.choice([0, 0, 1, 2, 3]))
+            return True
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(play(random.randint(1, users)) for _ in range(bets)))
+        elapsed = time.perf_counter() - start
+        await ledger.flush()
+
+        # Every balance change must be in the ledger and the committed balances
+        cursor = await ledger.conn.execute('''
+            SELECT COALESCE(SUM(amount), 0) FROM economy_transactions WHERE currency = ?
+        ''', (ledger.currency,))
+        ledger_total = (await cursor.fetchone())[0]
+        cursor = await ledger.conn.execute('''
+            SELECT COUNT(*), SUM(balance) FROM economy_balances WHERE currency = ?
+        ''', (ledger.currency,))
+        stored_users, stored_total = await cursor.fetchone()
+
+        expected_total = ledger.starting_balance * stored_users + ledger_total
+        # Users who only had bets released never got a balance row
+        memory_total = sum(ledger.balances.values()) - ledger.starting_balance * (len(ledger.balances) - stored_users)
+        print(f"{bets:,} concurrent bets from {users} users in {elapsed:.2f}s "
+              f"({bets / elapsed:,.0f} bets/s)")
+        print(f"Accepted: {sum(results):,}  Settled: {ledger.stats['settled']:,}  "
+              f"Released: {ledger.stats['released']:,}")
+        print(f"Commits: {ledger.stats['commits']} for {ledger.stats['transactions_committed']:,} "
+              f"transactions")
+        print(f"Balances consistent: {stored_total == expected_total == memory_total}")
+        print(f"Open holds: {sum(ledger.held.values())}")
+
+        await ledger.close()
+        await db.conn.close()
+
+    asyncio.run(load_test())
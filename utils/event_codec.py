@@ -0,0 +1,260 @@
+import json
+import logging
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# First byte of an encoded payload; legacy rows are JSON text starting with '{'
+FORMAT_V1 = 0xE1
+FORMAT_V1_ZLIB = 0xE2  # Same, with everything after the first byte zlib-compressed
+
+COMPRESS_THRESHOLD = 200  # Encoded bytes above which a payload is zlib-compressed
+
+# Value tags
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3  # Zigzag varint
+TAG_FLOAT = 4  # Little-endian double
+TAG_STR = 5  # Varint length + UTF-8
+TAG_INTS = 6  # Varint count + zigzag varint deltas, order preserved
+TAG_STRS = 7  # Varint count + varint length + UTF-8 of each string
+TAG_JSON = 8  # Anything else, as JSON text
+
+# ============ VARINTS ============
+
+def _write_varint(out: bytearray, value: int):
+    """Append an unsigned LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Read an unsigned varint; returns (value, next position)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+def _zigzag(value: int) -> int:
+    """Map signed to unsigned so small negative deltas stay short."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+# ============ ENCODING ============
+
+def _write_bytes(out: bytearray, raw: bytes):
+    _write_varint(out, len(raw))
+    out += raw
+
+def _write_value(out: bytearray, value):
+    """Write one tagged value."""
+    if value is None:
+        out.append(TAG_NONE)
+    elif value is True:
+        out.append(TAG_TRUE)
+    elif value is False:
+        out.append(TAG_FALSE)
+    elif isinstance(value, int):
+        out.append(TAG_INT)
+        _write_varint(out, _zigzag(value))
+    elif isinstance(value, float):
+        out.append(TAG_FLOAT)
+        out += struct.pack('<d', value)
+    elif isinstance(value, str):
+        out.append(TAG_STR)
+        _write_bytes(out, value.encode())
+    elif isinstance(value, (list, tuple)) and all(type(item) is int for item in value):
+        # Snowflake lists: deltas between neighbours are much shorter than the IDs
+        out.append(TAG_INTS)
+        _write_varint(out, len(value))
+        previous = 0
+        for item in value:
+            _write_varint(out, _zigzag(item - previous))
+            previous = item
+    elif isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+        out.append(TAG_STRS)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_bytes(out, item.encode())
+    else:
+        out.append(TAG_JSON)
+        _write_bytes(out, json.dumps(value, separators=(',', ':')).encode())
+
+def _role_delta(data: Dict) -> Dict:
+    """Store member_update role lists as what was added and removed."""
+    if 'before_roles' not in data or 'after_roles' not in data:
+        return data
+
+    before = set(data['before_roles'])
+    after = set(data['after_roles'])
+    delta = {key: value for key, value in data.items() if key not in ('before_roles', 'after_roles')}
+    delta['roles_added'] = sorted(after - before)
+    delta['roles_removed'] = sorted(before - after)
+    return delta
+
+# Per event type rewrites applied before encoding
+EVENT_TRANSFORMS = {
+    'member_update': _role_delta
+}
+
+def encode_event(event_type: str, data: Optional[Dict]) -> Optional[bytes]:
+    """Encode an event_logs payload; None and empty dicts are stored as NULL."""
+    if not data:
+        return None
+
+    transform = EVENT_TRANSFORMS.get(event_type)
+    if transform is not None:
+        data = transform(data)
+
+    out = bytearray()
+    _write_varint(out, len(data))
+    for key, value in data.items():
+        _write_bytes(out, str(key).encode())
+        _write_value(out, value)
+
+    # One stream for the whole payload, so edits compress their before against their after
+    if len(out) > COMPRESS_THRESHOLD:
+        packed = zlib.compress(out, 6)
+        if len(packed) < len(out):
+            return bytes([FORMAT_V1_ZLIB]) + packed
+    return bytes([FORMAT_V1]) + out
+
+# ============ DECODING ============
+
+def _read_bytes(data: bytes, position: int) -> Tuple[bytes, int]:
+    length, position = _read_varint(data, position)
+    return data[position:position + length], position + length
+
+def _read_value(data: bytes, position: int):
+    """Read one tagged value; returns (value, next position)."""
+    tag = data[position]
+    position += 1
+
+    if tag == TAG_NONE:
+        return None, position
+    if tag == TAG_TRUE:
+        return True, position
+    if tag == TAG_FALSE:
+        return False, position
+    if tag == TAG_INT:
+        value, position = _read_varint(data, position)
+        return _unzigzag(value), position
+    if tag == TAG_FLOAT:
+        return struct.unpack_from('<d', data, position)[0], position + 8
+    if tag == TAG_STR:
+        raw, position = _read_bytes(data, position)
+        return raw.decode(), position
+    if tag == TAG_INTS:
+        count, position = _read_varint(data, position)
+        items = []
+        previous = 0
+        for _ in range(count):
+            delta, position = _read_varint(data, position)
+            previous += _unzigzag(delta)
+            items.append(previous)
+        return items, position
+    if tag == TAG_STRS:
+        count, position = _read_varint(data, position)
+        items = []
+        for _ in range(count):
+            item, position = _read_bytes(data, position)
+            items.append(item.decode())
+        return items, position
+    if tag == TAG_JSON:
+        raw, position = _read_bytes(data, position)
+        return json.loads(raw), position
+
+    raise ValueError(f"Unknown event value tag {tag}")
+
+def decode_event(data: Union[bytes, str, None]) -> Optional[Dict]:
+    """Decode an event_logs payload written by encode_event or by the older JSON format."""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return json.loads(data)
+    if not data or data[0] not in (FORMAT_V1, FORMAT_V1_ZLIB):
+        # JSON text stored with BLOB affinity
+        return json.loads(bytes(data).decode())
+
+    data = zlib.decompress(data[1:]) if data[0] == FORMAT_V1_ZLIB else bytes(data[1:])
+    count, position = _read_varint(data, 0)
+    decoded = {}
+    for _ in range(count):
+        key, position = _read_bytes(data, position)
+        decoded[key.decode()], position = _read_value(data, position)
+    return decoded
+
+# Benchmark: python -m utils.event_codec
+if __name__ == "__main__":
+    import random
+    import string
+    import time
+
+    random.seed(43)
+    base_id = 1_100_000_000_000_000_000
+    role_ids = sorted(base_id + random.randrange(10 ** 15) for _ in range(40))
+    words = [''.join(random.choice(string.ascii_lowercase) for _ in range(random.randint(2, 9))) for _ in range(500)]
+
+    def sentence(count: int) -> str:
+        return ' '.join(random.choice(words) for _ in range(count))
+
+    # A replayed stream in roughly the proportions a busy server logs
+    events: List[Tuple[str, Dict]] = []
+    for _ in range(20_000):
+        kind = random.random()
+        if kind < 0.35:
+            roles = random.sample(role_ids, random.randint(3, 15))
+            after = roles + [random.choice(role_ids)] if random.random() < 0.5 else roles
+            events.append(('member_update', {
+                'changes': ["Nickname: `old` → `new`"],
+                'before_nick': 'old', 'after_nick': 'new',
+                'before_roles': roles, 'after_roles': after
+            }))
+        elif kind < 0.6:
+            content = sentence(random.randint(5, 120))
+            events.append(('message_edit', {
+                'message_id': base_id + random.randrange(10 ** 15),
+                'before_content': content, 'after_content': content + ' ' + sentence(3)
+            }))
+        elif kind < 0.85:
+            events.append(('message_delete', {
+                'message_id': base_id + random.randrange(10 ** 15),
+                'content': sentence(random.randint(3, 60)),
+                'attachments': []
+            }))
+        else:
+            events.append(('member_join', {
+                'account_created': '2024-03-01T12:34:56.789000+00:00',
+                'avatar_url': f"https://cdn.discordapp.com/avatars/{base_id}/{random.getrandbits(128):032x}.png"
+            }))
+
+    json_size = sum(len(json.dumps(data).encode()) for _, data in events)
+
+    start = time.perf_counter()
+    encoded = [encode_event(event_type, data) for event_type, data in events]
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = [decode_event(payload) for payload in encoded]
+    decode_time = time.perf_counter() - start
+
+    compact_size = sum(len(payload) for payload in encoded)
+    assert all(
+        decoded_data == EVENT_TRANSFORMS.get(event_type, lambda d: d)(data)
+        for (event_type, data), decoded_data in zip(events, decoded)
+    )
+
+    print(f"{len(events):,} events: JSON {json_size / 1e6:.2f} MB -> compact {compact_size / 1e6:.2f} MB "
+          f"({100 * (1 - compact_size / json_size):.0f}% smaller)")
+    print(f"Encode {encode_time / len(events) * 1e6:.1f}µs, decode {decode_time / len(events) * 1e6:.1f}µs per event")
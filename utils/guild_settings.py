@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_SNOWFLAKE = 2 ** 63 - 1
+
+class SettingsError(ValueError):
+    """A settings patch failed validation; errors maps each bad field to a message."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__(", ".join(f"{field}: {message}" for field, message in errors.items()))
+        self.errors = errors
+
+class SettingField:
+    """Type and constraints of one guild_settings column."""
+
+    __slots__ = ('name', 'kind', 'default', 'nullable', 'minimum', 'maximum', 'max_length')
+
+    def __init__(self, name: str, kind: str, default: Any = None, nullable: bool = True,
+                 minimum: Optional[int] = None, maximum: Optional[int] = None, max_length: Optional[int] = None):
+        self.name = name
+        self.kind = kind  # 'snowflake', 'int', 'bool' or 'str'
+        self.default = default
+        self.nullable = nullable
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_length = max_length
+
+    def validate(self, value: Any) -> Any:
+        """Coerce a JSON or form value to the column type; raises ValueError with a readable message."""
+        if value is None or value == '':
+            if not self.nullable:
+                raise ValueError("is required")
+            return None
+
+        if self.kind == 'bool':
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, int) and value in (0, 1):
+                return bool(value)
+            if isinstance(value, str) and value.lower() in ('true', 'false', 'on', 'off', '1', '0'):
+                return value.lower() in ('true', 'on', '1')
+            raise ValueError("must be true or false")
+
+        if self.kind in ('int', 'snowflake'):
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError("must be a whole number")
+            if isinstance(value, str):
+                if not value.strip().isdigit():
+                    raise ValueError("must be a whole number")
+                value = int(value)
+            if self.kind == 'snowflake' and not 0 < value <= MAX_SNOWFLAKE:
+                raise ValueError("is not a valid ID")
+            if self.minimum is not None and value < self.minimum:
+                raise ValueError(f"must be at least {self.minimum}")
+            if self.maximum is not None and value > self.maximum:
+                raise ValueError(f"must be at most {self.maximum}")
+            return value
+
+        if not isinstance(value, str):
+            raise ValueError("must be text")
+        if self.max_length is not None and len(value) > self.max_length:
+            raise ValueError(f"must be at most {self.max_length} characters")
+        return value
+
+    def to_json(self, value: Any) -> Any:
+        # Snowflakes exceed JavaScript's safe integer range
+        if self.kind == 'snowflake' and value is not None:
+            return str(value)
+        return value
+
+# Mirrors the guild_settings table, in column order
+SETTINGS_SCHEMA: Dict[str, SettingField] = {field.name: field for field in (
+    SettingField('prefix', 'str', default='!', nullable=False, max_length=10),
+    SettingField('log_channel_id', 'snowflake'),
+    SettingField('welcome_channel_id', 'snowflake'),
+    SettingField('welcome_message', 'str', max_length=2000),
+    SettingField('farewell_message', 'str', max_length=2000),
+    SettingField('auto_role_id', 'snowflake'),
+    SettingField('starboard_channel_id', 'snowflake'),
+    SettingField('starboard_threshold', 'int', default=3, nullable=False, minimum=1, maximum=50),
+    SettingField('automod_enabled', 'bool', default=True, nullable=False)
+)}
+SETTINGS_COLUMNS = tuple(SETTINGS_SCHEMA)
+
+def validate_settings_patch(patch: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a partial settings update; every error is reported at once."""
+    if not isinstance(patch, dict):
+        raise SettingsError({'': "expected an object of settings"})
+
+    validated = {}
+    errors = {}
+    for key, value in patch.items():
+        field = SETTINGS_SCHEMA.get(key)
+        if field is None:
+            errors[key] = "is not a setting"
+            continue
+        try:
+            validated[key] = field.validate(value)
+        except ValueError as e:
+            errors[key] = str(e)
+
+    if errors:
+        raise SettingsError(errors)
+    return validated
+
+def settings_from_row(row: Optional[Sequence]) -> Dict[str, Any]:
+    """Build a settings dict from a guild_settings row in SETTINGS_COLUMNS order; None gives the defaults."""
+    if row is None:
+        return {name: field.default for name, field in SETTINGS_SCHEMA.items()}
+
+    settings = dict(zip(SETTINGS_COLUMNS, row))
+    for name, field in SETTINGS_SCHEMA.items():
+        if field.kind == 'bool' and settings[name] is not None:
+            settings[name] = bool(settings[name])
+    return settings
+
+def settings_to_json(settings: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: SETTINGS_SCHEMA[name].to_json(value) for name, value in settings.items()}
+
+def settings_etag(settings: Dict[str, Any]) -> str:
+    """Strong ETag of a settings dict."""
+    encoded = json.dumps(settings_to_json(settings), sort_keys=True, separators=(',', ':')).encode()
+    return f'"{hashlib.blake2b(encoded, digest_size=12).hexdigest()}"'
@@ -0,0 +1,158 @@
+import logging
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+JOIN_RATE_WINDOW = 60  # Seconds of joins counted by join_rate
+
+class GuildCounters:
+    """Running counts for one guild, kept in step with gateway events."""
+
+    __slots__ = ('member_count', 'bots', 'channels', 'roles', 'boosts', 'boost_tier', 'joins', 'snapshot', 'rebuilt_at')
+
+    def __init__(self):
+        self.member_count = 0
+        self.bots = 0
+        self.channels: Counter = Counter()  # channel type name: count
+        self.roles = 0
+        self.boosts = 0
+        self.boost_tier = 0
+        self.joins: Deque[float] = deque()  # Monotonic times of recent joins
+        self.snapshot: Optional[Dict[str, Any]] = None  # Built on first read after a change
+        self.rebuilt_at = 0.0
+
+class GuildStatsAggregator:
+    """Per-guild member, channel, role and boost counts maintained incrementally.
+
+    A guild is counted in full once, when it becomes available (or on its first read); after that
+    every event adjusts the counters in O(1), and reads return a cached snapshot.
+    """
+
+    def __init__(self):
+        self.guilds: Dict[int, GuildCounters] = {}
+        self.stats = {
+            'rebuilds': 0,
+            'events': 0,
+            'snapshot_hits': 0,
+            'snapshot_builds': 0
+        }
+
+    def rebuild(self, guild: discord.Guild) -> GuildCounters:
+        """Count a guild from scratch; the only place its member list is walked."""
+        counters = GuildCounters()
+        counters.member_count = guild.member_count or len(guild.members)
+        counters.bots = sum(1 for member in guild.members if member.bot)
+        counters.channels = Counter(str(channel.type) for channel in guild.channels)
+        counters.roles = len(guild.roles)
+        counters.boosts = guild.premium_subscription_count or 0
+        counters.boost_tier = guild.premium_tier
+        counters.rebuilt_at = time.time()
+
+        previous = self.guilds.get(guild.id)
+        if previous is not None:
+            counters.joins = previous.joins
+        self.guilds[guild.id] = counters
+        self.stats['rebuilds'] += 1
+        return counters
+
+    def _counters(self, guild: discord.Guild) -> GuildCounters:
+        counters = self.guilds.get(guild.id)
+        if counters is None:
+            counters = self.rebuild(guild)
+        counters.snapshot = None
+        self.stats['events'] += 1
+        return counters
+
+    # ============ EVENTS ============
+
+    def member_joined(self, member: discord.Member):
+        counters = self._counters(member.guild)
+        counters.member_count = member.guild.member_count or counters.member_count + 1
+        now = time.monotonic()
+        counters.joins.append(now)
+        while counters.joins[0] < now - JOIN_RATE_WINDOW:
+            counters.joins.popleft()
+        if member.bot:
+            counters.bots += 1
+
+    def member_left(self, member: discord.Member):
+        counters = self._counters(member.guild)
+        counters.member_count = member.guild.member_count or max(counters.member_count - 1, 0)
+        if member.bot:
+            counters.bots = max(counters.bots - 1, 0)
+
+    def channel_created(self, channel: discord.abc.GuildChannel):
+        self._counters(channel.guild).channels[str(channel.type)] += 1
+
+    def channel_deleted(self, channel: discord.abc.GuildChannel):
+        channels = self._counters(channel.guild).channels
+        channel_type = str(channel.type)
+        channels[channel_type] -= 1
+        if channels[channel_type] <= 0:
+            del channels[channel_type]
+
+    def channel_updated(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        # Only text <-> news conversions change the type of an existing channel
+        if before.type != after.type:
+            self.channel_deleted(before)
+            self.channel_created(after)
+
+    def role_created(self, role: discord.Role):
+        self._counters(role.guild).roles += 1
+
+    def role_deleted(self, role: discord.Role):
+        counters = self._counters(role.guild)
+        counters.roles = max(counters.roles - 1, 0)
+
+    def guild_updated(self, guild: discord.Guild):
+        counters = self._counters(guild)
+        counters.boosts = guild.premium_subscription_count or 0
+        counters.boost_tier = guild.premium_tier
+
+    def forget_guild(self, guild_id: int):
+        self.guilds.pop(guild_id, None)
+
+    # ============ READS ============
+
+    def snapshot(self, guild: discord.Guild) -> Dict[str, Any]:
+        """Current counts of a guild; cached until the next event touches it."""
+        counters = self.guilds.get(guild.id)
+        if counters is None:
+            counters = self.rebuild(guild)
+
+        if counters.snapshot is not None:
+            self.stats['snapshot_hits'] += 1
+            return counters.snapshot
+
+        channels = dict(counters.channels)
+        counters.snapshot = {
+            'member_count': counters.member_count,
+            'bot_count': counters.bots,
+            'human_count': max(counters.member_count - counters.bots, 0),
+            'channel_count': sum(channels.values()),
+            'channels': channels,
+            'role_count': counters.roles,
+            'boost_count': counters.boosts,
+            'boost_tier': counters.boost_tier
+        }
+        self.stats['snapshot_builds'] += 1
+        return counters.snapshot
+
+    def join_rate(self, guild_id: int) -> int:
+        """Members who joined a guild in the last JOIN_RATE_WINDOW seconds."""
+        counters = self.guilds.get(guild_id)
+        if counters is None:
+            return 0
+
+        joins = counters.joins
+        cutoff = time.monotonic() - JOIN_RATE_WINDOW
+        while joins and joins[0] < cutoff:
+            joins.popleft()
+        return len(joins)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return dict(self.stats, guilds=len(self.guilds))
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord
+
+from utils.role_queue import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Log priorities, highest first; moderation actions are never dropped
+PRIORITY_HIGH = 0  # Moderation actions and alerts
+PRIORITY_NORMAL = 1  # Server configuration and member changes
+PRIORITY_LOW = 2  # High-volume noise: message edits/deletes, joins and leaves
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000  # Discord's limit across every embed of a message
+
+# A queued log: its embed and an optional file sent in the same message
+LogEntry = Tuple[discord.Embed, Optional[discord.File]]
+
+class GuildLogBuffer:
+    """Embeds waiting to be sent to one guild's log channel."""
+
+    __slots__ = ('channel', 'queues', 'dropped', 'worker')
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.queues: List[Deque[LogEntry]] = [deque() for _ in PRIORITIES]
+        self.dropped: Counter = Counter()  # embed title: events dropped since the last summary
+        self.worker: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.queues)
+
+class LogDispatcher:
+    """Per-guild log delivery that packs buffered embeds into multi-embed messages."""
+
+    def __init__(self, window: float = 2.0, max_backlog: int = 100, rate: int = 5, per: float = 5.0, sink=None):
+        self.window = window  # Seconds to collect embeds before the first send
+        self.sink = sink  # Optional transport tried before the regular channel send (WebhookLogSink)
+        self.max_backlog = max_backlog  # Queued embeds above which lower priorities are summarized
+        self.rate = rate
+        self.per = per
+        self.buffers: Dict[int, GuildLogBuffer] = {}  # guild_id: buffer
+        self.buckets: Dict[int, TokenBucket] = {}  # channel_id: bucket
+        self.stats = {
+            'queued': 0,
+            'dropped': 0,
+            'messages_sent': 0,
+            'embeds_sent': 0,
+            'send_failures': 0
+        }
+
+    def enqueue(self, guild_id: int, channel: discord.abc.Messageable, embed: discord.Embed,
+                priority: int = PRIORITY_NORMAL, file: Optional[discord.File] = None):
+        """Buffer an embed (and file) for a guild's log channel; lower priorities are dropped when backlogged."""
+        buffer = self.buffers.get(guild_id)
+        if buffer is None:
+            buffer = self.buffers[guild_id] = GuildLogBuffer(channel)
+        buffer.channel = channel  # The log channel may have been changed
+
+        if priority != PRIORITY_HIGH and len(buffer) >= self.max_backlog:
+            buffer.dropped[embed.title or "Untitled event"] += 1
+            self.stats['dropped'] += 1
+        else:
+            buffer.queues[priority].append((embed, file))
+            self.stats['queued'] += 1
+
+        if buffer.worker is None or buffer.worker.done():
+            buffer.worker = asyncio.create_task(self._run_guild(guild_id, buffer))
+
+    def _next_batch(self, buffer: GuildLogBuffer) -> Tuple[List[discord.Embed], List[discord.File]]:
+        """Take up to one message worth of embeds and their files, highest priority first."""
+        batch = []
+        files = []
+        chars = 0
+        # Keep a slot for the summary of dropped events
+        limit = MAX_EMBEDS_PER_MESSAGE - (1 if buffer.dropped else 0)
+
+        for queue in buffer.queues:
+            while queue and len(batch) < limit:
+                size = len(queue[0][0])
+                if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                    return batch, files
+                embed, file = queue.popleft()
+                batch.append(embed)
+                if file is not None:
+                    files.append(file)
+                chars += size
+
+        if buffer.dropped and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            summary = self._summary(buffer.dropped)
+            if not batch or chars + len(summary) <= MAX_EMBED_CHARS_PER_MESSAGE:
+                batch.append(summary)
+                buffer.dropped.clear()
+        return batch, files
+
+    def _summary(self, dropped: Counter) -> discord.Embed:
+        """Summarize the events dropped while the log channel was backlogged."""
+        lines = [f"• {title}: {count}" for title, count in dropped.most_common(15)]
+        if len(dropped) > 15:
+            lines.append(f"• ...and {len(dropped) - 15} more event types")
+
+        embed = discord.Embed(
+            title="Log Backlog Summary",
+            description=f"Skipped {sum(dropped.values())} low-priority events to keep up:\n" + "\n".join(lines),
+            color=0x99AAB5
+        )
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+    async def _run_guild(self, guild_id: int, buffer: GuildLogBuffer):
+        """Send a guild's buffered embeds in batches, paced by its log channel's rate limit."""
+        # Let a burst of events collect before the first send
+        await asyncio.sleep(self.window)
+
+        while len(buffer) or buffer.dropped:
+            channel = buffer.channel
+            bucket = self.buckets.setdefault(channel.id, TokenBucket(self.rate, self.per))
+            # Waiting for a token first lets more embeds join the batch
+            await bucket.acquire()
+
+            batch, files = self._next_batch(buffer)
+            try:
+                if self.sink is None or not await self.sink.send(channel, batch, files):
+                    for file in files:
+                        file.reset()  # A failed webhook attempt may have read them
+                    await channel.send(embeds=batch, files=files)
+                self.stats['messages_sent'] += 1
+                self.stats['embeds_sent'] += len(batch)
+            except discord.Forbidden:
+                # No permission in the log channel; nothing queued for it can be delivered
+                logger.warning(f"Missing permissions for log channel {channel.id} in guild {guild_id}")
+                self.stats['send_failures'] += 1
+                for queue in buffer.queues:
+                    queue.clear()
+                buffer.dropped.clear()
+            except discord.HTTPException as e:
+                logger.error(f"Error sending logs for guild {guild_id}: {e}")
+                self.stats['send_failures'] += 1
+
+        if self.buffers.get(guild_id) is buffer:
+            del self.buffers[guild_id]
+
+    def queue_depth(self, guild_id: int) -> int:
+        """Get the number of embeds waiting for a guild's log channel."""
+        buffer = self.buffers.get(guild_id)
+        return len(buffer) if buffer else 0
+
+    def get_metrics(self) -> Dict:
+        """Get backlog and delivery metrics."""
+        return {
+            'guilds_active': len(self.buffers),
+            'queue_depth': {guild_id: len(buffer) for guild_id, buffer in self.buffers.items()},
+            **self.stats
+        }
+
+    async def close(self):
+        """Stop the workers; embeds still buffered are discarded."""
+        workers = [buffer.worker for buffer in self.buffers.values() if buffer.worker]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.buffers.clear()
+
+        if self.sink is not None:
+            await self.sink.close()
+
+# Benchmark: python -m utils.log_dispatcher
+if __name__ == "__main__":
+    import time
+    from types import SimpleNamespace
+
+    async def benchmark():
+        sent = []
+
+        async def send(embeds, files):
+            sent.append(embeds)
+
+        channel = SimpleNamespace(id=1, send=send)
+        dispatcher = LogDispatcher(window=0.5, max_backlog=100)
+
+        # A purge followed by a raid, with a few moderation actions mixed in
+        start = time.perf_counter()
+        for index in range(1000):
+            if index % 100 == 0:
+                dispatcher.enqueue(1, channel, discord.Embed(title="AutoMod Action"), PRIORITY_HIGH)
+            title = "Message Deleted" if index < 600 else "Member Joined"
+            dispatcher.enqueue(1, channel, discord.Embed(title=title, description="x" * 200), PRIORITY_LOW)
+
+        while dispatcher.buffers:
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        high_positions = [
+            position for position, embeds in enumerate(sent)
+            if any(embed.title == "AutoMod Action" for embed in embeds)
+        ]
+        print(f"1,010 events delivered as {len(sent)} messages in {elapsed:.1f}s "
+              f"(one send per event would take ~{1010 / dispatcher.rate * dispatcher.per:.0f}s)")
+        print(f"Moderation actions in messages {high_positions}; "
+              f"{dispatcher.stats['dropped']} low-priority events summarized")
+
+    asyncio.run(benchmark())
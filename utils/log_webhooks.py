@@ -0,0 +1,105 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_NAME = "Server Logs"
+RETRY_AFTER = 600  # Seconds before retrying a channel the bot could not create a webhook in
+
+class WebhookLogSink:
+    """Posts log batches through one cached webhook per log channel, over a shared keep-alive session."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.webhooks: Dict[int, discord.Webhook] = {}  # channel_id: webhook
+        self.unavailable: Dict[int, float] = {}  # channel_id: monotonic time of the failed setup
+        self.stats = {
+            'webhook_sends': 0,
+            'webhooks_created': 0,
+            'fallbacks': 0
+        }
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session on first use; its connector keeps connections alive."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+            )
+        return self.session
+
+    async def _get_webhook(self, channel: discord.TextChannel) -> Optional[discord.Webhook]:
+        """Get the log webhook of a channel, reusing the bot's own or creating one."""
+        webhook = self.webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+
+        failed_at = self.unavailable.get(channel.id)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER:
+            return None
+
+        try:
+            existing = [
+                hook for hook in await channel.webhooks()
+                if hook.name == WEBHOOK_NAME and hook.token and hook.user == self.bot.user
+            ]
+            if existing:
+                hook = existing[0]
+            else:
+                hook = await channel.create_webhook(name=WEBHOOK_NAME, reason="Log delivery")
+                self.stats['webhooks_created'] += 1
+        except (discord.Forbidden, discord.HTTPException, AttributeError) as e:
+            # No Manage Webhooks permission, or not a channel type with webhooks
+            logger.info(f"Using regular sends for log channel {channel.id}: {e}")
+            self.unavailable[channel.id] = time.monotonic()
+            return None
+
+        # Rebind to the shared session; discord.py rate-limits each webhook on its own bucket
+        webhook = discord.Webhook.from_url(hook.url, session=self._get_session())
+        self.webhooks[channel.id] = webhook
+        self.unavailable.pop(channel.id, None)
+        return webhook
+
+    async def send(self, channel: discord.TextChannel, embeds: List[discord.Embed],
+                   files: Optional[List[discord.File]] = None) -> bool:
+        """Post embeds through the channel's webhook; False means the caller should send normally."""
+        webhook = await self._get_webhook(channel)
+        if webhook is None:
+            self.stats['fallbacks'] += 1
+            return False
+
+        me = channel.guild.me
+        try:
+            await webhook.send(
+                embeds=embeds,
+                files=files or [],
+                username=me.display_name if me else WEBHOOK_NAME,
+                avatar_url=me.display_avatar.url if me else None
+            )
+        except discord.NotFound:
+            # Deleted from the channel settings; recreate it on the next batch
+            self.webhooks.pop(channel.id, None)
+            self.stats['fallbacks'] += 1
+            return False
+        except discord.HTTPException as e:
+            logger.warning(f"Webhook log send failed for channel {channel.id}: {e}")
+            self.stats['fallbacks'] += 1
+            return False
+
+        self.stats['webhook_sends'] += 1
+        return True
+
+    def forget_channel(self, channel_id: int):
+        """Drop the cached webhook of a channel."""
+        self.webhooks.pop(channel_id, None)
+        self.unavailable.pop(channel_id, None)
+
+    async def close(self):
+        """Close the shared session."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.webhooks.clear()
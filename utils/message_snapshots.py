@@ -0,0 +1,473 @@
+import aiosqlite
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_OVERHEAD = 200  # Approximate bytes of a snapshot record besides its content
+SPILL_BATCH_SIZE = 200  # Evicted snapshots written to the spill file at once
+SPILL_PRUNE_INTERVAL = 3600  # Seconds between retention sweeps of the spill file
+SPILL_QUERY_SIZE = 500  # Message IDs looked up in the spill file per query
+
+def content_digest(content: str) -> bytes:
+    """Key a content string in the spill file."""
+    return hashlib.blake2b(content.encode(), digest_size=16).digest()
+
+class MessageSnapshot:
+    """What logging needs to know about a message after it is edited or deleted."""
+
+    __slots__ = ('id', 'guild_id', 'channel_id', 'author_id', 'author_name',
+                 'content', 'attachments', 'created_at')
+
+    def __init__(self, message_id: int, guild_id: int, channel_id: int, author_id: int,
+                 author_name: str, content: str, attachments: Tuple[str, ...], created_at: float):
+        self.id = message_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.author_name = author_name
+        self.content = content
+        self.attachments = attachments  # Attachment URLs
+        self.created_at = created_at  # Epoch seconds
+
+    @classmethod
+    def from_message(cls, message: discord.Message) -> 'MessageSnapshot':
+        """Snapshot a guild message."""
+        return cls(
+            message.id, message.guild.id, message.channel.id, message.author.id,
+            str(message.author), message.content,
+            tuple(attachment.url for attachment in message.attachments),
+            message.created_at.timestamp()
+        )
+
+    @property
+    def attachment_names(self) -> List[str]:
+        """Get attachment filenames from their URLs."""
+        return [url.rsplit('/', 1)[-1].split('?', 1)[0] for url in self.attachments]
+
+class MessageSnapshotStore:
+    """
+    Bounded store of message snapshots that raw edit/delete events resolve against.
+
+    Identical contents are stored once. Quotas apply per channel and per guild, and a
+    memory budget applies overall; the oldest snapshots are evicted first, optionally
+    into an SQLite spill file that lookups fall back to.
+    """
+
+    def __init__(self, max_per_guild: int = 5000, max_per_channel: int = 1000,
+                 memory_budget: int = 64 * 1024 * 1024, spill_path: Optional[str] = None,
+                 spill_days: int = 14, ignored_channels: Iterable[int] = ()):
+        self.max_per_guild = max_per_guild
+        self.max_per_channel = max_per_channel
+        self.memory_budget = memory_budget
+        self.spill_path = spill_path
+        self.spill_days = spill_days
+        self.ignored_channels: Set[int] = set(ignored_channels)
+        self.conn = None
+
+        self.messages: Dict[int, MessageSnapshot] = {}
+        self.contents: Dict[str, list] = {}  # content: [shared string, reference count]
+        self.memory = 0
+
+        # Insertion order for eviction; entries of removed messages are skipped lazily
+        self.global_order: Deque[int] = deque()
+        self.guild_order: Dict[int, Deque[int]] = {}
+        self.channel_order: Dict[int, Deque[int]] = {}
+        self.guild_counts: Dict[int, int] = {}
+        self.channel_counts: Dict[int, int] = {}
+
+        self.spill_pending: Dict[int, MessageSnapshot] = {}
+        self.spill_task: Optional[asyncio.Task] = None
+        self.spill_lock = asyncio.Lock()
+        self.last_prune = 0.0
+
+        self.stats = {
+            'stored': 0,
+            'evicted': 0,
+            'spilled': 0,
+            'hits': 0,
+            'spill_hits': 0,
+            'misses': 0,
+            'shared_contents': 0
+        }
+
+    async def start(self):
+        """Open the spill file when one is configured."""
+        if not self.spill_path:
+            return
+
+        self.conn = await aiosqlite.connect(self.spill_path)
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_contents (
+                digest BLOB PRIMARY KEY,
+                content TEXT NOT NULL
+            )
+        ''')
+        await self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS message_snapshots (
+                message_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                author_id INTEGER NOT NULL,
+                author_name TEXT,
+                digest BLOB NOT NULL,
+                attachments TEXT,
+                created_at REAL NOT NULL
+            )
+        ''')
+        await self.conn.execute('CREATE INDEX IF NOT EXISTS idx_message_snapshots_created ON message_snapshots(created_at)')
+        await self.conn.commit()
+        logger.info(f"Message snapshot spill file opened at {self.spill_path}")
+
+    async def close(self):
+        """Write pending evictions and close the spill file."""
+        if self.conn:
+            await self.flush_spill()
+            await self.conn.close()
+            self.conn = None
+
+    # ============ CONTENT POOL ============
+
+    def _share(self, content: str) -> str:
+        """Get the pooled copy of a content string, adding a reference."""
+        entry = self.contents.get(content)
+        if entry is None:
+            self.contents[content] = [content, 1]
+            self.memory += sys.getsizeof(content)
+            return content
+
+        entry[1] += 1
+        self.stats['shared_contents'] += 1
+        return entry[0]
+
+    def _unshare(self, content: str):
+        """Drop a reference to a pooled content string."""
+        entry = self.contents.get(content)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.contents[content]
+            self.memory -= sys.getsizeof(content)
+
+    # ============ STORE ============
+
+    def add(self, message: discord.Message) -> bool:
+        """Snapshot a new message; returns False for messages that are not tracked."""
+        if message.guild is None or message.author.bot:
+            return False
+        if message.channel.id in self.ignored_channels or message.id in self.messages:
+            return False
+
+        snapshot = MessageSnapshot.from_message(message)
+        snapshot.content = self._share(snapshot.content)
+        self._insert(snapshot)
+        return True
+
+    def _insert(self, snapshot: MessageSnapshot):
+        """Index a snapshot and evict until every quota holds."""
+        self.messages[snapshot.id] = snapshot
+        self.memory += SNAPSHOT_OVERHEAD + sum(len(url) for url in snapshot.attachments)
+        self.stats['stored'] += 1
+
+        for order, key, counts in ((self.guild_order, snapshot.guild_id, self.guild_counts),
+                                   (self.channel_order, snapshot.channel_id, self.channel_counts)):
+            order.setdefault(key, deque()).append(snapshot.id)
+            counts[key] = counts.get(key, 0) + 1
+        self.global_order.append(snapshot.id)
+
+        while self.channel_counts[snapshot.channel_id] > self.max_per_channel:
+            self._evict_from(self.channel_order[snapshot.channel_id])
+        while self.guild_counts[snapshot.guild_id] > self.max_per_guild:
+            self._evict_from(self.guild_order[snapshot.guild_id])
+        while self.memory > self.memory_budget and self.messages:
+            self._evict_from(self.global_order)
+
+        self._compact(snapshot)
+
+    def _evict_from(self, order: Deque[int]):
+        """Evict the oldest live snapshot of an order, spilling it when configured."""
+        while order:
+            message_id = order.popleft()
+            snapshot = self.messages.get(message_id)
+            if snapshot is not None:
+                self._drop(snapshot)
+                self.stats['evicted'] += 1
+                if self.conn is not None:
+                    self.spill_pending[snapshot.id] = snapshot
+                    if len(self.spill_pending) >= SPILL_BATCH_SIZE and (self.spill_task is None or self.spill_task.done()):
+                        self.spill_task = asyncio.create_task(self.flush_spill())
+                return
+
+    def _drop(self, snapshot: MessageSnapshot):
+        """Remove a snapshot from memory; its order entries are skipped later."""
+        del self.messages[snapshot.id]
+        self._unshare(snapshot.content)
+        self.memory -= SNAPSHOT_OVERHEAD + sum(len(url) for url in snapshot.attachments)
+        self.guild_counts[snapshot.guild_id] -= 1
+        self.channel_counts[snapshot.channel_id] -= 1
+
+    def _compact(self, snapshot: MessageSnapshot):
+        """Rebuild an order once removed messages make up most of it."""
+        for order, key, counts in ((self.guild_order, snapshot.guild_id, self.guild_counts),
+                                   (self.channel_order, snapshot.channel_id, self.channel_counts)):
+            if len(order[key]) > 2 * counts[key] + 64:
+                order[key] = deque(message_id for message_id in order[key] if message_id in self.messages)
+        if len(self.global_order) > 2 * len(self.messages) + 64:
+            self.global_order = deque(message_id for message_id in self.global_order if message_id in self.messages)
+
+    async def update(self, message_id: int, content: str) -> Optional[MessageSnapshot]:
+        """Replace a snapshot's content after an edit and return the snapshot; spilled ones are rewritten in place."""
+        snapshot = self.messages.get(message_id)
+        if snapshot is not None:
+            self._unshare(snapshot.content)
+            snapshot.content = self._share(content)
+            return snapshot
+
+        # Holding the lock keeps a flush from writing the pending copy while it changes
+        async with self.spill_lock:
+            snapshot = self.spill_pending.get(message_id)
+            if snapshot is not None:
+                snapshot.content = content
+                return snapshot
+
+            snapshot = (await self._read_spill([message_id])).get(message_id)
+            if snapshot is None:
+                return None
+
+            snapshot.content = content
+            digest = content_digest(content)
+            try:
+                await self.conn.execute(
+                    'INSERT OR IGNORE INTO snapshot_contents (digest, content) VALUES (?, ?)', (digest, content)
+                )
+                await self.conn.execute(
+                    'UPDATE message_snapshots SET digest = ? WHERE message_id = ?', (digest, message_id)
+                )
+                await self.conn.commit()
+            except Exception as e:
+                await self.conn.rollback()
+                logger.error(f"Error updating a spilled message snapshot: {e}")
+            return snapshot
+
+    async def resolve(self, message_id: int) -> Optional[MessageSnapshot]:
+        """Find a snapshot in memory, then in the spill file."""
+        snapshot = self.messages.get(message_id) or self.spill_pending.get(message_id)
+        if snapshot is not None:
+            self.stats['hits'] += 1
+            return snapshot
+
+        snapshot = (await self._read_spill([message_id])).get(message_id)
+        self.stats['spill_hits' if snapshot else 'misses'] += 1
+        return snapshot
+
+    async def pop(self, message_id: int) -> Optional[MessageSnapshot]:
+        """Resolve a deleted message's snapshot and forget it everywhere."""
+        return (await self.pop_many([message_id]))[message_id]
+
+    async def pop_many(self, message_ids: Iterable[int]) -> Dict[int, Optional[MessageSnapshot]]:
+        """Resolve and forget the snapshots of many deleted messages, with at most one spill file commit."""
+        snapshots: Dict[int, Optional[MessageSnapshot]] = {}
+        unresolved = []
+        # Holding the lock keeps a flush from writing pending snapshots being forgotten
+        async with self.spill_lock:
+            for message_id in message_ids:
+                # Snapshots still in memory or pending were never written to the spill file
+                snapshot = self.messages.get(message_id)
+                if snapshot is not None:
+                    self._drop(snapshot)
+                else:
+                    snapshot = self.spill_pending.pop(message_id, None)
+
+                snapshots[message_id] = snapshot
+                if snapshot is not None:
+                    self.stats['hits'] += 1
+                else:
+                    unresolved.append(message_id)
+
+            spilled = await self._read_spill(unresolved)
+            if spilled:
+                try:
+                    await self.conn.executemany(
+                        'DELETE FROM message_snapshots WHERE message_id = ?', [(message_id,) for message_id in spilled]
+                    )
+                    await self.conn.commit()
+                except Exception as e:
+                    await self.conn.rollback()
+                    logger.error(f"Error deleting message snapshots from the spill file: {e}")
+
+        snapshots.update(spilled)
+        self.stats['spill_hits'] += len(spilled)
+        self.stats['misses'] += len(unresolved) - len(spilled)
+        return snapshots
+
+    def forget_channel(self, channel_id: int):
+        """Drop the in-memory snapshots of a deleted channel."""
+        for message_id in self.channel_order.pop(channel_id, ()):
+            snapshot = self.messages.get(message_id)
+            if snapshot is not None:
+                self._drop(snapshot)
+        self.channel_counts.pop(channel_id, None)
+
+    def forget_guild(self, guild_id: int):
+        """Drop the in-memory snapshots of a guild the bot left."""
+        channel_ids = set()
+        for message_id in self.guild_order.pop(guild_id, ()):
+            snapshot = self.messages.get(message_id)
+            if snapshot is not None:
+                channel_ids.add(snapshot.channel_id)
+                self._drop(snapshot)
+        self.guild_counts.pop(guild_id, None)
+        for channel_id in channel_ids:
+            if not self.channel_counts.get(channel_id):
+                self.channel_order.pop(channel_id, None)
+                self.channel_counts.pop(channel_id, None)
+
+    # ============ SPILL FILE ============
+
+    async def _read_spill(self, message_ids: List[int]) -> Dict[int, MessageSnapshot]:
+        """Read spilled snapshots by message ID."""
+        found = {}
+        if self.conn is None:
+            return found
+
+        for start in range(0, len(message_ids), SPILL_QUERY_SIZE):
+            chunk = message_ids[start:start + SPILL_QUERY_SIZE]
+            async with self.conn.execute(f'''
+                SELECT s.message_id, s.guild_id, s.channel_id, s.author_id, s.author_name,
+                       c.content, s.attachments, s.created_at
+                FROM message_snapshots s JOIN snapshot_contents c ON c.digest = s.digest
+                WHERE s.message_id IN ({', '.join('?' for _ in chunk)})
+            ''', chunk) as cursor:
+                async for row in cursor:
+                    *fields, attachments, created_at = row
+                    found[row[0]] = MessageSnapshot(*fields, tuple(json.loads(attachments or '[]')), created_at)
+        return found
+
+    async def flush_spill(self):
+        """Write evicted snapshots to the spill file, each distinct content once."""
+        # One writer at a time, so a batch is never written twice
+        async with self.spill_lock:
+            await self._write_spill()
+
+    async def _write_spill(self):
+        """Write the snapshots pending when called (call with the spill lock held)."""
+        if self.conn is None or not self.spill_pending:
+            return
+
+        batch = list(self.spill_pending.values())
+        contents = {}
+        rows = []
+        for snapshot in batch:
+            digest = content_digest(snapshot.content)
+            contents[digest] = snapshot.content
+            rows.append((
+                snapshot.id, snapshot.guild_id, snapshot.channel_id, snapshot.author_id,
+                snapshot.author_name, digest, json.dumps(snapshot.attachments), snapshot.created_at
+            ))
+
+        try:
+            await self.conn.executemany(
+                'INSERT OR IGNORE INTO snapshot_contents (digest, content) VALUES (?, ?)',
+                list(contents.items())
+            )
+            await self.conn.executemany('''
+                INSERT OR REPLACE INTO message_snapshots (
+                    message_id, guild_id, channel_id, author_id, author_name, digest, attachments, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+            if time.monotonic() - self.last_prune > SPILL_PRUNE_INTERVAL:
+                await self._prune_spill()
+
+            await self.conn.commit()
+        except Exception as e:
+            await self.conn.rollback()
+            logger.error(f"Error writing message snapshots to the spill file: {e}")
+            return
+
+        for snapshot in batch:
+            if self.spill_pending.get(snapshot.id) is snapshot:
+                del self.spill_pending[snapshot.id]
+        self.stats['spilled'] += len(batch)
+
+    async def _prune_spill(self):
+        """Delete spilled snapshots past retention and contents nothing refers to."""
+        cutoff = time.time() - self.spill_days * 86400
+        await self.conn.execute('DELETE FROM message_snapshots WHERE created_at < ?', (cutoff,))
+        await self.conn.execute('''
+            DELETE FROM snapshot_contents
+            WHERE digest NOT IN (SELECT digest FROM message_snapshots)
+        ''')
+        self.last_prune = time.monotonic()
+
+    def get_metrics(self) -> Dict:
+        """Get store size and hit-rate metrics."""
+        return {
+            'snapshots': len(self.messages),
+            'distinct_contents': len(self.contents),
+            'memory_bytes': self.memory,
+            'spill_pending': len(self.spill_pending),
+            **self.stats
+        }
+
+# Benchmark: python -m utils.message_snapshots
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+
+    async def benchmark():
+        random.seed(44)
+        spill_path = os.path.join(tempfile.mkdtemp(), 'snapshots.db')
+        store = MessageSnapshotStore(max_per_guild=20_000, max_per_channel=2_000,
+                                     memory_budget=8 * 1024 * 1024, spill_path=spill_path)
+        await store.start()
+
+        # Chatty guilds with repeated short messages, like "lol" and spam waves
+        common = ["lol", "gm", "ok", "nice", "free nitro at https://example.com/" + "x" * 40]
+        guilds = [SimpleNamespace(id=guild_id) for guild_id in range(20)]
+        author = SimpleNamespace(id=1, bot=False, __str__=lambda self: "user")
+        message_count = 200_000
+        now = datetime.now(timezone.utc)
+
+        start = time.perf_counter()
+        for message_id in range(message_count):
+            guild = random.choice(guilds)
+            content = random.choice(common) if random.random() < 0.4 else f"message {message_id} " + "y" * random.randint(0, 200)
+            store.add(SimpleNamespace(
+                id=message_id, guild=guild, channel=SimpleNamespace(id=guild.id * 100 + random.randrange(10)),
+                author=author, content=content, attachments=[], created_at=now
+            ))
+            if message_id % 5000 == 0:
+                await asyncio.sleep(0)
+        add_time = time.perf_counter() - start
+        await store.flush_spill()
+
+        start = time.perf_counter()
+        probes = random.sample(range(message_count), 2000)
+        found = [await store.resolve(message_id) for message_id in probes]
+        resolve_time = time.perf_counter() - start
+
+        metrics = store.get_metrics()
+        print(f"Stored {message_count:,} messages in {add_time:.2f}s "
+              f"({add_time / message_count * 1e6:.1f}µs each)")
+        print(f"In memory: {metrics['snapshots']:,} snapshots, {metrics['distinct_contents']:,} distinct contents, "
+              f"{metrics['memory_bytes'] / 1e6:.1f} MB of {store.memory_budget / 1e6:.1f} MB budget; "
+              f"{metrics['spilled']:,} spilled")
+        print(f"Resolved {sum(1 for snapshot in found if snapshot):,}/{len(probes):,} random old messages "
+              f"in {resolve_time / len(probes) * 1000:.2f}ms each "
+              f"({metrics['hits']} memory, {metrics['spill_hits']} spill)")
+        await store.close()
+
+    asyncio.run(benchmark())
@@ -3,11 +3,28 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Set
 from collections import defaultdict, Counter
-from fuzzywuzzy import fuzz
+from itertools import combinations
+from fuzzywuzzy import fuzz, utils as fuzz_utils
 import re
+from utils.alt_groups import EvidenceType
+from utils.similarity import MinHashLSH, char_ngrams
 
 logger = logging.getLogger(__name__)
 
+MAX_CLUSTER_WINDOWS = 2  # Longest span of a timing cluster, in multiples of its window
+
+# Character substitutions used by alt accounts (leet speak, etc.)
+LEET_SUBSTITUTIONS = {
+    '0': 'o', '1': 'i', '1': 'l', '3': 'e', '4': 'a', 
+    '5': 's', '7': 't', '@': 'a', '8': 'b'
+}
+
+def normalize_leet(username: str) -> str:
+    """Undo common character substitutions in a username."""
+    for digit, letter in LEET_SUBSTITUTIONS.items():
+        username = username.replace(digit, letter)
+    return username
+
 class PatternDetector:
     """Advanced pattern detection for identifying potential alt accounts."""
     
@@ -36,20 +53,8 @@ class PatternDetector:
         if len(valid_members) < 2:
             return results
         
-        # Group members by creation time windows
-        time_groups = await self._group_by_creation_time(valid_members)
-        
-        # Analyze each time group for suspicious patterns
-        for time_window, group_members in time_groups.items():
-            if len(group_members) < 2:
-                continue
-            
-            # Check for rapid succession creation
-            creation_times = [m['created_at'] for m in group_members]
-            creation_times.sort()
-            
-            suspicious_groups = await self._find_rapid_creation_groups(group_members, creation_times)
-            results.extend(suspicious_groups)
+        # Sweep all accounts in creation order so clusters can span window boundaries
+        results.extend(await self._find_rapid_creation_groups(valid_members))
         
         return results
     
@@ -76,13 +81,8 @@ class PatternDetector:
         display_name_groups = await self._analyze_display_name_patterns(valid_members)
         pattern_groups = await self._analyze_naming_patterns(valid_members)
         
-        # Combine all username-based results
-        all_groups = username_groups + display_name_groups + pattern_groups
-        
-        # Remove duplicates and merge overlapping groups
-        merged_groups = await self._merge_similar_groups(all_groups)
-        
-        return merged_groups
+        # Overlapping groups are merged later together with every other analysis
+        return username_groups + display_name_groups + pattern_groups
     
     async def analyze_join_patterns(self, members: List[Dict]) -> List[Dict]:
         """
@@ -105,54 +105,77 @@ class PatternDetector:
         if len(valid_members) < 2:
             return results
         
-        # Group by join time windows
-        join_groups = await self._group_by_join_time(valid_members)
-        
-        # Analyze each group for suspicious patterns
-        for time_window, group_members in join_groups.items():
-            if len(group_members) < 2:
-                continue
-            
-            join_times = [m['joined_at'] for m in group_members]
-            join_times.sort()
-            
-            # Look for rapid successive joins
-            suspicious_groups = await self._find_rapid_join_groups(group_members, join_times)
-            results.extend(suspicious_groups)
+        # Look for rapid successive joins
+        results.extend(await self._find_rapid_join_groups(valid_members))
         
         return results
     
-    async def _group_by_creation_time(self, members: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group members by creation time windows."""
-        time_groups = defaultdict(list)
-        
-        for member in members:
-            created_at = member['created_at']
-            
-            # Create time windows (6-hour periods)
-            window_start = created_at.replace(hour=(created_at.hour // 6) * 6, minute=0, second=0, microsecond=0)
-            window_key = window_start.isoformat()
-            
-            time_groups[window_key].append(member)
+    def _sweep_time_clusters(self, members: List[Dict], time_key: str, window: timedelta,
+                             min_size: int = 2) -> List[Tuple[List[Dict], timedelta, int]]:
+        """
+        Find maximal clusters of members whose timestamps fall close together.
         
-        return dict(time_groups)
-    
-    async def _group_by_join_time(self, members: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group members by join time windows."""
-        time_groups = defaultdict(list)
+        Members are sorted once and swept with a two-pointer sliding window of
+        the given width. Every window holding at least min_size members is
+        suspicious; overlapping windows are merged so each member lands in at
+        most one cluster. A cluster spanning more than MAX_CLUSTER_WINDOWS
+        windows is split at its widest gap, so steady traffic cannot chain
+        into one huge cluster while a tight burst inside it stays whole.
+        Runs in O(n log n), plus a scan of each cluster that has to be split.
         
-        for member in members:
-            joined_at = member['joined_at']
+        Returns:
+            List of (cluster members in time order, cluster span, largest window count)
+        """
+        ordered = sorted(members, key=lambda m: m[time_key])
+        times = [m[time_key] for m in ordered]
+        max_span = window * MAX_CLUSTER_WINDOWS
+        
+        clusters = []
+        cluster_start = cluster_end = None
+        left = 0
+        
+        for right in range(len(times)):
+            # Shrink the window until it spans at most `window`
+            while times[right] - times[left] > window:
+                left += 1
             
-            # Create time windows (1-hour periods for join times)
-            window_start = joined_at.replace(minute=0, second=0, microsecond=0)
-            window_key = window_start.isoformat()
+            if right - left + 1 < min_size:
+                continue
             
-            time_groups[window_key].append(member)
+            if cluster_end is not None and left <= cluster_end:
+                # Overlaps the current cluster: extend it
+                cluster_end = right
+                while times[cluster_end] - times[cluster_start] > max_span:
+                    # Widest gap, the latest one on ties
+                    cut = max(range(cluster_end - 1, cluster_start - 1, -1), key=lambda i: times[i + 1] - times[i])
+                    clusters.append((cluster_start, cut))
+                    cluster_start = cut + 1
+            else:
+                if cluster_end is not None:
+                    clusters.append((cluster_start, cluster_end))
+                cluster_start, cluster_end = left, right
         
-        return dict(time_groups)
+        if cluster_end is not None:
+            clusters.append((cluster_start, cluster_end))
+        
+        return [
+            (ordered[start:end + 1], times[end] - times[start], self._peak_window_count(times, start, end, window))
+            for start, end in clusters
+            if end - start + 1 >= min_size
+        ]
+    
+    @staticmethod
+    def _peak_window_count(times: List[datetime], start: int, end: int, window: timedelta) -> int:
+        """Get the most timestamps of times[start:end + 1] that fit in one window."""
+        peak = 0
+        left = start
+        for right in range(start, end + 1):
+            while times[right] - times[left] > window:
+                left += 1
+            peak = max(peak, right - left + 1)
+        return peak
     
-    async def _find_rapid_creation_groups(self, members: List[Dict], creation_times: List[datetime]) -> List[Dict]:
+    async def _find_rapid_creation_groups(self, members: List[Dict]) -> List[Dict]:
         """Find groups of accounts created in rapid succession."""
         results = []
         
@@ -160,88 +183,63 @@ class PatternDetector:
         rapid_threshold = timedelta(minutes=30)  # 30 minutes
         burst_threshold = timedelta(hours=2)     # 2 hours
         
-        # Check for rapid creation (within 30 minutes)
-        for i in range(len(creation_times)):
-            rapid_group = [members[i]]
+        # Check for rapid creation (2+ accounts within 30 minutes)
+        for cluster, span, peak in self._sweep_time_clusters(members, 'created_at', rapid_threshold):
+            evidence = f"Accounts created within {span} (rapid creation pattern)"
+            details = {
+                'creation_window': str(span),
+                'threshold_type': 'rapid',
+                'account_count': len(cluster),
+                'peak_window_count': peak
+            }
             
-            for j in range(len(creation_times)):
-                if i != j:
-                    time_diff = abs(creation_times[i] - creation_times[j])
-                    if time_diff <= rapid_threshold:
-                        rapid_group.append(members[j])
+            results.append({
+                'member_ids': [m['id'] for m in cluster],
+                'evidence_type': EvidenceType.CREATION_RAPID,
+                'evidence': evidence,
+                'details': details
+            })
+        
+        # Check for burst creation (3+ accounts within 2 hours)
+        for cluster, span, peak in self._sweep_time_clusters(members, 'created_at', burst_threshold, min_size=3):
+            evidence = f"Account creation burst: {peak} accounts within {burst_threshold} ({len(cluster)} over {span})"
+            details = {
+                'creation_window': str(span),
+                'threshold_type': 'burst',
+                'account_count': len(cluster),
+                'peak_window_count': peak
+            }
             
-            if len(rapid_group) >= 2:
-                member_ids = [m['id'] for m in rapid_group]
-                max_diff = max(abs(creation_times[i] - t) for t in creation_times)
-                
-                evidence = f"Accounts created within {max_diff} (rapid creation pattern)"
-                details = {
-                    'creation_window': str(max_diff),
-                    'threshold_type': 'rapid',
-                    'account_count': len(rapid_group)
-                }
-                
-                results.append({
-                    'member_ids': member_ids,
-                    'evidence': evidence,
-                    'details': details
-                })
-        
-        # Check for burst creation (multiple accounts within 2 hours)
-        if len(members) >= 3:
-            for i in range(len(creation_times) - 2):
-                burst_window = creation_times[i + 2] - creation_times[i]
-                
-                if burst_window <= burst_threshold:
-                    burst_group = members[i:i+3]
-                    member_ids = [m['id'] for m in burst_group]
-                    
-                    evidence = f"Account creation burst: 3+ accounts within {burst_window}"
-                    details = {
-                        'creation_window': str(burst_window),
-                        'threshold_type': 'burst',
-                        'account_count': len(burst_group)
-                    }
-                    
-                    results.append({
-                        'member_ids': member_ids,
-                        'evidence': evidence,
-                        'details': details
-                    })
+            results.append({
+                'member_ids': [m['id'] for m in cluster],
+                'evidence_type': EvidenceType.CREATION_BURST,
+                'evidence': evidence,
+                'details': details
+            })
         
         return results
     
-    async def _find_rapid_join_groups(self, members: List[Dict], join_times: List[datetime]) -> List[Dict]:
+    async def _find_rapid_join_groups(self, members: List[Dict]) -> List[Dict]:
         """Find groups of accounts that joined in rapid succession."""
         results = []
         
         rapid_threshold = timedelta(minutes=15)  # 15 minutes for joins
         
-        for i in range(len(join_times)):
-            rapid_group = [members[i]]
-            
-            for j in range(len(join_times)):
-                if i != j:
-                    time_diff = abs(join_times[i] - join_times[j])
-                    if time_diff <= rapid_threshold:
-                        rapid_group.append(members[j])
+        for cluster, span, peak in self._sweep_time_clusters(members, 'joined_at', rapid_threshold):
+            evidence = f"Accounts joined within {span} (coordinated join pattern)"
+            details = {
+                'join_window': str(span),
+                'threshold_type': 'rapid_join',
+                'account_count': len(cluster),
+                'peak_window_count': peak
+            }
             
-            if len(rapid_group) >= 2:
-                member_ids = [m['id'] for m in rapid_group]
-                max_diff = max(abs(join_times[i] - t) for t in join_times)
-                
-                evidence = f"Accounts joined within {max_diff} (coordinated join pattern)"
-                details = {
-                    'join_window': str(max_diff),
-                    'threshold_type': 'rapid_join',
-                    'account_count': len(rapid_group)
-                }
-                
-                results.append({
-                    'member_ids': member_ids,
-                    'evidence': evidence,
-                    'details': details
-                })
+            results.append({
+                'member_ids': [m['id'] for m in cluster],
+                'evidence_type': EvidenceType.JOIN_RAPID,
+                'evidence': evidence,
+                'details': details
+            })
         
         return results
     
@@ -260,38 +258,39 @@ class PatternDetector:
                     'original': member.get('username', '')
                 })
         
-        # Compare all usernames pairwise
-        for i in range(len(username_data)):
-            for j in range(i + 1, len(username_data)):
-                user1 = username_data[i]
-                user2 = username_data[j]
-                
-                # Calculate various similarity metrics
-                ratio = fuzz.ratio(user1['username'], user2['username'])
-                partial_ratio = fuzz.partial_ratio(user1['username'], user2['username'])
-                token_sort_ratio = fuzz.token_sort_ratio(user1['username'], user2['username'])
-                
-                # Check for specific patterns
-                pattern_similarity = await self._check_username_patterns(user1['username'], user2['username'])
-                
-                # Determine if usernames are suspiciously similar
-                max_similarity = max(ratio, partial_ratio, token_sort_ratio, pattern_similarity)
+        # Only score pairs the candidate index considers plausible
+        usernames = [user['username'] for user in username_data]
+        for i, j in self._find_candidate_pairs(usernames, include_patterns=True):
+            user1 = username_data[i]
+            user2 = username_data[j]
+            
+            # Calculate various similarity metrics
+            ratio = fuzz.ratio(user1['username'], user2['username'])
+            partial_ratio = fuzz.partial_ratio(user1['username'], user2['username'])
+            token_sort_ratio = fuzz.token_sort_ratio(user1['username'], user2['username'])
+            
+            # Check for specific patterns
+            pattern_similarity = await self._check_username_patterns(user1['username'], user2['username'])
+            
+            # Determine if usernames are suspiciously similar
+            max_similarity = max(ratio, partial_ratio, token_sort_ratio, pattern_similarity)
+            
+            if max_similarity >= 85:  # High similarity threshold
+                evidence = f"Username similarity: {user1['original']} ↔ {user2['original']} ({max_similarity}% similar)"
+                details = {
+                    'similarity_score': max_similarity,
+                    'ratio': ratio,
+                    'partial_ratio': partial_ratio,
+                    'token_sort_ratio': token_sort_ratio,
+                    'pattern_similarity': pattern_similarity
+                }
                 
-                if max_similarity >= 85:  # High similarity threshold
-                    evidence = f"Username similarity: {user1['original']} ↔ {user2['original']} ({max_similarity}% similar)"
-                    details = {
-                        'similarity_score': max_similarity,
-                        'ratio': ratio,
-                        'partial_ratio': partial_ratio,
-                        'token_sort_ratio': token_sort_ratio,
-                        'pattern_similarity': pattern_similarity
-                    }
-                    
-                    results.append({
-                        'member_ids': [user1['id'], user2['id']],
-                        'evidence': evidence,
-                        'details': details
-                    })
+                results.append({
+                    'member_ids': [user1['id'], user2['id']],
+                    'evidence_type': EvidenceType.USERNAME,
+                    'evidence': evidence,
+                    'details': details
+                })
         
         return results
     
@@ -314,32 +313,91 @@ class PatternDetector:
                 })
         
         # Compare display names
-        for i in range(len(display_name_data)):
-            for j in range(i + 1, len(display_name_data)):
-                name1 = display_name_data[i]
-                name2 = display_name_data[j]
-                
-                ratio = fuzz.ratio(name1['display_name'], name2['display_name'])
-                partial_ratio = fuzz.partial_ratio(name1['display_name'], name2['display_name'])
-                
-                max_similarity = max(ratio, partial_ratio)
+        display_names = [name['display_name'] for name in display_name_data]
+        for i, j in self._find_candidate_pairs(display_names):
+            name1 = display_name_data[i]
+            name2 = display_name_data[j]
+            
+            ratio = fuzz.ratio(name1['display_name'], name2['display_name'])
+            partial_ratio = fuzz.partial_ratio(name1['display_name'], name2['display_name'])
+            
+            max_similarity = max(ratio, partial_ratio)
+            
+            if max_similarity >= 80:  # Slightly lower threshold for display names
+                evidence = f"Display name similarity: {name1['original']} ↔ {name2['original']} ({max_similarity}% similar)"
+                details = {
+                    'similarity_score': max_similarity,
+                    'ratio': ratio,
+                    'partial_ratio': partial_ratio
+                }
                 
-                if max_similarity >= 80:  # Slightly lower threshold for display names
-                    evidence = f"Display name similarity: {name1['original']} ↔ {name2['original']} ({max_similarity}% similar)"
-                    details = {
-                        'similarity_score': max_similarity,
-                        'ratio': ratio,
-                        'partial_ratio': partial_ratio
-                    }
-                    
-                    results.append({
-                        'member_ids': [name1['id'], name2['id']],
-                        'evidence': evidence,
-                        'details': details
-                    })
+                results.append({
+                    'member_ids': [name1['id'], name2['id']],
+                    'evidence_type': EvidenceType.DISPLAY_NAME,
+                    'evidence': evidence,
+                    'details': details
+                })
         
         return results
     
+    def _find_candidate_pairs(self, names: List[str], include_patterns: bool = False) -> List[Tuple[int, int]]:
+        """
+        Find index pairs of names that could plausibly pass fuzzy scoring.
+        
+        Candidates come from MinHash LSH over character bigrams (near-duplicates
+        and reorderings), exact substring containment (partial matches) and,
+        for usernames, the keys the rule-based username patterns compare on.
+        
+        Returns:
+            Sorted list of (i, j) pairs with i < j
+        """
+        pairs = set()
+        
+        # 1. Bigram MinHash LSH
+        lsh = MinHashLSH()
+        for index, name in enumerate(names):
+            lsh.add(index, char_ngrams(name))
+        pairs.update(lsh.candidate_pairs())
+        
+        # 2. Blocking keys: identical names, token-sorted forms and username patterns
+        blocks = defaultdict(list)
+        for index, name in enumerate(names):
+            keys = {('exact', name)}
+            
+            tokens = fuzz_utils.full_process(name, force_ascii=True).split()
+            if tokens:
+                keys.add(('tokens', ' '.join(sorted(tokens))))
+            
+            if include_patterns:
+                base = re.sub(r'\d+$', '', name)
+                if len(base) >= 3:
+                    keys.add(('base', base))  # Same base, different number suffix
+                keys.add(('leet', normalize_leet(name)))
+            for key in keys:
+                blocks[key].append(index)
+        
+        for indices in blocks.values():
+            if len(indices) > 1:
+                pairs.update(combinations(indices, 2))
+        
+        # 3. One name contained in another scores 100 on partial_ratio (and
+        # covers the "same name plus digits" username pattern). Looking up each
+        # name with one character deleted as well catches near-containment.
+        containing = defaultdict(set)
+        for index, name in enumerate(names):
+            for start in range(len(name)):
+                for end in range(start + 2, len(name) + 1):
+                    containing[name[start:end]].add(index)
+        
+        for index, name in enumerate(names):
+            variants = {name} | {name[:position] + name[position + 1:] for position in range(len(name))}
+            for variant in variants:
+                for other in containing.get(variant, ()):
+                    if other != index:
+                        pairs.add((min(index, other), max(index, other)))
+        
+        return sorted(pairs)
+    
     async def _analyze_naming_patterns(self, members: List[Dict]) -> List[Dict]:
         """Analyze naming patterns for common alt account strategies."""
         results = []
@@ -383,6 +441,7 @@ class PatternDetector:
                 
                 results.append({
                     'member_ids': member_ids,
+                    'evidence_type': EvidenceType.NAMING_PATTERN,
                     'evidence': evidence,
                     'details': details
                 })
@@ -407,48 +466,168 @@ class PatternDetector:
             return 90
         
         # Pattern 3: Similar with character substitutions (leet speak, etc.)
-        substitutions = {
-            '0': 'o', '1': 'i', '1': 'l', '3': 'e', '4': 'a', 
-            '5': 's', '7': 't', '@': 'a', '8': 'b'
-        }
-        
-        normalized1 = username1
-        normalized2 = username2
-        
-        for digit, letter in substitutions.items():
-            normalized1 = normalized1.replace(digit, letter)
-            normalized2 = normalized2.replace(digit, letter)
-        
-        if normalized1 == normalized2:
+        if normalize_leet(username1) == normalize_leet(username2):
             return 85
         
         return 0
+
+# Benchmark: python -m utils.patterns
+if __name__ == "__main__":
+    import random
+    import string
+    import time
     
-    async def _merge_similar_groups(self, groups: List[Dict]) -> List[Dict]:
-        """Merge groups that have overlapping members."""
-        if not groups:
-            return []
-        
-        merged = []
-        processed_members = set()
+    syllables = [consonant + vowel for consonant in 'bcdfghjklmnprstvwxz' for vowel in 'aeiouy']
+    
+    def random_name() -> str:
+        name = ''.join(random.choice(syllables) for _ in range(random.randint(2, 5)))
+        if random.random() < 0.3:
+            name += random.choice(['_', '.', '']) + ''.join(random.choice(syllables) for _ in range(2))
+        if random.random() < 0.2:
+            name += str(random.randint(0, 99))
+        return name
+    
+    def alt_of(name: str) -> str:
+        """Derive an alt name the way alt accounts typically do."""
+        variant = random.choice(['digits', 'leet', 'typo', 'swap', 'suffix', 'prefix'])
+        if variant == 'digits':
+            return name + str(random.randint(1, 999))
+        if variant == 'leet':
+            return name.replace('o', '0').replace('e', '3').replace('a', '4')
+        if variant == 'typo':
+            position = random.randrange(len(name))
+            return name[:position] + random.choice(string.ascii_lowercase) + name[position + 1:]
+        if variant == 'swap' and '_' in name:
+            first, second = name.split('_', 1)
+            return f"{second}_{first}"
+        if variant == 'suffix':
+            return name + random.choice(['alt', 'backup', '_new', 'x'])
+        return random.choice(['the', 'its', 'real']) + name
+    
+    def make_members(count: int) -> Tuple[List[Dict], Set[Tuple[int, int]]]:
+        """Generate members plus the labeled (original, alt) pairs planted among them."""
+        members, labeled = [], set()
+        while len(members) < count:
+            name = random_name()
+            original_id = len(members)
+            members.append({'id': original_id, 'username': name, 'display_name': name.title().replace('_', ' ')})
+            
+            if random.random() < 0.1:
+                alt = alt_of(name)
+                members.append({'id': len(members), 'username': alt, 'display_name': alt.upper()})
+                labeled.add((original_id, len(members) - 1))
+        return members, labeled
+    
+    def pair_set(results: List[Dict]) -> Set[Tuple[int, int]]:
+        return {tuple(sorted(result['member_ids'])) for result in results}
+    
+    async def benchmark():
+        random.seed(31)
+        indexed = PatternDetector()
+        brute_force = PatternDetector()
+        brute_force._find_candidate_pairs = lambda names, include_patterns=False: [
+            (i, j) for i in range(len(names)) for j in range(i + 1, len(names))
+        ]
         
-        for group in groups:
-            member_ids = set(group['member_ids'])
+        print(f"{'members':>8} {'brute force':>12} {'indexed':>9} {'speedup':>8} "
+              f"{'pairs':>7} {'identical':>10} {'labeled recall':>15}")
+        for count in (500, 1000, 2000):
+            members, labeled = make_members(count)
             
-            # Check if this group overlaps with any processed members
-            if member_ids.intersection(processed_members):
-                # Find existing group to merge with
-                for existing_group in merged:
-                    existing_ids = set(existing_group['member_ids'])
-                    if member_ids.intersection(existing_ids):
-                        # Merge groups
-                        existing_group['member_ids'] = list(existing_ids.union(member_ids))
-                        existing_group['evidence'] += f"; {group['evidence']}"
-                        existing_group['details'].update(group.get('details', {}))
-                        break
-            else:
-                # New group
-                merged.append(group)
-                processed_members.update(member_ids)
+            start = time.perf_counter()
+            expected = pair_set(await brute_force._analyze_username_patterns(members))
+            expected |= pair_set(await brute_force._analyze_display_name_patterns(members))
+            brute_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            actual = pair_set(await indexed._analyze_username_patterns(members))
+            actual |= pair_set(await indexed._analyze_display_name_patterns(members))
+            indexed_time = time.perf_counter() - start
+            
+            recall = len(labeled & actual) / len(labeled & expected) if labeled & expected else 1.0
+            print(f"{count:>8} {brute_time:>11.2f}s {indexed_time:>8.2f}s {brute_time / indexed_time:>7.1f}x "
+                  f"{len(actual):>7} {str(actual == expected):>10} {recall:>15.1%}")
+            if actual != expected:
+                print(f"         missed {len(expected - actual)} of {len(expected)} brute-force pairs")
+    
+    def legacy_rapid_groups(members: List[Dict], time_key: str, threshold: timedelta, bucket) -> List[Set[int]]:
+        """The previous fixed-window, all-pairs grouping, kept for comparison."""
+        buckets = defaultdict(list)
+        for member in members:
+            buckets[bucket(member[time_key])].append(member)
+        
+        groups = []
+        for group_members in buckets.values():
+            times = sorted(m[time_key] for m in group_members)
+            for i in range(len(times)):
+                rapid_group = {group_members[i]['id']}
+                for j in range(len(times)):
+                    if i != j and abs(times[i] - times[j]) <= threshold:
+                        rapid_group.add(group_members[j]['id'])
+                if len(rapid_group) >= 2:
+                    groups.append(rapid_group)
+        return groups
+    
+    def make_raid_fixture(count: int, raids: int) -> Tuple[List[Dict], List[Set[int]]]:
+        """Organic joins spread over a year plus tight raids, some straddling hour boundaries."""
+        start = datetime(2024, 1, 1)
+        members = [
+            {'id': member_id, 'joined_at': start + timedelta(seconds=random.randint(0, 365 * 86400))}
+            for member_id in range(count)
+        ]
         
-        return merged
+        planted = []
+        for _ in range(raids):
+            raid_start = start + timedelta(hours=random.randint(0, 365 * 24), minutes=random.choice([0, 55]))
+            raid = set()
+            for _ in range(random.randint(3, 12)):
+                raid.add(len(members))
+                members.append({'id': len(members), 'joined_at': raid_start + timedelta(seconds=random.randint(0, 600))})
+            planted.append(raid)
+        
+        random.shuffle(members)
+        return members, planted
+    
+    async def raid_benchmark():
+        random.seed(32)
+        detector = PatternDetector()
+        hour_bucket = lambda joined_at: joined_at.replace(minute=0, second=0, microsecond=0)
+        
+        print(f"\n{'members':>8} {'legacy':>9} {'sweep':>8} {'legacy groups':>14} {'sweep groups':>13} "
+              f"{'raids whole (legacy/sweep)':>27}")
+        for count in (1000, 5000, 20000):
+            members, planted = make_raid_fixture(count, raids=20)
+            
+            start = time.perf_counter()
+            legacy = legacy_rapid_groups(members, 'joined_at', timedelta(minutes=15), hour_bucket)
+            legacy_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            swept = [set(result['member_ids']) for result in await detector.analyze_join_patterns(members)]
+            sweep_time = time.perf_counter() - start
+            
+            legacy_whole = sum(any(raid <= group for group in legacy) for raid in planted)
+            sweep_whole = sum(any(raid <= group for group in swept) for raid in planted)
+            print(f"{count:>8} {legacy_time:>8.2f}s {sweep_time:>7.3f}s {len(legacy):>14} {len(swept):>13} "
+                  f"{f'{legacy_whole}/{sweep_whole} of {len(planted)}':>27}")
+            
+            # Recall alone is met by one giant cluster; every cluster must also stay short
+            joined_at = {member['id']: member['joined_at'] for member in members}
+            longest = max(max(joined_at[i] for i in group) - min(joined_at[i] for i in group) for group in swept)
+            assert longest <= timedelta(minutes=15) * MAX_CLUSTER_WINDOWS, longest
+        
+        # Steady traffic, about one join every two minutes: clusters must stay short
+        join_window = timedelta(minutes=15)
+        start = datetime(2024, 1, 1)
+        steady = [{'id': member_id, 'joined_at': start + timedelta(seconds=member_id * 30 * 86400 / 20000)}
+                  for member_id in range(20000)]
+        clusters = detector._sweep_time_clusters(steady, 'joined_at', join_window)
+        largest = max(len(cluster) for cluster, _, _ in clusters)
+        longest = max(span for _, span, _ in clusters)
+        print(f"\n20,000 evenly spread joins over 30 days: {len(clusters)} clusters, "
+              f"largest {largest} members, longest span {longest}")
+        assert longest <= join_window * MAX_CLUSTER_WINDOWS
+        assert largest <= 2 * max(peak for _, _, peak in clusters)
+    
+    asyncio.run(benchmark())
+    asyncio.run(raid_benchmark())
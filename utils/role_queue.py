@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+ACK_TIMEOUT = 10.0  # Seconds a sent role set is trusted over the member cache while its update event is pending
+
+class TokenBucket:
+    """Simple token bucket used to pace requests against a Discord route bucket."""
+
+    def __init__(self, rate: int = 10, per: float = 10.0):
+        self.capacity = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        """Refill tokens based on elapsed time."""
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * (self.capacity / self.per))
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it."""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            # Sleep until the next token is due
+            await asyncio.sleep((1 - self.tokens) * (self.per / self.capacity))
+
+class PendingRoleEdit:
+    """Merged role changes waiting to be applied to a single member."""
+
+    __slots__ = ('changes', 'reasons', 'waiters')
+
+    def __init__(self):
+        self.changes: Dict[int, bool] = {}  # role_id: True (add) / False (remove)
+        self.reasons: List[str] = []
+        self.waiters: List[asyncio.Future] = []
+
+class RoleMutationQueue:
+    """Per-guild queue that coalesces role add/remove requests into one member edit."""
+
+    def __init__(self, bot, rate: int = 10, per: float = 10.0):
+        self.bot = bot
+        self.rate = rate
+        self.per = per
+        self.pending: Dict[int, OrderedDict] = {}  # guild_id: {member_id: PendingRoleEdit}
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.sent: Dict[int, Dict[int, Tuple[FrozenSet[int], float]]] = {}  # guild_id: {member_id: (role IDs, sent at)}
+        self.stats = {
+            'requested': 0,
+            'merged': 0,
+            'edits_sent': 0,
+            'edits_failed': 0,
+            'unacknowledged_bases': 0
+        }
+
+    async def add_roles(self, member: discord.Member, *roles: discord.abc.Snowflake, reason: Optional[str] = None):
+        """Queue roles to be added to a member and wait until they are applied."""
+        await self._enqueue(member, roles, True, reason)
+
+    async def remove_roles(self, member: discord.Member, *roles: discord.abc.Snowflake, reason: Optional[str] = None):
+        """Queue roles to be removed from a member and wait until they are applied."""
+        await self._enqueue(member, roles, False, reason)
+
+    async def _enqueue(self, member: discord.Member, roles, add: bool, reason: Optional[str]):
+        """Merge a role change into the member's pending edit."""
+        guild_id = member.guild.id
+        guild_pending = self.pending.setdefault(guild_id, OrderedDict())
+
+        edit = guild_pending.get(member.id)
+        if edit is None:
+            edit = PendingRoleEdit()
+            guild_pending[member.id] = edit
+        else:
+            self.stats['merged'] += 1
+
+        # Last operation for a role wins
+        for role in roles:
+            edit.changes[role.id] = add
+        if reason and reason not in edit.reasons:
+            edit.reasons.append(reason)
+
+        future = asyncio.get_running_loop().create_future()
+        edit.waiters.append(future)
+        self.stats['requested'] += 1
+
+        worker = self.workers.get(guild_id)
+        if worker is None or worker.done():
+            self.workers[guild_id] = asyncio.create_task(self._run_guild(guild_id))
+
+        await future
+
+    async def _run_guild(self, guild_id: int):
+        """Drain the pending edits for a guild, pacing requests with its token bucket."""
+        bucket = self.buckets.setdefault(guild_id, TokenBucket(self.rate, self.per))
+        guild_pending = self.pending.get(guild_id)
+        self._prune_sent(guild_id)
+
+        while guild_pending:
+            # Wait for a token first so more changes can merge in the meantime
+            await bucket.acquire()
+
+            member_id, edit = guild_pending.popitem(last=False)
+            try:
+                await self._apply(guild_id, member_id, edit)
+            except Exception as e:
+                self.stats['edits_failed'] += 1
+                for waiter in edit.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in edit.waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+        self.pending.pop(guild_id, None)
+        self.workers.pop(guild_id, None)
+
+    async def _apply(self, guild_id: int, member_id: int, edit: PendingRoleEdit):
+        """Apply merged role changes to the member with a single edit."""
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+
+        # Re-read the member so concurrent changes are not overwritten
+        member = guild.get_member(member_id)
+        if not member:
+            return
+
+        current_ids = [role.id for role in member.roles if role.id != guild.default_role.id]
+
+        # Until the gateway confirms our previous edit, the cache still shows the roles from before it;
+        # editing from the cache would silently revert that edit
+        guild_sent = self.sent.setdefault(guild_id, {})
+        sent = guild_sent.get(member_id)
+        if sent is not None:
+            sent_ids, sent_at = sent
+            if set(current_ids) == sent_ids or time.monotonic() - sent_at > ACK_TIMEOUT:
+                del guild_sent[member_id]
+            else:
+                current_ids = list(sent_ids)
+                self.stats['unacknowledged_bases'] += 1
+        new_ids = [role_id for role_id in current_ids if edit.changes.get(role_id, True)]
+        for role_id, add in edit.changes.items():
+            if add and role_id not in new_ids:
+                new_ids.append(role_id)
+
+        if set(new_ids) == set(current_ids):
+            return  # Nothing to change
+
+        new_roles = [discord.Object(id=role_id) for role_id in new_ids]
+        updated = await member.edit(roles=new_roles, reason="; ".join(edit.reasons)[:512] or None)
+        self.stats['edits_sent'] += 1
+
+        # The edit response is authoritative; fall back to what was sent
+        if updated is not None:
+            sent_ids = frozenset(role.id for role in updated.roles if role.id != guild.default_role.id)
+        else:
+            sent_ids = frozenset(new_ids)
+        guild_sent[member_id] = (sent_ids, time.monotonic())
+
+    def _prune_sent(self, guild_id: int):
+        """Forget sent role sets that are too old to be trusted over the member cache."""
+        guild_sent = self.sent.get(guild_id)
+        if not guild_sent:
+            return
+
+        cutoff = time.monotonic() - ACK_TIMEOUT
+        for member_id in [member_id for member_id, (_, sent_at) in guild_sent.items() if sent_at < cutoff]:
+            del guild_sent[member_id]
+
+    def queue_depth(self, guild_id: int) -> int:
+        """Get the number of members with pending role edits in a guild."""
+        return len(self.pending.get(guild_id, {}))
+
+    def get_metrics(self) -> Dict:
+        """Get queue depth and throughput metrics."""
+        return {
+            'guilds_active': len(self.workers),
+            'queue_depth': {guild_id: len(members) for guild_id, members in self.pending.items()},
+            'total_pending': sum(len(members) for members in self.pending.values()),
+            **self.stats
+        }
+
+    async def close(self):
+        """Cancel running workers and fail any pending edits."""
+        for worker in self.workers.values():
+            worker.cancel()
+
+        for guild_pending in self.pending.values():
+            for edit in guild_pending.values():
+                for waiter in edit.waiters:
+                    if not waiter.done():
+                        waiter.cancel()
+
+        self.workers.clear()
+        self.pending.clear()
@@ -0,0 +1,170 @@
+import logging
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A block scorer takes a row slice and a column slice into the member matrix
+# and returns the (rows x cols) similarity matrix for that tile.
+BlockScorer = Callable[[slice, slice], np.ndarray]
+
+DEFAULT_TILE_SIZE = 512
+
+# Mersenne prime for the MinHash permutations; keeps (a * h + b) inside uint64
+MINHASH_PRIME = (1 << 31) - 1
+
+def iter_similar_pairs(score_block: BlockScorer, count: int, threshold: float,
+                       tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Find all pairs i < j whose similarity is above the threshold, tile by tile.
+
+    Only one tile_size x tile_size block of scores exists at a time, so memory
+    stays bounded regardless of member count. Results are yielded one row band
+    at a time as (rows, cols, scores), sorted by row then column so the output
+    order matches a nested i < j loop.
+    """
+    for row_start in range(0, count, tile_size):
+        row_stop = min(row_start + tile_size, count)
+        band_rows, band_cols, band_scores = [], [], []
+
+        # Only tiles on or above the diagonal are needed
+        for col_start in range(row_start, count, tile_size):
+            col_stop = min(col_start + tile_size, count)
+            scores = score_block(slice(row_start, row_stop), slice(col_start, col_stop))
+
+            mask = scores > threshold
+            if col_start == row_start:
+                # Diagonal tile: keep the strict upper triangle only
+                mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+
+            rows, cols = np.nonzero(mask)
+            if rows.size:
+                band_rows.append(rows + row_start)
+                band_cols.append(cols + col_start)
+                band_scores.append(scores[rows, cols])
+
+        if not band_rows:
+            continue
+
+        rows = np.concatenate(band_rows)
+        cols = np.concatenate(band_cols)
+        scores = np.concatenate(band_scores)
+        order = np.lexsort((cols, rows))
+        yield rows[order], cols[order], scores[order]
+
+def cosine_block(matrix: np.ndarray) -> BlockScorer:
+    """Build a cosine similarity scorer over the rows of a feature matrix."""
+    norms = np.linalg.norm(matrix, axis=1)
+    safe_norms = np.where(norms == 0, 1.0, norms)
+    unit = matrix / safe_norms[:, None]
+    zero = norms == 0
+
+    def score(rows: slice, cols: slice) -> np.ndarray:
+        scores = unit[rows] @ unit[cols].T
+        # Zero vectors have no direction and are never similar
+        scores[zero[rows], :] = 0.0
+        scores[:, zero[cols]] = 0.0
+        return scores
+
+    return score
+
+def jaccard_block(sets: np.ndarray) -> BlockScorer:
+    """Build a Jaccard similarity scorer over rows of a boolean membership matrix."""
+    as_float = sets.astype(np.float64)
+    sizes = as_float.sum(axis=1)
+
+    def score(rows: slice, cols: slice) -> np.ndarray:
+        intersection = as_float[rows] @ as_float[cols].T
+        union = sizes[rows][:, None] + sizes[cols][None, :] - intersection
+        return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    return score
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """Get the padded character n-grams of a string."""
+    padded = f"^{text}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+class MinHashLSH:
+    """MinHash signatures bucketed by band to find likely-similar pairs without comparing all of them."""
+    
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MINHASH_PRIME, num_perm, dtype=np.uint64)
+        self.buckets: Dict[Tuple[int, bytes], List[Hashable]] = defaultdict(list)
+    
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """Compute the MinHash signature of a token set."""
+        # crc32 is stable across processes, unlike the built-in str hash
+        hashes = np.array([zlib.crc32(token.encode()) % MINHASH_PRIME for token in tokens], dtype=np.uint64)
+        return ((np.outer(hashes, self.a) + self.b) % MINHASH_PRIME).min(axis=0)
+    
+    def signatures(self, token_sets: List[Iterable[str]]) -> np.ndarray:
+        """Compute the MinHash signatures of many token sets at once, one row each."""
+        hash_lists = [[zlib.crc32(token.encode()) % MINHASH_PRIME for token in tokens] for tokens in token_sets]
+        lengths = np.array([len(hashes) for hashes in hash_lists])
+        hashes = np.fromiter((h for hash_list in hash_lists for h in hash_list), dtype=np.uint64, count=int(lengths.sum()))
+        permuted = (np.outer(hashes, self.a) + self.b) % MINHASH_PRIME
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return np.minimum.reduceat(permuted, starts, axis=0)
+    
+    def add_many(self, keys: List[Hashable], token_sets: List[Iterable[str]]):
+        """Index many keys by their token sets; every token set must be non-empty."""
+        if not keys:
+            return
+        # View each band of each signature as one opaque value so its bytes come out in a single pass
+        signatures = np.ascontiguousarray(self.signatures(token_sets)[:, :self.bands * self.rows])
+        band_bytes = signatures.view(f'V{self.rows * signatures.itemsize}').tolist()
+        buckets = self.buckets
+        for key, bands in zip(keys, band_bytes):
+            for band, value in enumerate(bands):
+                buckets[(band, value)].append(key)
+    
+    def _band_keys(self, tokens: Iterable[str]) -> List[Tuple[int, bytes]]:
+        """Get the bucket key of every band of a token set."""
+        signature = self.signature(tokens)
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+    
+    def add(self, key: Hashable, tokens: Iterable[str]):
+        """Index a key by its token set."""
+        for band_key in self._band_keys(tokens):
+            self.buckets[band_key].append(key)
+    
+    def remove(self, key: Hashable, tokens: Iterable[str]):
+        """Remove a key indexed with the same token set."""
+        for band_key in self._band_keys(tokens):
+            bucket = self.buckets.get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self.buckets[band_key]
+    
+    def query(self, tokens: Iterable[str]) -> Set[Hashable]:
+        """Get every indexed key sharing at least one band bucket with a token set."""
+        candidates = set()
+        for band_key in self._band_keys(tokens):
+            candidates.update(self.buckets.get(band_key, ()))
+        return candidates
+    
+    def candidate_pairs(self) -> Set[Tuple[Hashable, Hashable]]:
+        """Get every pair of keys that share at least one band bucket, in insertion order."""
+        pairs = set()
+        for keys in self.buckets.values():
+            if len(keys) > 1:
+                pairs.update(combinations(keys, 2))
+        return pairs